@@ -20,6 +20,7 @@ class Base():
         TRANSLATION_UPDATE: int = 230                           # 翻译状态更新
         TRANSLATION_MANUAL_EXPORT: int = 240                    # 翻译结果手动导出
         CACHE_FILE_AUTO_SAVE: int = 300                         # 缓存文件自动保存
+        CACHE_FILE_LOAD_UPDATE: int = 310                       # 缓存文件读取进度更新
         PROJECT_STATUS: int = 400                               # 项目状态检查
         PROJECT_STATUS_CHECK_DONE: int = 410                    # 项目状态检查完成
         APP_UPDATE_CHECK: int = 500                             # 检查更新
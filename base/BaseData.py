@@ -1,5 +1,8 @@
 class BaseData():
 
+    # 不占用实例字典，以便子类可以通过 __slots__ 完全省去实例字典
+    __slots__ = ()
+
     _TYPE_FILTER = (int, str, bool, float, list, dict, tuple)
 
     def __init__(self) -> None:
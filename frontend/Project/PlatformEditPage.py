@@ -14,6 +14,7 @@ from qfluentwidgets import SingleDirectionScrollArea
 from base.Base import Base
 from module.Localizer.Localizer import Localizer
 from widget.EmptyCard import EmptyCard
+from widget.SpinCard import SpinCard
 from widget.GroupCard import GroupCard
 from widget.ComboBoxCard import ComboBoxCard
 from widget.LineEditCard import LineEditCard
@@ -73,6 +74,10 @@ class PlatformEditPage(MessageBoxBase, Base):
         if self.platform.get("api_format") in (Base.APIFormat.OPENAI, Base.APIFormat.GOOGLE, Base.APIFormat.ANTHROPIC):
             self.add_widget_model(self.vbox, config, window)
 
+        # 速率限制，所有接口格式的请求都会经过速率限制器
+        self.add_widget_rpm_limit(self.vbox, config, window)
+        self.add_widget_tpm_limit(self.vbox, config, window)
+
         # 填充
         self.vbox.addStretch(1)
 
@@ -243,4 +248,46 @@ class PlatformEditPage(MessageBoxBase, Base):
                 triggered = lambda _: triggered_sync(),
             )
         )
-        drop_down_push_button.setMenu(menu)
\ No newline at end of file
+        drop_down_push_button.setMenu(menu)
+
+    # 每分钟请求数限制
+    def add_widget_rpm_limit(self, parent: QLayout, config: dict, window: FluentWindow) -> None:
+        def init(widget: SpinCard) -> None:
+            widget.set_range(0, 9999999)
+            widget.set_value(self.platform.get("rpm_limit", 0))
+
+        def value_changed(widget: SpinCard, value: int) -> None:
+            config = self.load_config()
+            self.platform["rpm_limit"] = value
+            self.update_platform_to_config(self.platform, config)
+            self.save_config(config)
+
+        parent.addWidget(
+            SpinCard(
+                Localizer.get().platform_edit_page_rpm_limit_title,
+                Localizer.get().platform_edit_page_rpm_limit_content,
+                init = init,
+                value_changed = value_changed,
+            )
+        )
+
+    # 每分钟 Token 数限制
+    def add_widget_tpm_limit(self, parent: QLayout, config: dict, window: FluentWindow) -> None:
+        def init(widget: SpinCard) -> None:
+            widget.set_range(0, 999999999)
+            widget.set_value(self.platform.get("tpm_limit", 0))
+
+        def value_changed(widget: SpinCard, value: int) -> None:
+            config = self.load_config()
+            self.platform["tpm_limit"] = value
+            self.update_platform_to_config(self.platform, config)
+            self.save_config(config)
+
+        parent.addWidget(
+            SpinCard(
+                Localizer.get().platform_edit_page_tpm_limit_title,
+                Localizer.get().platform_edit_page_tpm_limit_content,
+                init = init,
+                value_changed = value_changed,
+            )
+        )
\ No newline at end of file
@@ -98,6 +98,7 @@ class TranslationPage(QWidget, Base):
         self.subscribe(Base.Event.TRANSLATION_STOP_DONE, self.translation_stop_done)
         self.subscribe(Base.Event.TRANSLATION_UPDATE, self.translation_update)
         self.subscribe(Base.Event.CACHE_FILE_AUTO_SAVE, self.cache_file_auto_save)
+        self.subscribe(Base.Event.CACHE_FILE_LOAD_UPDATE, self.cache_file_load_update)
         self.subscribe(Base.Event.PROJECT_STATUS_CHECK_DONE, lambda event, data: self.update_button_status(event, data))
         self.subscribe(Base.Event.APP_SHUT_DOWN, self.app_shut_down)
 
@@ -284,6 +285,13 @@ class TranslationPage(QWidget, Base):
             # 延迟关闭
             QTimer.singleShot(1500, lambda: self.indeterminate_hide())
 
+    # 缓存文件读取进度更新事件
+    def cache_file_load_update(self, event: int, data: dict) -> None:
+        if data.get("percent", 0) >= 100:
+            self.indeterminate_hide()
+        else:
+            self.indeterminate_show(Localizer.get().translation_page_indeterminate_loading.replace("{PERCENT}", str(data.get("percent", 0))))
+
     # 头部
     def add_widget_head(self, parent: QLayout, config: dict, window: FluentWindow) -> None:
         self.head_hbox_container = QWidget(self)
@@ -98,7 +98,7 @@ class BasicSettingsPage(QWidget, Base):
             )
         )
 
-    # 翻译流程最大轮次
+    # 每个条目的最大尝试次数
     def add_widget_max_round(self, parent: QLayout, config: dict, window: FluentWindow)-> None:
         def init(widget: SpinCard) -> None:
             widget.set_range(0, 9999999)
@@ -0,0 +1,81 @@
+import bisect
+import itertools
+
+# 片段规划器
+# 在保持条目顺序的前提下切分片段，片段数量与逐条贪心切分相同（即最少），在此基础上让各个片段的 Token 数量尽量均衡，并优先在句子结尾处切分
+class CacheChunkPlanner():
+
+    def __init__(self, limit: int, line_limit: int) -> None:
+        self.limit = limit
+        self.line_limit = line_limit
+
+    # 规划分段内的片段，tokens 为各条目的 Token 数量，breaks 为各条目是否适合作为片段结尾，返回各个片段的 起始位置、结束位置（不含）
+    def plan(self, tokens: list[int], breaks: list[bool]) -> list[tuple[int, int]]:
+        n = len(tokens)
+        if n == 0:
+            return []
+
+        prefix = list(itertools.accumulate(tokens, initial = 0))
+
+        # 从 start 开始的片段最远可以延伸到的位置，第一条不判断是否超限，以避免特别长的文本导致死循环
+        def reach(start: int) -> int:
+            end = bisect.bisect_right(prefix, prefix[start] + self.limit) - 1
+            return max(start + 1, min(end, start + self.line_limit, n))
+
+        # 以 end 结束的片段最早可以开始的位置
+        def reach_back(end: int) -> int:
+            start = bisect.bisect_left(prefix, prefix[end] - self.limit)
+            return min(end - 1, max(start, end - self.line_limit, 0))
+
+        # 从前向后贪心得到各个切分点的上限，从后向前贪心得到各个切分点的下限，两者的片段数量相同
+        uppers: list[int] = []
+        start = 0
+        while start < n:
+            start = reach(start)
+            uppers.append(start)
+
+        lowers: list[int] = []
+        end = n
+        while end > 0:
+            end = reach_back(end)
+            lowers.append(end)
+        lowers = lowers[::-1][1:]
+
+        # 依次在上下限之间选择切分点，优先选择句子结尾，其次选择最接近均分剩余 Token 的位置
+        result: list[tuple[int, int]] = []
+        start = 0
+        count = len(uppers)
+        for k in range(count - 1):
+            target = prefix[start] + (prefix[n] - prefix[start]) / (count - k)
+            end = max(
+                range(max(lowers[k], start + 1), min(uppers[k], reach(start)) + 1),
+                key = lambda i: (breaks[i - 1], -abs(prefix[i] - target)),
+            )
+            result.append((start, end))
+            start = end
+        result.append((start, n))
+
+        return result
+
+    # 按顺序将相邻的小片段合并，sizes 为各片段的 Token 数量与行数，packable 为各片段是否可以与其他片段合并，返回合并后各组片段的 起始位置、结束位置（不含）
+    def pack(self, sizes: list[tuple[int, int]], packable: list[bool]) -> list[tuple[int, int]]:
+        result: list[tuple[int, int]] = []
+        tokens = 0
+        lines = 0
+        for i, (token, line) in enumerate(sizes):
+            if (
+                len(result) > 0
+                and packable[i] == True
+                and packable[result[-1][0]] == True
+                and tokens + token <= self.limit
+                and lines + line <= self.line_limit
+            ):
+                result[-1] = (result[-1][0], i + 1)
+                tokens = tokens + token
+                lines = lines + line
+            else:
+                result.append((i, i + 1))
+                tokens = token
+                lines = line
+
+        return result
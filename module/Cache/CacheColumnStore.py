@@ -0,0 +1,231 @@
+import array
+import itertools
+from typing import Iterator
+
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheTokenCounter import CacheTokenCounter
+
+# 列式存储中条目的视图，只在需要时创建，所有字段均直接读写列式存储
+class CacheItemView(CacheItem):
+
+    __slots__ = (
+        "store",
+        "index",
+    )
+
+    def __init__(self, store: "CacheColumnStore", index: int) -> None:
+        self.store = store
+        self.index = index
+
+    # 获取字段数据
+    def get_vars(self) -> dict:
+        return self.store.get_vars(self.index)
+
+    # 获取原文
+    def get_src(self) -> str:
+        return self.store.src[self.index]
+
+    # 获取译文
+    def get_dst(self) -> str:
+        return self.store.dst[self.index]
+
+    # 获取额外字段原文
+    def get_extra_field(self) -> str:
+        return self.store.extra_field[self.index]
+
+    # 获取标签
+    def get_tag(self) -> str:
+        return self.store.tag[self.index]
+
+    # 获取行号
+    def get_row(self) -> int:
+        return self.store.row[self.index]
+
+    # 获取文件类型
+    def get_file_type(self) -> str:
+        return self.store.file_types.values[self.store.file_type_id[self.index]]
+
+    # 获取文件路径
+    def get_file_path(self) -> str:
+        return self.store.file_paths.values[self.store.file_path_id[self.index]]
+
+    # 获取文本类型
+    def get_text_type(self) -> str:
+        return self.store.text_types.values[self.store.text_type_id[self.index]]
+
+    # 获取翻译状态
+    def get_status(self) -> str:
+        return self.store.statuses.values[self.store.status[self.index]]
+
+    # 获取重试次数
+    def get_retry_count(self) -> int:
+        return self.store.retry_count[self.index]
+
+    # 设置字段值，与 update 一样在锁内先通知观察者，以便快照在条目变化前保存旧值
+    def set_field(self, k: str, v: object) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if self.store.observer is not None:
+                self.store.observer.on_item_update(self)
+            self.store.set_value(self.index, k, v)
+
+    # 更新可变字段，为 None 的参数保持原值不变
+    def update(self, dst: str = None, status: str = None, retry_count: int = None) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if self.store.observer is not None:
+                self.store.observer.on_item_update(self)
+            if dst is not None:
+                self.store.dst[self.index] = dst if isinstance(dst, str) else str(dst)
+            if status is not None and status != self.get_status():
+                old = self.get_status()
+                self.store.status[self.index] = self.store.statuses.get_id(status)
+                if self.store.observer is not None:
+                    self.store.observer.on_item_status_changed(self, old, status)
+            if retry_count is not None:
+                self.store.retry_count[self.index] = retry_count
+
+    # 获取 Token 数量
+    def get_token_count(self) -> int:
+        return self.store.get_token_count(self.index)
+
+    # 将原文切片
+    def split_sub_lines(self) -> list[str]:
+        return [sub_line for sub_line in self.get_src().split("\n") if sub_line.strip() != ""]
+
+# 条目的列式存储，以平行数组保存各个字段，统计与分组等操作均为对数组的扫描，不需要遍历条目对象
+class CacheColumnStore():
+
+    # 驻留表
+    class InternTable():
+
+        def __init__(self) -> None:
+            self.values: list[str] = []
+            self.ids: dict[str, int] = {}
+
+        # 获取值的编号，不存在时添加
+        def get_id(self, value: str) -> int:
+            if value not in self.ids:
+                self.ids[value] = len(self.values)
+                self.values.append(value)
+
+            return self.ids.get(value)
+
+        # 查找值的编号，不存在时返回 -1
+        def find_id(self, value: str) -> int:
+            return self.ids.get(value, -1)
+
+    def __init__(self, items: list[CacheItem] = None) -> None:
+        # 字符串字段
+        self.src: list[str] = []
+        self.dst: list[str] = []
+        self.extra_field: list[str] = []
+        self.tag: list[str] = []
+
+        # 数值字段
+        self.row: array.array = array.array("q")
+        self.retry_count: array.array = array.array("i")
+        self.token_count: array.array = array.array("i")                # -1 表示尚未计算
+
+        # 驻留字段，数组中只保存编号，值保存在对应的驻留表中
+        self.status: bytearray = bytearray()
+        self.file_type_id: array.array = array.array("i")
+        self.file_path_id: array.array = array.array("i")
+        self.text_type_id: array.array = array.array("i")
+        self.statuses = CacheColumnStore.InternTable()
+        self.file_types = CacheColumnStore.InternTable()
+        self.file_paths = CacheColumnStore.InternTable()
+        self.text_types = CacheColumnStore.InternTable()
+
+        # 条目变化时的通知对象
+        self.observer = None
+
+        # 初始化
+        if items is not None:
+            self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def __getitem__(self, index: int | slice) -> CacheItemView | list[CacheItemView]:
+        if isinstance(index, slice):
+            return [CacheItemView(self, i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index = index + len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(index)
+
+        return CacheItemView(self, index)
+
+    def __iter__(self) -> Iterator[CacheItemView]:
+        for i in range(len(self)):
+            yield CacheItemView(self, i)
+
+    # 添加条目
+    def append(self, item: CacheItem) -> None:
+        self.src.append(item.get_src())
+        self.dst.append(item.get_dst())
+        self.extra_field.append(item.get_extra_field())
+        self.tag.append(item.get_tag())
+        self.row.append(item.get_row())
+        self.retry_count.append(item.get_retry_count())
+        self.token_count.append(-1)
+        self.status.append(self.statuses.get_id(item.get_status()))
+        self.file_type_id.append(self.file_types.get_id(item.get_file_type()))
+        self.file_path_id.append(self.file_paths.get_id(item.get_file_path()))
+        self.text_type_id.append(self.text_types.get_id(item.get_text_type()))
+
+    # 批量添加条目
+    def extend(self, items: list[CacheItem]) -> None:
+        for item in items:
+            self.append(item)
+
+    # 获取条目的字段数据
+    def get_vars(self, index: int) -> dict:
+        return {
+            "src": self.src[index],
+            "dst": self.dst[index],
+            "extra_field": self.extra_field[index],
+            "tag": self.tag[index],
+            "row": self.row[index],
+            "file_type": self.file_types.values[self.file_type_id[index]],
+            "file_path": self.file_paths.values[self.file_path_id[index]],
+            "text_type": self.text_types.values[self.text_type_id[index]],
+            "status": self.statuses.values[self.status[index]],
+            "retry_count": self.retry_count[index],
+        }
+
+    # 设置条目的字段值，不包括可变字段（译文、翻译状态、重试次数）
+    def set_value(self, index: int, k: str, v: object) -> None:
+        if k == "file_type":
+            self.file_type_id[index] = self.file_types.get_id(v)
+        elif k == "file_path":
+            self.file_path_id[index] = self.file_paths.get_id(v)
+        elif k == "text_type":
+            self.text_type_id[index] = self.text_types.get_id(v)
+        else:
+            getattr(self, k)[index] = v
+
+        # 原文变化时 Token 数量需要重新计算
+        if k == "src":
+            self.token_count[index] = -1
+
+    # 获取条目的 Token 数量
+    def get_token_count(self, index: int) -> int:
+        if self.token_count[index] < 0:
+            self.token_count[index] = CacheTokenCounter.get(self.src[index])
+
+        return self.token_count[index]
+
+    # 获取条目数量（根据翻译状态）
+    def count_by_status(self, status: str) -> int:
+        status_id = self.statuses.find_id(status)
+        if status_id < 0:
+            return 0
+
+        return self.status.count(status_id)
+
+    # 获取条目位置（根据翻译状态）
+    def get_indices_by_status(self, statuses: tuple[str]) -> list[int]:
+        # 将状态编号映射为 0/1 掩码，由 translate 与 compress 在 C 层完成扫描
+        table = bytes(1 if i < len(self.statuses.values) and self.statuses.values[i] in statuses else 0 for i in range(256))
+        return list(itertools.compress(range(len(self)), self.status.translate(table)))
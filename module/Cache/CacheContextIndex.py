@@ -0,0 +1,65 @@
+import array
+from typing import Iterator
+
+from base.Base import Base
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheColumnStore import CacheColumnStore
+
+# 参考上文索引
+# 通过一次正向遍历，记录每个位置之前最近的有效条目（未排除且原文不为空），以及同一文件内以每个有效条目结尾、连续以句末标点结尾的有效条目数量
+# 任意位置的参考上文只需要沿有效条目回溯至多 阈值 个条目，条目的原文与排除状态不变时，索引可以在多次生成片段之间复用
+class CacheContextIndex():
+
+    def __init__(self, items: list[CacheItem], punctuation: tuple[str]) -> None:
+        self.items = items
+        self.previous: array.array = array.array("i")                  # 位置 -> 之前最近的有效条目的位置，没有时为 -1
+        self.runs: array.array = array.array("i")                      # 有效条目的位置 -> 以其结尾的连续句末条目数量
+
+        previous = -1
+        previous_file_path = None
+        for i, (status, src, file_path) in enumerate(self.get_rows(items)):
+            self.previous.append(previous)
+
+            # 跳过 已排除 的数据与空数据
+            src = src.strip()
+            if status == Base.TranslationStatus.EXCLUDED or src == "":
+                self.runs.append(0)
+                continue
+
+            # 以指定标点结尾时，与同一文件内之前的有效条目连成一段
+            if not src.endswith(punctuation):
+                self.runs.append(0)
+            elif previous >= 0 and file_path == previous_file_path:
+                self.runs.append(self.runs[previous] + 1)
+            else:
+                self.runs.append(1)
+
+            previous = i
+            previous_file_path = file_path
+
+    def __len__(self) -> int:
+        return len(self.previous)
+
+    # 遍历条目的 翻译状态、原文、文件路径
+    def get_rows(self, items: list[CacheItem]) -> Iterator[tuple[str, str, object]]:
+        if isinstance(items, CacheColumnStore):
+            statuses = items.statuses.values
+            return ((statuses[status], src, file_path) for status, src, file_path in zip(items.status, items.src, items.file_path_id))
+        else:
+            return ((item.get_status(), item.get_src(), item.get_file_path()) for item in items)
+
+    # 获取位置 start_index 之前的参考上文，候选数据与 start_item 不在同一个文件时返回空列表
+    def get(self, start_item: CacheItem, start_index: int, threshold: int) -> list[CacheItem]:
+        if start_index >= len(self.previous):
+            return []
+
+        i = self.previous[start_index]
+        if i < 0 or self.items[i].get_file_path() != start_item.get_file_path():
+            return []
+
+        result: list[CacheItem] = []
+        for _ in range(min(self.runs[i], threshold)):
+            result.append(self.items[i])
+            i = self.previous[i]
+
+        return sorted(result, key = lambda x: x.get_row(), reverse = False)
@@ -0,0 +1,75 @@
+import sqlite3
+from contextlib import closing
+
+from base.Base import Base
+from module.Cache.CacheItem import CacheItem
+
+class CacheDatabase(Base):
+
+    # 条目字段
+    FIELDS: tuple[str] = (
+        "src",
+        "dst",
+        "extra_field",
+        "tag",
+        "row",
+        "file_type",
+        "file_path",
+        "text_type",
+        "status",
+        "retry_count",
+    )
+
+    # 表结构
+    SCHEMA: tuple[str] = (
+        "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, src TEXT, dst TEXT, extra_field TEXT, tag TEXT, row INTEGER, file_type TEXT, file_path TEXT, text_type TEXT, status TEXT, retry_count INTEGER)",
+    )
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+
+        # 初始化
+        self.path = path
+
+    # 连接数据库
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        for sql in CacheDatabase.SCHEMA:
+            connection.execute(sql)
+
+        return connection
+
+    # 写入全部条目
+    def save_items(self, items: list[dict]) -> None:
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.execute("DELETE FROM items")
+                connection.executemany(
+                    f"INSERT INTO items (id, {", ".join(CacheDatabase.FIELDS)}) VALUES (?, {", ".join("?" for _ in CacheDatabase.FIELDS)})",
+                    (
+                        (i, *(item.get(k) for k in CacheDatabase.FIELDS))
+                        for i, item in enumerate(items)
+                    ),
+                )
+
+    # 更新条目的译文、翻译状态与重试次数
+    def update_items(self, records: list[dict]) -> None:
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.executemany(
+                    "UPDATE items SET dst = ?, status = ?, retry_count = ? WHERE id = ?",
+                    (
+                        (record.get("dst"), record.get("status"), record.get("retry_count"), record.get("index"))
+                        for record in records
+                    ),
+                )
+
+    # 读取全部条目
+    def load_items(self) -> list[CacheItem]:
+        with closing(self.connect()) as connection:
+            return [
+                CacheItem(dict(zip(CacheDatabase.FIELDS, row)), detect_text_type = False)
+                for row in connection.execute(f"SELECT {", ".join(CacheDatabase.FIELDS)} FROM items ORDER BY id")
+            ]
@@ -1,19 +1,12 @@
 import re
 import threading
 
-import tiktoken
-import tiktoken_ext
-from tiktoken_ext import openai_public
-
 from base.Base import Base
 from base.BaseData import BaseData
+from module.Cache.CacheTokenCounter import CacheTokenCounter
 
 class CacheItem(BaseData):
 
-    # 必须显式的引用这两个库，否则打包后会报错
-    tiktoken_ext
-    openai_public
-
     class FileType():
 
         MD: str = "MD"                                  # .md Markdown
@@ -35,9 +28,6 @@ class CacheItem(BaseData):
         RENPY: str = "RENPY"                            # RENPY 游戏文本
         RPGMAKER: str = "RPGMAKER"                      # RPGMAKER 游戏文本
 
-    # 缓存 Token 数量
-    TOKEN_COUNT_CACHE: dict[str, int] = {}
-
     # RENPY - {w=2.3} [renpy.version_only]
     RE_RENPY = re.compile(r"\{[^{}]*\}|\[[^\[\]]*\]", flags = re.IGNORECASE)
 
@@ -50,155 +40,177 @@ class CacheItem(BaseData):
     # RPGMaker - if(!s[982]) if(v[982] >= 1)  en(!s[982]) en(v[982] >= 1)
     RE_RPGMAKER_IF = re.compile(r"en\(.{0,8}[vs]\[\d+\].{0,16}\)|if\(.{0,8}[vs]\[\d+\].{0,16}\)", flags = re.IGNORECASE)
 
-    def __init__(self, args: dict) -> None:
+    # 字段名
+    FIELDS: tuple[str] = (
+        "src",
+        "dst",
+        "extra_field",
+        "tag",
+        "row",
+        "file_type",
+        "file_path",
+        "text_type",
+        "status",
+        "retry_count",
+    )
+
+    # 使用 __slots__ 存储字段，避免为每个条目分配实例字典
+    __slots__ = (
+        *FIELDS,
+        "observer",
+    )
+
+    # 类线程锁，可变字段（译文、翻译状态、重试次数）只通过 update 方法在此锁内更新
+    UPDATE_LOCK = threading.Lock()
+
+    def __init__(self, args: dict, detect_text_type: bool = True) -> None:
         super().__init__()
 
-        # 默认值
-        self.src: str = ""                                              # 原文
-        self.dst: str = ""                                              # 译文
-        self.extra_field: str = ""                                      # 额外字段原文，在以下类型中使用：ASS、SRT、RENPY、MESSAGEJSON
-        self.tag: str = ""                                              # 标签，在以下类型中使用：EPUB
-        self.row: int = 0                                               # 在原始文件中的行号
-        self.file_type: str = ""                                        # 原始文件的类型
-        self.file_path: str = ""                                        # 原始文件的相对路径
-        self.text_type: str = CacheItem.TextType.NONE                   # 文本的实际类型
-        self.status: str = Base.TranslationStatus.UNTRANSLATED          # 翻译状态
-        self.retry_count: int = 0                                       # 重试次数，当前只有单独重试的时候才增加此计数
-
-        # 初始化
-        for k, v in args.items():
-            setattr(self, k, v)
-
-        # 线程锁
-        self.lock = threading.Lock()
+        # 初始化，未提供的字段使用默认值
+        self.src: str = args.get("src", "")                                                         # 原文
+        self.dst: str = args.get("dst", "")                                                         # 译文
+        self.extra_field: str = args.get("extra_field", "")                                         # 额外字段原文，在以下类型中使用：ASS、SRT、RENPY、MESSAGEJSON
+        self.tag: str = args.get("tag", "")                                                         # 标签，在以下类型中使用：EPUB
+        self.row: int = args.get("row", 0)                                                          # 在原始文件中的行号
+        self.file_type: str = args.get("file_type", "")                                             # 原始文件的类型
+        self.file_path: str = args.get("file_path", "")                                             # 原始文件的相对路径
+        self.text_type: str = args.get("text_type", CacheItem.TextType.NONE)                        # 文本的实际类型
+        self.status: str = args.get("status", Base.TranslationStatus.UNTRANSLATED)                  # 翻译状态
+        self.retry_count: int = args.get("retry_count", 0)                                          # 重试次数，当前只有单独重试的时候才增加此计数
+        self.observer = None                                                                        # 条目变化时的通知对象，需实现 on_item_update 与 on_item_status_changed 方法
+
+        # 从缓存中恢复的条目已经判断过文本类型，无需重复判断
+        if detect_text_type == False:
+            return None
 
         # 如果文件类型是 XLSX、TRANS、KVJSON、MESSAGEJSON，且没有文本类型，则判断实际的文本类型
         types = (CacheItem.FileType.XLSX, CacheItem.FileType.TRANS, CacheItem.FileType.KVJSON, CacheItem.FileType.MESSAGEJSON)
-        if self.get_file_type() in types and self.get_text_type() == CacheItem.TextType.NONE:
-            if len(CacheItem.RE_WOLF.findall(self.get_src())) > 0:
+        if self.file_type in types and self.text_type == CacheItem.TextType.NONE:
+            if len(CacheItem.RE_WOLF.findall(self.src)) > 0:
                 self.text_type = CacheItem.TextType.WOLF
-            elif len(CacheItem.RE_RPGMAKER.findall(self.get_src())) > 0 or len(CacheItem.RE_RPGMAKER_IF.findall(self.get_src())) > 0:
+            elif len(CacheItem.RE_RPGMAKER.findall(self.src)) > 0 or len(CacheItem.RE_RPGMAKER_IF.findall(self.src)) > 0:
                 self.text_type = CacheItem.TextType.RPGMAKER
-            elif len(CacheItem.RE_RENPY.findall(self.get_src())) > 0:
+            elif len(CacheItem.RE_RENPY.findall(self.src)) > 0:
                 self.text_type = CacheItem.TextType.RENPY
 
+    # 获取字段数据
+    def get_vars(self) -> dict:
+        return {k: getattr(self, k) for k in CacheItem.FIELDS}
+
     # 获取原文
     def get_src(self) -> str:
-        with self.lock:
-            return self.src
+        return self.src
 
     # 设置原文
     def set_src(self, src: str) -> None:
-        with self.lock:
-            self.src = src
+        self.set_field("src", src)
 
     # 获取译文
     def get_dst(self) -> str:
-        with self.lock:
-            return self.dst
+        return self.dst
 
     # 设置译文
     def set_dst(self, dst: str) -> None:
-        with self.lock:
-            # 有时候模型的回复反序列化以后会是 int 等非字符类型，所以这里要强制转换成字符串
-            # TODO:可能需要更好的处理方式
-            if isinstance(dst, str):
-                self.dst = dst
-            else:
-                self.dst = str(dst)
+        self.update(dst = dst)
 
     # 获取额外字段原文
     def get_extra_field(self) -> str:
-        with self.lock:
-            return self.extra_field
+        return self.extra_field
 
     # 设置额外字段原文
     def set_extra_field(self, extra_field: str) -> None:
-        with self.lock:
-            self.extra_field = extra_field
+        self.set_field("extra_field", extra_field)
 
     # 获取标签
     def get_tag(self) -> str:
-        with self.lock:
-            return self.tag
+        return self.tag
 
     # 设置标签
     def set_tag(self, tag: str) -> None:
-        with self.lock:
-            self.tag = tag
+        self.set_field("tag", tag)
 
     # 获取行号
     def get_row(self) -> int:
-        with self.lock:
-            return self.row
+        return self.row
 
     # 设置行号
     def set_row(self, row: int) -> None:
-        with self.lock:
-            self.row = row
+        self.set_field("row", row)
 
     # 获取文件类型
     def get_file_type(self) -> str:
-        with self.lock:
-            return self.file_type
+        return self.file_type
 
     # 设置文件类型
     def set_file_type(self, type: str) -> None:
-        with self.lock:
-            self.file_type = type
+        self.set_field("file_type", type)
 
     # 获取文件路径
     def get_file_path(self) -> str:
-        with self.lock:
-            return self.file_path
+        return self.file_path
 
     # 设置文件路径
     def set_file_path(self, path: str) -> None:
-        with self.lock:
-            self.file_path = path
+        self.set_field("file_path", path)
 
     # 获取文本类型
     def get_text_type(self) -> str:
-        with self.lock:
-            return self.text_type
+        return self.text_type
 
     # 设置文本类型
     def set_text_type(self, type: str) -> None:
-        with self.lock:
-            self.text_type = type
+        self.set_field("text_type", type)
 
     # 获取翻译状态
     def get_status(self) -> int:
-        with self.lock:
-            return self.status
+        return self.status
 
     # 设置翻译状态
     def set_status(self, status: int) -> None:
-        with self.lock:
-            self.status = status
+        self.update(status = status)
 
     # 获取重试次数
     def get_retry_count(self) -> int:
-        with self.lock:
-            return self.retry_count
+        return self.retry_count
 
     # 设置重试次数
     def set_retry_count(self, retry_count: int) -> None:
-        with self.lock:
-            self.retry_count = retry_count
+        self.update(retry_count = retry_count)
+
+    # 设置字段值，与 update 一样在锁内先通知观察者，以便快照在条目变化前保存旧值
+    def set_field(self, k: str, v: object) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if self.observer is not None:
+                self.observer.on_item_update(self)
+            setattr(self, k, v)
+
+    # 更新可变字段，为 None 的参数保持原值不变
+    def update(self, dst: str = None, status: str = None, retry_count: int = None) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if self.observer is not None:
+                self.observer.on_item_update(self)
+            if dst is not None:
+                # 有时候模型的回复反序列化以后会是 int 等非字符类型，所以这里要强制转换成字符串
+                # TODO:可能需要更好的处理方式
+                if isinstance(dst, str):
+                    self.dst = dst
+                else:
+                    self.dst = str(dst)
+            if status is not None and status != self.status:
+                old = self.status
+                self.status = status
+                if self.observer is not None:
+                    self.observer.on_item_status_changed(self, old, status)
+            if retry_count is not None:
+                self.retry_count = retry_count
 
     # 获取 Token 数量
     def get_token_count(self) -> int:
-        with self.lock:
-            if self.src not in CacheItem.TOKEN_COUNT_CACHE:
-                CacheItem.TOKEN_COUNT_CACHE[self.src] = len(tiktoken.get_encoding("o200k_base").encode(self.src))
-
-            return CacheItem.TOKEN_COUNT_CACHE[self.src]
+        return CacheTokenCounter.get(self.src)
 
     # 将原文切片
     def split_sub_lines(self) -> list[str]:
-        with self.lock:
-            return [sub_line for sub_line in self.src.split("\n") if sub_line.strip() != ""]
+        return [sub_line for sub_line in self.src.split("\n") if sub_line.strip() != ""]
 
     # 从切片中合并译文
     def merge_sub_lines(self, dst_sub_lines: list[str], check_result: list[int]) -> tuple[str, list[str], list[int]]:
@@ -210,7 +222,7 @@ class CacheItem(BaseData):
 
         dst = ""
         check = []
-        for src_sub_line in self.src.split("\n"):
+        for src_sub_line in self.get_src().split("\n"):
             if src_sub_line == "":
                 dst = dst + "\n"
             elif src_sub_line.strip() == "":
@@ -1,13 +1,31 @@
 import os
+import re
 import time
+import codecs
+import shutil
 import threading
+import collections
+from json import JSONDecoder
+from json import JSONDecodeError
+from typing import Callable
+from typing import Iterator
 
 import rapidjson as json
+from tqdm import tqdm
 
 from base.Base import Base
 from module.Cache.CacheItem import CacheItem
 from module.Cache.CacheProject import CacheProject
+from module.Cache.CacheDatabase import CacheDatabase
+from module.Cache.CacheShards import CacheShards
+from module.Cache.CacheSnapshot import CacheSnapshot
+from module.Cache.CacheChunkPlanner import CacheChunkPlanner
+from module.Cache.CacheContextIndex import CacheContextIndex
+from module.Cache.CacheTokenCounter import CacheTokenCounter
+from module.Cache.CacheColumnStore import CacheItemView
+from module.Cache.CacheColumnStore import CacheColumnStore
 from module.Localizer.Localizer import Localizer
+from module.Normalizer import Normalizer
 from module.ExpertConfig import ExpertConfig
 
 class CacheManager(Base):
@@ -15,6 +33,15 @@ class CacheManager(Base):
     # 缓存文件保存周期（秒）
     SAVE_INTERVAL = 15
 
+    # 缓存日志压缩阈值（条），日志记录数超过阈值时重写包含变化条目的分片
+    JOURNAL_COMPACT_THRESHOLD = 4096
+
+    # 流式读取缓存文件时每次读取的字节数
+    LOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+    # 数组元素之间的空白与分隔符
+    RE_SEPARATOR = re.compile(r"[\s,]*")
+
     # 结尾标点符号
     END_LINE_PUNCTUATION = (
         ".",
@@ -31,6 +58,13 @@ class CacheManager(Base):
         "」",
     )
 
+    # 无需翻译的状态
+    SKIPPED_STATUSES = (
+        Base.TranslationStatus.EXCLUDED,
+        Base.TranslationStatus.TRANSLATED,
+        Base.TranslationStatus.TRANSLATED_IN_PAST,
+    )
+
     # 类线程锁
     FILE_LOCK = threading.Lock()
 
@@ -41,6 +75,38 @@ class CacheManager(Base):
         self.project: CacheProject = CacheProject({})
         self.items: list[CacheItem] = []
 
+        # 缓存日志
+        self.journal: list[dict] = []                               # 尚未写入文件的日志记录
+        self.journal_count: int = 0                                 # 已写入文件的日志记录数
+        self.journal_base_path: str = None                          # 与当前条目列表对应的快照所在的目录
+        self.journal_base_count: int = 0                            # 快照中的条目数量
+        self.item_index: dict[int, int] = {}                        # 条目到其在列表中的位置的映射，列式存储时不需要
+        self.shards: list[dict] = []                                # 快照的分片清单
+        self.dirty_indices: set[int] = set()                        # 快照写入后发生了变化的条目位置
+        self.project_data: dict[str, str] = {}                      # 各个目录中最后一次写入的项目数据，未变化时无需重复写入
+
+        # 翻译状态计数与待翻译条目索引，在 CacheItem.UPDATE_LOCK 内随条目状态变化实时更新
+        self.status_count: dict[str, int] = {}
+        self.status_count_total: int = 0                            # 计数时的条目数量，与当前条目数量不一致时需要重新计数
+        self.pending_indices: dict[int, None] = {}                  # 待翻译条目的位置，以字典保持顺序
+        self.pending_sorted: bool = True                            # 待翻译条目的位置是否有序
+
+        # 尚未释放的快照，在 CacheItem.UPDATE_LOCK 内随条目变化保存旧值
+        self.snapshots: list[CacheSnapshot] = []
+
+        # 项目内去重
+        self.duplicates: dict[int, list[int]] = {}                  # 代表条目的位置 -> 原文相同的其他条目的位置
+        self.duplicate_indices: set[int] = set()                    # 由代表条目代为翻译的条目的位置
+
+        # 参考上文索引，条目的排除状态发生变化时失效
+        self.context_index: CacheContextIndex = None
+
+        # 最近一次生成的片段的 Token 利用率
+        self.chunk_utilization: float = 0.0
+
+        # 线程锁
+        self.journal_lock = threading.Lock()
+
         # 启动定时任务
         if tick == True:
             self.subscribe(Base.Event.APP_SHUT_DOWN, self.app_shut_down)
@@ -55,21 +121,112 @@ class CacheManager(Base):
         # 创建上级文件夹
         os.makedirs(f"{output_folder}/cache", exist_ok = True)
 
+        # 完整快照已经包含了此前所有的变更，因此需要同时清空缓存日志
+        # 当前条目列表通过写时复制快照读取，读取期间不会阻塞翻译任务
+        with self.journal_lock:
+            if items is self.items:
+                self.journal = []
+                self.journal_count = 0
+                _, snapshot = self.create_dirty_snapshot()
+            else:
+                snapshot = None
+
+        if snapshot is not None:
+            with snapshot:
+                data = snapshot.get_vars_list()
+        else:
+            data = [item.get_vars() for item in items]
+
         # 保存缓存到文件
-        path = f"{output_folder}/cache/items.json"
+        storage = self.get_storage_format()
         with CacheManager.FILE_LOCK:
             try:
-                with open(path, "w", encoding = "utf-8") as writer:
-                    writer.write(json.dumps([item.get_vars() for item in items], indent = None, ensure_ascii = False))
+                shards: list[dict] = []
+                if storage == "sqlite":
+                    CacheDatabase(f"{output_folder}/cache/items.db").save_items(data)
+                elif storage == "shards":
+                    # 分片以新的文件名写入，清单替换完成之前旧的快照始终保持有效
+                    shards = CacheShards(f"{output_folder}/cache/items").save_all(data)
+                else:
+                    self.save_items_to_json(f"{output_folder}/cache/items.json", data)
+
+                # 移除其他格式的快照与已经过期的缓存日志
+                self.remove_stale_snapshots(output_folder, storage)
+                self.remove_files(f"{output_folder}/cache/items.journal")
+
+                # 更新快照状态
+                if items is self.items:
+                    with self.journal_lock:
+                        self.shards = shards
+                        self.journal_base_path = output_folder
+                        if self.journal_base_count != len(self.items):
+                            self.journal_base_count = len(self.items)
+                            self.item_index = self.build_item_index(self.items)
             except Exception as e:
+                # 写入失败时，下次保存需要重写完整快照
+                if items is self.items:
+                    with self.journal_lock:
+                        self.journal_base_path = None
                 self.debug(Localizer.get().log_write_cache_file_fail, e)
 
         # 保存项目数据到文件
+        self.save_project_to_file(project, output_folder)
+
+        # 保存 Token 数量缓存到文件
+        CacheTokenCounter.save_to_file(f"{output_folder}/cache/tokens.bin", (v.get("src") for v in data))
+
+    # 移除文件
+    def remove_files(self, *paths: str) -> None:
+        for path in paths:
+            for v in (path, f"{path}-wal", f"{path}-shm"):
+                if os.path.isfile(v):
+                    os.remove(v)
+
+    # 写入单文件快照，以临时文件写入，替换完成之前旧的快照始终保持有效
+    def save_items_to_json(self, path: str, data: list[dict]) -> None:
+        with open(f"{path}.tmp", "w", encoding = "utf-8") as writer:
+            writer.write(json.dumps(data, indent = None, ensure_ascii = False))
+        os.replace(f"{path}.tmp", path)
+
+    # 移除其他格式的快照，避免切换格式后读取到过期的数据，移除时在日志中告知用户
+    def remove_stale_snapshots(self, output_folder: str, storage: str) -> None:
+        paths = {
+            "json": f"{output_folder}/cache/items.json",
+            "shards": f"{output_folder}/cache/items",
+            "sqlite": f"{output_folder}/cache/items.db",
+        }
+        for k, path in paths.items():
+            if k == storage or not os.path.exists(path):
+                continue
+
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors = True)
+            else:
+                self.remove_files(path)
+            self.info(Localizer.get().log_cache_storage_migrated.replace("{FORMAT}", storage).replace("{PATH}", path))
+
+    # 获取缓存数据的存储格式，可选值为 json（单文件快照）、shards（按文件分片的快照）、sqlite（数据库）
+    def get_storage_format(self) -> str:
+        if ExpertConfig.get().cache_storage_backend == "sqlite":
+            return "sqlite"
+        elif ExpertConfig.get().cache_sharding_enable == True:
+            return "shards"
+        else:
+            return "json"
+
+    # 保存项目数据到文件
+    def save_project_to_file(self, project: CacheProject, output_folder: str) -> None:
         path = f"{output_folder}/cache/project.json"
+        data = json.dumps(project.get_vars(), indent = None, ensure_ascii = False)
         with CacheManager.FILE_LOCK:
+            # 项目数据没有变化时无需重复写入
+            if self.project_data.get(output_folder) == data and os.path.isfile(path):
+                return None
+
             try:
                 with open(path, "w", encoding = "utf-8") as writer:
-                    writer.write(json.dumps(project.get_vars(), indent = None, ensure_ascii = False))
+                    writer.write(data)
+                self.project_data[output_folder] = data
             except Exception as e:
                 self.debug(Localizer.get().log_write_cache_file_fail, e)
 
@@ -88,12 +245,8 @@ class CacheManager(Base):
                 folder_path = f"{self.save_to_file_require_path}/cache"
                 os.makedirs(folder_path, exist_ok = True)
 
-                # 保存缓存到文件
-                self.save_to_file(
-                    project = self.project,
-                    items = self.items,
-                    output_folder = self.save_to_file_require_path,
-                )
+                # 保存缓存日志到文件，必要时重写完整快照
+                self.save_journal_to_file(self.save_to_file_require_path)
 
                 # 触发事件
                 self.emit(Base.Event.CACHE_FILE_AUTO_SAVE, {})
@@ -101,6 +254,84 @@ class CacheManager(Base):
                 # 重置标志
                 self.save_to_file_require_flag = False
 
+    # 保存缓存日志到文件
+    def save_journal_to_file(self, output_folder: str) -> None:
+        # 以下情况时，需要重写完整快照：
+        # 1. 快照不存在或与当前条目列表不对应
+        # 2. 条目列表发生了变化（例如 MTool 优化器后处理追加了条目）
+        # 3. 日志记录数超过阈值，且使用单文件快照
+        # 日志记录数超过阈值时，分片快照只重写包含变化条目的分片来压缩日志（数据库直接原地更新，无需压缩）
+        storage = self.get_storage_format()
+        with self.journal_lock:
+            rebuild = self.journal_base_path != output_folder or self.journal_base_count != len(self.items)
+            compact = (
+                rebuild == False
+                and storage != "sqlite"
+                and self.journal_count + len(self.journal) >= CacheManager.JOURNAL_COMPACT_THRESHOLD
+            )
+            if compact == True and storage == "json":
+                rebuild = True
+                compact = False
+
+            if rebuild == True:
+                pass
+            elif compact == True:
+                self.journal = []
+                self.journal_count = 0
+                dirty, snapshot = self.create_dirty_snapshot()
+            else:
+                records, self.journal = self.journal, []
+                self.journal_count = self.journal_count + len(records)
+
+        if rebuild == True:
+            self.save_to_file(
+                project = self.project,
+                items = self.items,
+                output_folder = output_folder,
+            )
+            return None
+
+        with CacheManager.FILE_LOCK:
+            try:
+                if compact == True:
+                    with snapshot:
+                        shards = CacheShards(f"{output_folder}/cache/items").save_dirty(self.shards, dirty, snapshot.get_vars)
+                    self.remove_files(f"{output_folder}/cache/items.journal")
+                    with self.journal_lock:
+                        self.shards = shards
+                elif len(records) > 0:
+                    if storage == "sqlite":
+                        CacheDatabase(f"{output_folder}/cache/items.db").update_items(records)
+                    else:
+                        with open(f"{output_folder}/cache/items.journal", "a", encoding = "utf-8") as writer:
+                            writer.write("".join(json.dumps(record, indent = None, ensure_ascii = False) + "\n" for record in records))
+            except Exception as e:
+                # 写入失败时，下次保存需要重写完整快照
+                with self.journal_lock:
+                    self.journal_base_path = None
+                self.debug(Localizer.get().log_write_cache_file_fail, e)
+
+        # 保存项目数据到文件
+        self.save_project_to_file(self.project, output_folder)
+
+        # 保存 Token 数量缓存到文件
+        CacheTokenCounter.save_to_file(f"{output_folder}/cache/tokens.bin", self.get_srcs())
+
+    # 追加缓存日志
+    def append_journal(self, items: list[CacheItem]) -> None:
+        with self.journal_lock:
+            for item in items:
+                index = self.get_item_index(item)
+                if index is None:
+                    continue
+
+                self.journal.append({
+                    "index": index,
+                    "dst": item.get_dst(),
+                    "status": item.get_status(),
+                    "retry_count": item.get_retry_count(),
+                })
+
     # 请求保存缓存到文件
     def require_save_to_file(self, output_path: str) -> None:
         self.save_to_file_require_flag = True
@@ -109,11 +340,39 @@ class CacheManager(Base):
     # 从文件读取数据
     def load_from_file(self, output_path: str) -> None:
         path = f"{output_path}/cache/items.json"
+        path_database = f"{output_path}/cache/items.db"
+        shards = CacheShards(f"{output_path}/cache/items")
+        storage = self.get_storage_format()
         with CacheManager.FILE_LOCK:
             try:
-                if os.path.isfile(path):
-                    with open(path, "r", encoding = "utf-8-sig") as reader:
-                        self.items = [CacheItem(item) for item in json.load(reader)]
+                # 优先读取当前存储格式的快照，不存在时再导入其他格式的快照，下次保存完整快照时转换为当前格式
+                exists = {
+                    "json": os.path.isfile(path),
+                    "shards": shards.exists(),
+                    "sqlite": os.path.isfile(path_database),
+                }
+                found = next((v for v in (storage, "json", "shards", "sqlite") if exists.get(v) == True), None)
+
+                manifest: dict = {}
+                journal_count: int = 0
+                if found == "sqlite":
+                    self.set_items(CacheDatabase(path_database).load_items())
+                elif found == "shards":
+                    manifest = shards.load_manifest()
+                    self.set_items(self.load_items_from_json([f"{shards.path}/{shard.get("name")}" for shard in manifest.get("shards")]))
+                elif found == "json":
+                    self.set_items(self.load_items_from_json([path]))
+
+                # 在快照的基础上重放缓存日志
+                if found in ("json", "shards"):
+                    journal_count = self.replay_journal(f"{output_path}/cache/items.journal")
+
+                # 读取的是当前格式的快照时，之后只需要追加缓存日志
+                if found is not None and found == storage:
+                    with self.journal_lock:
+                        self.shards = manifest.get("shards", [])
+                        self.journal_count = journal_count
+                        self.journal_base_path = output_path
             except Exception as e:
                 self.debug(Localizer.get().log_read_cache_file_fail, e)
 
@@ -126,6 +385,94 @@ class CacheManager(Base):
             except Exception as e:
                 self.debug(Localizer.get().log_read_cache_file_fail, e)
 
+        # 读取 Token 数量缓存，继续翻译时无需重新计算
+        CacheTokenCounter.load_from_file(f"{output_path}/cache/tokens.bin")
+
+    # 流式读取条目，边读取边生成条目，避免一次性解析整个文件
+    def load_items_from_json(self, paths: list[str]) -> list[CacheItem]:
+        # 启用列式存储时直接写入列式存储，不保留中间的条目对象
+        if ExpertConfig.get().cache_columnar_enable == True:
+            items = CacheColumnStore()
+        else:
+            items = []
+
+        total = sum(os.path.getsize(path) for path in paths)
+        loaded = 0
+        percent = -1
+
+        # 报告读取进度
+        def update_progress(size: int) -> None:
+            nonlocal loaded, percent
+            loaded = loaded + size
+            progress.update(size)
+            if int(loaded * 100 / max(1, total)) != percent:
+                percent = int(loaded * 100 / max(1, total))
+                self.emit(Base.Event.CACHE_FILE_LOAD_UPDATE, {
+                    "percent": percent,
+                })
+
+        try:
+            with tqdm(total = total, unit = "B", unit_scale = True, desc = Localizer.get().translator_load_cache) as progress:
+                for path in paths:
+                    for item in self.read_json_array(path, update_progress):
+                        items.append(CacheItem(item, detect_text_type = False))
+        finally:
+            # 无论读取是否成功，都需要报告读取结束
+            if percent < 100:
+                self.emit(Base.Event.CACHE_FILE_LOAD_UPDATE, {
+                    "percent": 100,
+                })
+
+        return items
+
+    # 逐个读取 JSON 数组中的元素，每读取一块数据时通过回调报告读取的字节数
+    def read_json_array(self, path: str, callback: Callable[[int], None]) -> Iterator[dict]:
+        decoder = JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        buffer: str = ""
+        pos: int = 0
+        eof: bool = False
+        started: bool = False
+
+        with open(path, "rb") as reader:
+            while True:
+                pos = CacheManager.RE_SEPARATOR.match(buffer, pos).end()
+
+                # 数组的起始符号
+                if started == False and pos < len(buffer):
+                    if buffer[pos] != "[":
+                        raise JSONDecodeError("Expecting '['", buffer, pos)
+
+                    started = True
+                    pos = pos + 1
+                    continue
+
+                # 数组的结束符号
+                if pos < len(buffer) and buffer[pos] == "]":
+                    break
+
+                # 解析下一个元素，元素不完整时说明其余部分尚未读取，读取下一块数据后重试
+                if pos < len(buffer):
+                    try:
+                        item, pos = decoder.raw_decode(buffer, pos)
+                    except JSONDecodeError:
+                        if eof == True:
+                            raise
+                    else:
+                        yield item
+                        continue
+
+                # 文件已经读完
+                if eof == True:
+                    break
+
+                # 读取下一块数据
+                data = reader.read(CacheManager.LOAD_CHUNK_SIZE)
+                eof = len(data) == 0
+                buffer = buffer[pos:] + text_decoder.decode(data, final = eof)
+                pos = 0
+                callback(len(data))
+
     # 从文件读取项目数据
     def load_project_from_file(self, output_path: str) -> None:
         path = f"{output_path}/cache/project.json"
@@ -137,9 +484,156 @@ class CacheManager(Base):
             except Exception as e:
                 self.debug(Localizer.get().log_read_cache_file_fail, e)
 
+    # 重放缓存日志
+    def replay_journal(self, path: str) -> int:
+        count = 0
+        if not os.path.isfile(path):
+            return count
+
+        with open(path, "r", encoding = "utf-8-sig") as reader:
+            for line in reader:
+                # 写入中断时，最后一条记录可能不完整，跳过即可
+                try:
+                    record: dict = json.loads(line)
+                    item = self.items[record.get("index")]
+                except Exception:
+                    continue
+
+                item.update(
+                    dst = record.get("dst"),
+                    status = record.get("status"),
+                    retry_count = record.get("retry_count"),
+                )
+                count = count + 1
+
+        return count
+
+    # 生成条目到其位置的映射
+    def build_item_index(self, items: list[CacheItem]) -> dict[int, int]:
+        if isinstance(items, CacheColumnStore):
+            return {}
+        else:
+            return {id(item): i for i, item in enumerate(items)}
+
+    # 获取条目在列表中的位置
+    def get_item_index(self, item: CacheItem) -> int:
+        if isinstance(item, CacheItemView):
+            return item.index if item.store is self.items else None
+        else:
+            return self.item_index.get(id(item))
+
     # 设置缓存数据
     def set_items(self, items: list[CacheItem]) -> None:
-        self.items = items
+        # 启用列式存储时，将条目转换为列式存储，之后只在需要时创建条目视图
+        if ExpertConfig.get().cache_columnar_enable == True and not isinstance(items, CacheColumnStore):
+            items = CacheColumnStore(items)
+
+        # 订阅条目的翻译状态变化
+        if isinstance(items, CacheColumnStore):
+            items.observer = self
+        else:
+            for item in items:
+                item.observer = self
+
+        with self.journal_lock:
+            self.items = items
+            self.item_index = self.build_item_index(items)
+            self.shards = []
+            self.dirty_indices = set()
+            self.duplicates = {}
+            self.duplicate_indices = set()
+            self.context_index = None
+            self.journal_base_count = len(items)
+            self.journal = []
+            self.journal_count = 0
+            self.journal_base_path = None
+
+        # 生成翻译状态计数与待翻译条目索引
+        self.build_status_index()
+
+    # 生成翻译状态计数与待翻译条目索引
+    def build_status_index(self) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if isinstance(self.items, CacheColumnStore):
+                statuses = self.items.statuses.values
+                self.status_count = {v: self.items.count_by_status(v) for v in statuses}
+                pending = self.items.get_indices_by_status(tuple(v for v in statuses if v not in CacheManager.SKIPPED_STATUSES))
+            else:
+                statuses = [item.get_status() for item in self.items]
+                self.status_count = dict(collections.Counter(statuses))
+                pending = [i for i, v in enumerate(statuses) if v not in CacheManager.SKIPPED_STATUSES]
+
+            self.status_count_total = len(self.items)
+            self.pending_indices = dict.fromkeys(pending)
+            self.pending_sorted = True
+
+    # 检查翻译状态计数是否有效，条目列表发生变化时重新计数
+    def check_status_index(self) -> None:
+        if self.status_count_total != len(self.items):
+            self.build_status_index()
+
+    # 创建当前条目列表的快照
+    def create_snapshot(self) -> CacheSnapshot:
+        with CacheItem.UPDATE_LOCK:
+            snapshot = CacheSnapshot(self.items, self)
+            self.snapshots.append(snapshot)
+
+        return snapshot
+
+    # 取出发生了变化的条目位置并创建快照
+    # 两者与条目变化事件在同一个锁内完成，取出之后的变化会记录到新的集合中，不会丢失
+    def create_dirty_snapshot(self) -> tuple[set[int], CacheSnapshot]:
+        with CacheItem.UPDATE_LOCK:
+            dirty, self.dirty_indices = self.dirty_indices, set()
+            snapshot = CacheSnapshot(self.items, self)
+            self.snapshots.append(snapshot)
+
+        return dirty, snapshot
+
+    # 释放快照
+    def release_snapshot(self, snapshot: CacheSnapshot) -> None:
+        with CacheItem.UPDATE_LOCK:
+            if snapshot in self.snapshots:
+                self.snapshots.remove(snapshot)
+
+    # 条目变化事件，在 CacheItem.UPDATE_LOCK 内且条目发生变化前调用
+    def on_item_update(self, item: CacheItem) -> None:
+        index = self.get_item_index(item)
+        if index is None:
+            return None
+
+        # 记录发生了变化的条目，压缩缓存日志时只需要重写其所在的分片
+        self.dirty_indices.add(index)
+
+        for snapshot in self.snapshots:
+            if snapshot.items is self.items:
+                snapshot.preserve(index, item)
+
+    # 条目翻译状态变化事件，在 CacheItem.UPDATE_LOCK 内调用
+    def on_item_status_changed(self, item: CacheItem, old: str, new: str) -> None:
+        self.status_count[old] = self.status_count.get(old, 0) - 1
+        self.status_count[new] = self.status_count.get(new, 0) + 1
+
+        # 排除状态发生变化时，参考上文索引失效
+        if Base.TranslationStatus.EXCLUDED in (old, new):
+            self.context_index = None
+
+        index = self.get_item_index(item)
+        if index is None:
+            return None
+
+        if new in CacheManager.SKIPPED_STATUSES:
+            self.pending_indices.pop(index, None)
+        elif index not in self.pending_indices:
+            self.pending_indices[index] = None
+            self.pending_sorted = False
+
+    # 获取全部条目的原文，列式存储时直接读取原文列
+    def get_srcs(self) -> Iterator[str]:
+        if isinstance(self.items, CacheColumnStore):
+            return iter(self.items.src)
+        else:
+            return (item.get_src() for item in self.items)
 
     # 获取缓存数据
     def get_items(self) -> list[CacheItem]:
@@ -159,76 +653,125 @@ class CacheManager(Base):
 
     # 复制缓存数据
     def copy_items(self) -> list[CacheItem]:
-        return [CacheItem(item.get_vars()) for item in self.items]
+        with self.create_snapshot() as snapshot:
+            return [CacheItem(vars, detect_text_type = False) for vars in snapshot.get_vars_list()]
 
     # 获取缓存数据数量（根据翻译状态）
     def get_item_count_by_status(self, status: int) -> int:
-        return len([item for item in self.items if item.get_status() == status])
+        self.check_status_index()
+        return self.status_count.get(status, 0)
 
-    # 生成缓存数据条目片段
-    def generate_item_chunks(self, limit: int) -> list[list[CacheItem]]:
-        # 根据 Token 阈值计算行数阈值，避免大量短句导致行数太多
-        line_limit = max(8, int(limit / 16))
+    # 获取待翻译条目的位置，即跳过 已排除、已翻译、过去已翻译 的数据
+    def get_pending_indices(self) -> list[int]:
+        self.check_status_index()
 
-        chunk: list[CacheItem] = []
-        chunks: list[list[CacheItem]] = []
-        preceding_chunks: list[list[CacheItem]] = []
-        chunk_length: int = 0
-        for i, item in enumerate(self.items):
-            # 跳过 已排除、已翻译、过去已翻译 的数据
-            if item.get_status() in (Base.TranslationStatus.EXCLUDED, Base.TranslationStatus.TRANSLATED, Base.TranslationStatus.TRANSLATED_IN_PAST):
-                continue
+        with CacheItem.UPDATE_LOCK:
+            if self.pending_sorted == False:
+                self.pending_indices = dict.fromkeys(sorted(self.pending_indices))
+                self.pending_sorted = True
 
-            # 每个片段的第一条不判断是否超限，以避免特别长的文本导致死循环
-            current_length = item.get_token_count()
-            if len(chunk) == 0:
-                pass
-            # 如果 Token/行数 超限 或 数据来源跨文件，则结束此片段
-            elif chunk_length + current_length > limit or len(chunk) >= line_limit or item.get_file_path() != chunk[-1].get_file_path():
-                chunks.append(chunk)
-                preceding_chunks.append(self.generate_preceding_chunks(chunk[-1], i))
+            return list(self.pending_indices)
 
-                chunk = []
-                chunk_length = 0
+    # 将待翻译条目按 文本类型 + 正规化后的原文 分组，每组只保留第一个条目作为代表参与翻译，返回 被去重的条目数量、节约的 Token 数量
+    def deduplicate(self) -> tuple[int, int]:
+        groups: dict[tuple[str, str], list[int]] = {}
+        for i in self.get_pending_indices():
+            item = self.items[i]
+            groups.setdefault((item.get_text_type(), Normalizer.normalize(item.get_src())), []).append(i)
 
-            chunk.append(item)
-            chunk_length = chunk_length + current_length
+        self.duplicates = {v[0]: v[1:] for v in groups.values() if len(v) > 1}
+        self.duplicate_indices = {i for v in self.duplicates.values() for i in v}
 
-        # 如果还有剩余数据，则添加到列表中
-        if len(chunk) > 0:
-            chunks.append(chunk)
-            preceding_chunks.append(self.generate_preceding_chunks(chunk[-1], i))
+        # 统计节约的 Token 数量
+        CacheTokenCounter.prefetch([self.items[i].get_src() for i in self.duplicate_indices])
+        tokens = sum(self.items[i].get_token_count() for i in self.duplicate_indices)
 
-        return chunks, preceding_chunks
+        return len(self.duplicate_indices), tokens
 
-    # 生成参考上文数据条目片段
-    def generate_preceding_chunks(self, start_item: CacheItem, start_index: int) -> list[list[CacheItem]]:
+    # 将代表条目的译文同步到原文相同的其他条目，返回被更新的条目
+    def fan_out(self, items: list[CacheItem]) -> list[CacheItem]:
         result: list[CacheItem] = []
+        for item in items:
+            for i in self.duplicates.get(self.get_item_index(item), ()):
+                duplicate = self.items[i]
+                duplicate.update(dst = item.get_dst(), status = item.get_status())
+                result.append(duplicate)
 
-        for i in range(start_index - 1, -1, -1):
-            item = self.items[i]
+        return result
 
-            # 跳过 已排除 的数据
-            if item.get_status() in (Base.TranslationStatus.EXCLUDED):
-                continue
+    # 生成缓存数据条目片段与对应的参考上文，并记录 Token 利用率
+    # limits 为部分条目单独指定的 Token 阈值，Token 阈值不同的条目不会出现在同一个片段中
+    def generate_item_chunks(self, limit: int, limits: dict[int, int] = None) -> tuple[list[list[CacheItem]], list[list[CacheItem]]]:
+        chunks, starts, self.chunk_utilization = self.plan_item_chunks(limit, limits)
 
-            # 跳过空数据
-            src = item.get_src().strip()
-            if src == "":
-                continue
+        # 参考上文取自片段第一个条目之前，不会与片段自身的条目重复
+        preceding_chunks = [self.generate_preceding_chunks(chunk[0], start) for chunk, start in zip(chunks, starts)]
 
-            # 候选数据超过阈值时，结束搜索
-            if len(result) >= ExpertConfig.get().preceding_lines_threshold:
-                break
+        return chunks, preceding_chunks
 
-            # 候选数据与当前任务不在同一个文件时，结束搜索
-            if item.get_file_path() != start_item.get_file_path():
-                break
+    # 规划缓存数据条目片段，返回 片段、每个片段第一个条目的位置、Token 利用率，不生成参考上文，也不修改共享的状态
+    # indices 为需要切分的条目位置，为 None 时切分全部待翻译条目
+    def plan_item_chunks(self, limit: int, limits: dict[int, int] = None, indices: list[int] = None) -> tuple[list[list[CacheItem]], list[int], float]:
+        limits = {} if limits is None else limits
+        chunks: list[list[CacheItem]] = []
+        starts: list[int] = []
+        pending_indices = [i for i in (self.get_pending_indices() if indices is None else indices) if i not in self.duplicate_indices]
 
-            # 候选数据以指定标点结尾时，添加到结果中
-            if src.endswith(CacheManager.END_LINE_PUNCTUATION):
-                result.append(item)
-            else:
-                break
+        # 批量计算 Token 数量，避免在循环中逐条编码
+        CacheTokenCounter.prefetch([self.items[i].get_src() for i in pending_indices])
+
+        # 将待翻译条目按 文件 与 Token 阈值 划分为连续的分段，并按 Token 阈值分组
+        groups: dict[int, list[list[int]]] = {}
+        key: tuple[str, int] = None
+        for i in pending_indices:
+            item = self.items[i]
+            item_limit = limits.get(i, limit)
+            if key != (item.get_file_path(), item_limit):
+                key = (item.get_file_path(), item_limit)
+                groups.setdefault(item_limit, []).append([])
+            groups.get(item_limit)[-1].append(i)
+
+        tokens: int = 0
+        capacity: int = 0
+        for group_limit, segments in groups.items():
+            # 根据 Token 阈值计算行数阈值，避免大量短句导致行数太多
+            planner = CacheChunkPlanner(group_limit, max(8, int(group_limit / 16)))
+
+            # 在每个分段内规划片段
+            planned: list[list[CacheItem]] = []
+            planned_starts: list[int] = []
+            sizes: list[tuple[int, int]] = []
+            packable: list[bool] = []
+            for segment in segments:
+                items = [self.items[i] for i in segment]
+                counts = [item.get_token_count() for item in items]
+                breaks = [item.get_src().strip().endswith(CacheManager.END_LINE_PUNCTUATION) for item in items]
+                plan = planner.plan(counts, breaks)
+                for start, end in plan:
+                    planned.append(items[start : end])
+                    planned_starts.append(segment[start])
+                    sizes.append((sum(counts[start : end]), end - start))
+                    packable.append(len(plan) == 1 and ExpertConfig.get().cross_file_packing_enable == True)
+                tokens = tokens + sum(counts)
+
+            # 只有一个片段的小文件可以与相邻的小文件共用同一个片段，文件内的条目顺序保持不变
+            for start, end in planner.pack(sizes, packable):
+                chunks.append([item for k in range(start, end) for item in planned[k]])
+                starts.append(planned_starts[start])
+                capacity = capacity + group_limit
+
+        # Token 利用率，即片段中的 Token 总数与全部片段的 Token 阈值之和的比值
+        return chunks, starts, min(1.0, tokens / max(1, capacity))
+
+    # 生成参考上文数据条目片段
+    def generate_preceding_chunks(self, start_item: CacheItem, start_index: int) -> list[list[CacheItem]]:
+        return self.get_context_index().get(start_item, start_index, ExpertConfig.get().preceding_lines_threshold)
+
+    # 获取参考上文索引，条目列表或条目的排除状态发生变化后重新生成
+    def get_context_index(self) -> CacheContextIndex:
+        context_index = self.context_index
+        if context_index is None or context_index.items is not self.items or len(context_index) != len(self.items):
+            context_index = CacheContextIndex(self.items, CacheManager.END_LINE_PUNCTUATION)
+            self.context_index = context_index
 
-        return sorted(result, key = lambda x: x.get_row(), reverse = False)
\ No newline at end of file
+        return context_index
\ No newline at end of file
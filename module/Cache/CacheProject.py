@@ -12,6 +12,7 @@ class CacheProject(BaseData):
         self.id: str = ""                                           # 项目 ID
         self.status: str = Base.TranslationStatus.UNTRANSLATED      # 翻译状态
         self.extras: dict = {}                                      # 额外数据
+        self.fingerprint: str = ""                                  # 最近一次翻译时的翻译设置指纹
 
         # 初始化
         for k, v in args.items():
@@ -40,6 +41,16 @@ class CacheProject(BaseData):
         with self.lock:
             self.status = translation_status
 
+    # 获取翻译设置指纹
+    def get_fingerprint(self) -> str:
+        with self.lock:
+            return self.fingerprint
+
+    # 设置翻译设置指纹
+    def set_fingerprint(self, fingerprint: str) -> None:
+        with self.lock:
+            self.fingerprint = fingerprint
+
     # 获取额外数据
     def get_extras(self) -> dict:
         with self.lock:
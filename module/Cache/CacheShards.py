@@ -0,0 +1,115 @@
+import os
+import bisect
+from typing import Callable
+
+import rapidjson as json
+
+from base.Base import Base
+
+# 按原始文件分片保存的条目数据
+# 连续且属于同一个原始文件的条目保存在同一个分片中，分片过大时继续切分，保存时只需要重写发生了变化的分片
+class CacheShards(Base):
+
+    # 每个分片的条目数量上限
+    SHARD_SIZE = 4096
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+
+        # 初始化
+        self.path = path
+        self.manifest_path = f"{path}/manifest.json"
+
+    # 分片数据是否存在
+    def exists(self) -> bool:
+        return os.path.isfile(self.manifest_path)
+
+    # 读取分片清单
+    def load_manifest(self) -> dict:
+        if not os.path.isfile(self.manifest_path):
+            return {
+                "generation": 0,
+                "shards": [],
+            }
+
+        with open(self.manifest_path, "r", encoding = "utf-8-sig") as reader:
+            return json.load(reader)
+
+    # 获取全部分片文件的路径
+    def get_shard_paths(self) -> list[str]:
+        return [f"{self.path}/{shard.get("name")}" for shard in self.load_manifest().get("shards")]
+
+    # 根据条目的文件路径划分分片
+    def plan(self, file_paths: list[str]) -> list[dict]:
+        shards: list[dict] = []
+        for file_path in file_paths:
+            if len(shards) == 0 or shards[-1].get("file_path") != file_path or shards[-1].get("count") >= CacheShards.SHARD_SIZE:
+                shards.append({
+                    "name": "",
+                    "file_path": file_path,
+                    "count": 0,
+                })
+            shards[-1]["count"] = shards[-1].get("count") + 1
+
+        return shards
+
+    # 获取各个分片的起始位置
+    def get_starts(self, shards: list[dict]) -> list[int]:
+        starts: list[int] = []
+        offset = 0
+        for shard in shards:
+            starts.append(offset)
+            offset = offset + shard.get("count")
+
+        return starts
+
+    # 写入全部分片
+    def save_all(self, data: list[dict]) -> list[dict]:
+        generation = self.load_manifest().get("generation") + 1
+        shards = self.plan([v.get("file_path") for v in data])
+        for i, (shard, start) in enumerate(zip(shards, self.get_starts(shards))):
+            shard["name"] = f"{generation:08d}_{i:06d}.json"
+            self.save_shard(shard.get("name"), data[start : start + shard.get("count")])
+
+        self.save_manifest(generation, shards)
+        return shards
+
+    # 只重写包含变化条目的分片
+    def save_dirty(self, shards: list[dict], dirty: set[int], get_vars: Callable[[int], dict]) -> list[dict]:
+        if len(dirty) == 0:
+            return shards
+
+        # 找出需要重写的分片
+        starts = self.get_starts(shards)
+        total = sum(shard.get("count") for shard in shards)
+        targets = {bisect.bisect_right(starts, i) - 1 for i in dirty if 0 <= i < total}
+
+        # 以新的文件名写入分片，清单替换完成之前旧分片始终保持有效
+        generation = self.load_manifest().get("generation") + 1
+        shards = [dict(shard) for shard in shards]
+        for i in sorted(targets):
+            shards[i]["name"] = f"{generation:08d}_{i:06d}.json"
+            self.save_shard(shards[i].get("name"), [get_vars(k) for k in range(starts[i], starts[i] + shards[i].get("count"))])
+
+        self.save_manifest(generation, shards)
+        return shards
+
+    # 写入分片
+    def save_shard(self, name: str, data: list[dict]) -> None:
+        os.makedirs(self.path, exist_ok = True)
+        path = f"{self.path}/{name}"
+        with open(f"{path}.tmp", "w", encoding = "utf-8") as writer:
+            writer.write(json.dumps(data, indent = None, ensure_ascii = False))
+        os.replace(f"{path}.tmp", path)
+
+    # 写入分片清单，并移除不再使用的分片
+    def save_manifest(self, generation: int, shards: list[dict]) -> None:
+        os.makedirs(self.path, exist_ok = True)
+        with open(f"{self.manifest_path}.tmp", "w", encoding = "utf-8") as writer:
+            writer.write(json.dumps({"generation": generation, "shards": shards}, indent = None, ensure_ascii = False))
+        os.replace(f"{self.manifest_path}.tmp", self.manifest_path)
+
+        names = {shard.get("name") for shard in shards}
+        for entry in os.scandir(self.path):
+            if entry.is_file() and entry.name != "manifest.json" and entry.name not in names:
+                os.remove(entry.path)
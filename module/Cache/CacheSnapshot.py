@@ -0,0 +1,183 @@
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheColumnStore import CacheItemView
+from module.Cache.CacheColumnStore import CacheColumnStore
+from module.Cache.CacheTokenCounter import CacheTokenCounter
+
+# 快照中条目的视图，未变化的字段直接读取原始条目，已变化的字段读取快照中保存的旧值
+# 对视图的修改只写入快照，不会影响原始条目
+class CacheSnapshotItem(CacheItem):
+
+    __slots__ = (
+        "snapshot",
+        "index",
+        "item",
+    )
+
+    def __init__(self, snapshot: "CacheSnapshot", index: int, item: CacheItem) -> None:
+        self.snapshot = snapshot
+        self.index = index
+        self.item = item
+
+    # 获取字段值，先读取原始条目再检查快照，原始条目在两次读取之间发生变化时，快照中必定已经保存了旧值
+    def get_field(self, k: str, v: object) -> object:
+        record = self.snapshot.records.get(self.index)
+        return v if record is None else record.get(k)
+
+    # 设置字段值，写入快照中的副本
+    def set_field(self, k: str, v: object) -> None:
+        with CacheItem.UPDATE_LOCK:
+            record = self.snapshot.records.get(self.index)
+            if record is None:
+                record = self.item.get_vars()
+                self.snapshot.records[self.index] = record
+            record[k] = v
+
+    # 获取字段数据
+    def get_vars(self) -> dict:
+        return self.snapshot.get_vars(self.index)
+
+    # 获取原文
+    def get_src(self) -> str:
+        return self.get_field("src", self.item.get_src())
+
+    # 设置原文
+    def set_src(self, src: str) -> None:
+        self.set_field("src", src)
+
+    # 获取译文
+    def get_dst(self) -> str:
+        return self.get_field("dst", self.item.get_dst())
+
+    # 设置译文
+    def set_dst(self, dst: str) -> None:
+        self.update(dst = dst)
+
+    # 获取额外字段原文
+    def get_extra_field(self) -> str:
+        return self.get_field("extra_field", self.item.get_extra_field())
+
+    # 设置额外字段原文
+    def set_extra_field(self, extra_field: str) -> None:
+        self.set_field("extra_field", extra_field)
+
+    # 获取标签
+    def get_tag(self) -> str:
+        return self.get_field("tag", self.item.get_tag())
+
+    # 设置标签
+    def set_tag(self, tag: str) -> None:
+        self.set_field("tag", tag)
+
+    # 获取行号
+    def get_row(self) -> int:
+        return self.get_field("row", self.item.get_row())
+
+    # 设置行号
+    def set_row(self, row: int) -> None:
+        self.set_field("row", row)
+
+    # 获取文件类型
+    def get_file_type(self) -> str:
+        return self.get_field("file_type", self.item.get_file_type())
+
+    # 设置文件类型
+    def set_file_type(self, type: str) -> None:
+        self.set_field("file_type", type)
+
+    # 获取文件路径
+    def get_file_path(self) -> str:
+        return self.get_field("file_path", self.item.get_file_path())
+
+    # 设置文件路径
+    def set_file_path(self, path: str) -> None:
+        self.set_field("file_path", path)
+
+    # 获取文本类型
+    def get_text_type(self) -> str:
+        return self.get_field("text_type", self.item.get_text_type())
+
+    # 设置文本类型
+    def set_text_type(self, type: str) -> None:
+        self.set_field("text_type", type)
+
+    # 获取翻译状态
+    def get_status(self) -> str:
+        return self.get_field("status", self.item.get_status())
+
+    # 设置翻译状态
+    def set_status(self, status: str) -> None:
+        self.update(status = status)
+
+    # 获取重试次数
+    def get_retry_count(self) -> int:
+        return self.get_field("retry_count", self.item.get_retry_count())
+
+    # 设置重试次数
+    def set_retry_count(self, retry_count: int) -> None:
+        self.update(retry_count = retry_count)
+
+    # 更新可变字段，为 None 的参数保持原值不变
+    def update(self, dst: str = None, status: str = None, retry_count: int = None) -> None:
+        if dst is not None:
+            self.set_field("dst", dst if isinstance(dst, str) else str(dst))
+        if status is not None:
+            self.set_field("status", status)
+        if retry_count is not None:
+            self.set_field("retry_count", retry_count)
+
+    # 获取 Token 数量
+    def get_token_count(self) -> int:
+        return CacheTokenCounter.get(self.get_src())
+
+    # 将原文切片
+    def split_sub_lines(self) -> list[str]:
+        return [sub_line for sub_line in self.get_src().split("\n") if sub_line.strip() != ""]
+
+# 条目列表的写时复制快照
+# 创建快照时不复制任何数据，之后原始条目在发生变化前，会先将旧值保存到快照中，因此快照始终保持创建时的状态
+# 快照在释放前会持续接收原始条目的旧值，使用完毕后需要及时释放
+class CacheSnapshot():
+
+    def __init__(self, items: list[CacheItem], observer: object = None) -> None:
+        self.items = items
+        self.length = len(items)
+        self.records: dict[int, dict] = {}                          # 条目位置到旧值（或快照中修改后的值）的映射
+        self.observer = observer                                    # 创建快照的对象，需实现 release_snapshot 方法
+
+    def __enter__(self) -> "CacheSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    # 释放快照
+    def release(self) -> None:
+        if self.observer is not None:
+            self.observer.release_snapshot(self)
+            self.observer = None
+
+    # 保存原始条目的旧值，在 CacheItem.UPDATE_LOCK 内且原始条目发生变化前调用
+    def preserve(self, index: int, item: CacheItem) -> None:
+        if index < self.length and index not in self.records:
+            self.records[index] = item.get_vars()
+
+    # 获取条目在快照中的字段数据
+    def get_vars(self, index: int) -> dict:
+        if isinstance(self.items, CacheColumnStore):
+            vars = self.items.get_vars(index)
+        else:
+            vars = self.items[index].get_vars()
+
+        record = self.records.get(index)
+        return vars if record is None else dict(record)
+
+    # 获取快照中全部条目的字段数据
+    def get_vars_list(self) -> list[dict]:
+        return [self.get_vars(i) for i in range(self.length)]
+
+    # 获取快照中的条目视图
+    def get_items(self) -> list[CacheSnapshotItem]:
+        if isinstance(self.items, CacheColumnStore):
+            return [CacheSnapshotItem(self, i, CacheItemView(self.items, i)) for i in range(self.length)]
+        else:
+            return [CacheSnapshotItem(self, i, self.items[i]) for i in range(self.length)]
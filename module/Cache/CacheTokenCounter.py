@@ -0,0 +1,147 @@
+import os
+import array
+import hashlib
+import threading
+from typing import Iterable
+from collections import OrderedDict
+
+import tiktoken
+import tiktoken_ext
+from tiktoken_ext import openai_public
+
+from module.LogHelper import LogHelper
+from module.Localizer.Localizer import Localizer
+
+# Token 计数器，以文本内容的哈希值为键缓存 Token 数量，缓存大小有上限，按最近最少使用的顺序淘汰
+class CacheTokenCounter():
+
+    # 必须显式的引用这两个库，否则打包后会报错
+    tiktoken_ext
+    openai_public
+
+    # 编码名称
+    ENCODING: str = "o200k_base"
+
+    # 缓存条目数量上限
+    CAPACITY: int = 512 * 1024
+
+    # 批量编码时每批的文本数量与线程数
+    BATCH_SIZE: int = 8192
+    BATCH_THREADS: int = max(1, min(8, os.cpu_count() or 1))
+
+    # 缓存数据
+    CACHE: OrderedDict[int, int] = OrderedDict()
+
+    # 缓存数据是否有尚未保存的变化
+    DIRTY: bool = False
+
+    # 类线程锁
+    LOCK = threading.Lock()
+
+    # 获取编码器
+    @classmethod
+    def get_encoder(cls) -> tiktoken.Encoding:
+        if getattr(cls, "ENCODER", None) is None:
+            cls.ENCODER = tiktoken.get_encoding(cls.ENCODING)
+
+        return cls.ENCODER
+
+    # 计算文本的键
+    @classmethod
+    def get_key(cls, text: str) -> int:
+        return int.from_bytes(hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size = 8).digest(), "little")
+
+    # 添加缓存条目，超过上限时淘汰最久未使用的条目，需要在锁内调用
+    @classmethod
+    def put(cls, key: int, count: int) -> None:
+        cls.CACHE[key] = count
+        cls.CACHE.move_to_end(key)
+        cls.DIRTY = True
+
+        while len(cls.CACHE) > cls.CAPACITY:
+            cls.CACHE.popitem(last = False)
+
+    # 获取文本的 Token 数量
+    @classmethod
+    def get(cls, text: str) -> int:
+        key = cls.get_key(text)
+        with cls.LOCK:
+            count = cls.CACHE.get(key)
+            if count is not None:
+                cls.CACHE.move_to_end(key)
+                return count
+
+        count = len(cls.get_encoder().encode_ordinary(text))
+        with cls.LOCK:
+            cls.put(key, count)
+
+        return count
+
+    # 批量计算文本的 Token 数量并写入缓存
+    @classmethod
+    def prefetch(cls, texts: list[str]) -> None:
+        # 找出缓存中不存在的文本
+        missing: dict[int, str] = {}
+        with cls.LOCK:
+            for text in texts:
+                key = cls.get_key(text)
+                if key in cls.CACHE:
+                    cls.CACHE.move_to_end(key)
+                else:
+                    missing[key] = text
+
+        # 分批编码，编码器的批量接口会在多个线程中并行执行
+        keys = list(missing.keys())
+        encoder = cls.get_encoder()
+        for i in range(0, len(keys), cls.BATCH_SIZE):
+            batch = keys[i : i + cls.BATCH_SIZE]
+            results = encoder.encode_ordinary_batch([missing.get(k) for k in batch], num_threads = cls.BATCH_THREADS)
+            with cls.LOCK:
+                for k, v in zip(batch, results):
+                    cls.put(k, len(v))
+
+    # 从文件读取缓存数据
+    @classmethod
+    def load_from_file(cls, path: str) -> None:
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            keys = array.array("Q")
+            counts = array.array("I")
+            with open(path, "rb") as reader:
+                length = os.path.getsize(path) // (keys.itemsize + counts.itemsize)
+                keys.fromfile(reader, length)
+                counts.fromfile(reader, length)
+
+            with cls.LOCK:
+                for k, v in zip(keys, counts):
+                    if k not in cls.CACHE:
+                        cls.put(k, v)
+        except Exception as e:
+            LogHelper.debug(Localizer.get().log_read_cache_file_fail, e)
+
+    # 保存缓存数据到文件，只保存 texts 中的文本对应的条目，其他项目的条目不会写入当前项目的文件
+    @classmethod
+    def save_to_file(cls, path: str, texts: Iterable[str]) -> None:
+        with cls.LOCK:
+            if cls.DIRTY == False and os.path.isfile(path):
+                return None
+
+            cls.DIRTY = False
+
+        # 在锁外计算文本的键，避免阻塞翻译任务
+        targets = dict.fromkeys(cls.get_key(text) for text in texts)
+        with cls.LOCK:
+            targets = {k: cls.CACHE.get(k) for k in targets if k in cls.CACHE}
+
+        keys = array.array("Q", targets.keys())
+        counts = array.array("I", targets.values())
+
+        try:
+            with open(f"{path}.tmp", "wb") as writer:
+                keys.tofile(writer)
+                counts.tofile(writer)
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            LogHelper.debug(Localizer.get().log_write_cache_file_fail, e)
\ No newline at end of file
@@ -24,6 +24,78 @@ class ExpertConfig(Base, BaseData):
         # 结果检查 - 重试次数达到阈值
         self.result_checker_retry_count_threshold: bool = False
 
+        # 缓存存储后端，可选值为 json、sqlite
+        self.cache_storage_backend: str = "json"
+
+        # 缓存数据按原始文件分片保存，自动保存时只重写发生了变化的分片，仅在存储后端为 json 时生效
+        # 启用后不再写入 cache/items.json，旧版本与外部工具无法读取分片格式的缓存数据
+        self.cache_sharding_enable: bool = False
+
+        # 缓存数据使用列式存储，可以显著降低大型项目的内存占用
+        self.cache_columnar_enable: bool = False
+
+        # 翻译记忆，翻译设置相同时直接复用其他项目中相同原文的译文
+        self.translation_memory_enable: bool = False
+
+        # 翻译记忆的最大条目数量，超出时淘汰最久未使用的条目
+        self.translation_memory_max_entries: int = 1000000
+
+        # 翻译开始时导入到翻译记忆的项目输出目录（包含 cache 文件夹的目录），导入的译文按该项目最近一次翻译时的翻译设置保存
+        # 该项目没有记录翻译设置时，导入的译文标记为外部译文，不会被复用
+        self.translation_memory_import_folders: list[str] = []
+
+        # 近似匹配的翻译记忆，将相似原文的译文作为参考译文添加到提示词中
+        self.fuzzy_memory_enable: bool = False
+
+        # 近似匹配的相似度阈值（0 - 1）
+        self.fuzzy_memory_threshold: float = 0.7
+
+        # 原文只有数字或控制代码不同时，直接复用已有译文并替换对应的片段
+        self.fuzzy_memory_auto_reuse: bool = False
+
+        # 近似匹配索引的最大条目数量
+        self.fuzzy_memory_max_entries: int = 300000
+
+        # 项目内去重，原文相同的条目只翻译一次，完成后将译文同步到其他条目
+        self.deduplication_in_project: bool = False
+
+        # 允许多个小文件的条目共用同一个翻译任务，可以显著减少小文件较多的项目的请求数量
+        self.cross_file_packing_enable: bool = False
+
+        # 翻译任务的预取窗口，即在并发任务数之外预先生成并提交的任务数量
+        self.task_prefetch_size: int = 16
+
+        # 失败条目的重试方式，可选值为 chunk、split，失败的条目都会在任务结束后立即重新提交，每个条目最多尝试 最大尝试次数 次
+        # chunk 为按分块大小控制器决定的 Token 阈值重新切分，split 为对半拆分
+        self.translation_scheduler_mode: str = "chunk"
+
+        # 自适应并发，根据响应耗时与限流、服务端错误、超时的情况在上下限之间自动调整并发任务数，初始值为设置中的并发任务数
+        self.adaptive_concurrency_enable: bool = False
+
+        # 自适应并发的下限
+        self.adaptive_concurrency_min: int = 1
+
+        # 自适应并发的上限，为 0 时使用设置中的并发任务数，即只在出现限流等错误时减小并发数，之后再恢复
+        self.adaptive_concurrency_max: int = 0
+
+        # 多接口并行，除当前激活的接口外同时使用的其他接口的 ID，任务会分配给空闲的接口
+        # 每个接口都有独立的并发任务数与速率限制，并发任务数的初始值优先使用 llama.cpp 的 slots 数量
+        self.fan_out_platforms: list[int] = []
+
+        # 对冲请求，请求耗时超过近期成功请求耗时的指定分位数时，向其他密钥发出相同的请求，使用先返回的有效结果
+        # 只在请求引擎为 async 时生效，未被使用的请求会被立即取消
+        self.request_hedging_enable: bool = False
+
+        # 发出对冲请求的耗时分位数（0 - 1）
+        self.request_hedging_percentile: float = 0.95
+
+        # 对冲请求额外消耗的 Token 数量占全部普通请求消耗的比例上限
+        self.request_hedging_budget: float = 0.1
+
+        # 请求引擎，可选值为 thread、async
+        # thread 为每个并发任务占用一个线程，async 为在单个事件循环中以协程并发请求，Google 接口在 async 模式下仍在线程中请求
+        self.request_engine: str = "thread"
+
         # 初始化
         del self.default
         if not os.path.isfile(ExpertConfig.EXPERT_CONFIG_PATH):
@@ -89,30 +89,47 @@ class LocalizerBase():
     log_write_file_fail: str = "文件写入失败 ..."
     log_read_cache_file_fail: str = "从文件读取缓存数据失败 ..."
     log_write_cache_file_fail: str = "向文件写入缓存数据失败 ..."
+    log_cache_storage_migrated: str = "缓存数据已转换为 {FORMAT} 格式，已移除旧格式的缓存文件 {PATH} ..."
     log_load_llama_cpp_slots_num_fail: str = "无法获取 [green]llama.cpp[/] 的响应数据 ..."
     log_crash: str = "出现严重错误，程序即将退出，错误信息已保存至日志文件 ..."
-    translator_max_round: str = "最大轮次"
-    translator_current_round: str = "当前轮次"
+    translator_max_round: str = "每个条目的最大尝试次数"
     translator_api_url: str = "接口地址"
     translator_name: str = "接口名称"
     translator_model: str = "模型名称"
     translator_proxy_url: str = "生效中的 网络代理"
     translator_prompt: str = "本次任务使用以下提示词：\n{PROMPT}\n"
     translator_begin: str = "即将开始执行翻译任务，预计任务总数为 {TASKS}, 并发任务数为 {BATCH_SIZE}，请注意保持网络通畅 ..."
+    translator_chunk_utilization: str = "任务的 Token 利用率为 {UTILIZATION}% ..."
+    translator_chunk_controller: str = "分块大小控制器 - Token 阈值 {LIMIT}：待翻译条目 {COUNT} 个，任务成功率 {SUCCESS_RATE}"
+    translator_chunk_controller_reason: str = "分块大小控制器 - 上次统计后的决策原因：{REASONS}"
+    translator_chunk_controller_decision: str = "分块大小控制器 - Token 阈值为 {LIMIT} 的任务失败，条目的决策为：{DECISIONS}"
+    translator_concurrency: str = "并发控制器 - 并发任务数将在 {FLOOR} 至 {CEILING} 之间根据响应情况自动调整 ..."
+    translator_concurrency_change: str = "并发控制器 - 并发任务数 {BEFORE} -> {AFTER}，原因：{REASON}"
+    translator_rate_limit_wait: str = "速率限制 - 当前密钥的额度不足，等待 {TIME} 秒后发起请求 ..."
+    translator_key_scheduler: str = "密钥调度器 - {KEY}：状态 {STATE}，请求数 {COUNT}，成功率 {SUCCESS_RATE}，平均耗时 {LATENCY} 秒"
+    translator_key_scheduler_open: str = "密钥调度器 - {KEY} 已连续失败 {COUNT} 次，暂停使用 {TIME} 秒 ..."
+    translator_key_scheduler_close: str = "密钥调度器 - {KEY} 已恢复正常 ..."
+    translator_hedge_issue: str = "对冲请求 - 请求耗时过长，已发出对冲请求 ..."
+    translator_hedge_summary: str = "对冲请求 - 已发出 {ISSUED} 次，其中 {WON} 次先返回有效结果（{WIN_RATE}），因预算不足跳过 {DENIED} 次，额外消耗的 Token 占比 {EXTRA}"
+    translator_generation_done: str = "第 {GENERATION} 次尝试的任务已全部结束，共 {TASKS} 个任务 ..."
     translator_writing: str = "正在写入翻译数据，等稍候 ..."
     translator_done: str = "所有文本均已翻译，翻译任务已结束 ..."
-    translator_fail: str = "已到最大翻译轮次，仍有部分文本未翻译，请检查翻译结果 ..."
+    translator_fail: str = "已到最大尝试次数，仍有部分文本未翻译，请检查翻译结果 ..."
     translator_stop: str = "翻译任务已停止 ..."
     translator_write: str = "翻译结果已保存至 {PATH} 目录 ..."
-    translator_generate_task: str = "生成翻译任务"
+    translator_load_cache: str = "读取缓存文件"
     translator_rule_filter: str = "规则过滤已完成，共过滤 {COUNT} 个无需翻译的条目 ..."
     translator_mtool_filter: str = "MToolOptimizer 预处理已完成，共过滤 {COUNT} 个包含重复子句的条目 ..."
     translator_language_filter: str = "语言过滤已完成，共过滤 {COUNT} 个不包含目标语言的条目 ..."
+    translator_translation_memory: str = "翻译记忆查询已完成，共复用 {COUNT} 个条目的译文 ..."
+    translator_translation_memory_import: str = "已从 {PATH} 导入 {COUNT} 个条目到翻译记忆 ..."
+    translator_fuzzy_memory: str = "近似匹配已完成，共复用 {COUNT} 个条目的译文 ..."
+    translator_deduplicate: str = "项目内去重已完成，共有 {COUNT} 个条目与其他条目原文相同，预计节约 {TOKENS} Token ..."
     translator_task_response_think: str = "模型思考内容：\n"
     translator_task_response_result: str = "模型回复内容：\n"
-    translator_response_check_fail: str = "译文文本未通过检查，将在下一轮次的翻译中自动重试"
-    translator_response_check_fail_all: str = "全部译文文本未通过检查，将在下一轮次的翻译中自动重试"
-    translator_response_check_fail_part: str = "部分译文文本未通过检查，将在下一轮次的翻译中自动重试"
+    translator_response_check_fail: str = "译文文本未通过检查，将在下一次尝试中自动重试"
+    translator_response_check_fail_all: str = "全部译文文本未通过检查，将在下一次尝试中自动重试"
+    translator_response_check_fail_part: str = "部分译文文本未通过检查，将在下一次尝试中自动重试"
     translator_task_success: str = "任务耗时 {TIME} 秒，文本行数 {LINES} 行，输入消耗 {PT} Tokens，输出消耗 {CT} Tokens"
     translator_too_many_task: str = "实时任务数较多，暂时停止显示详细结果以提升性能 ..."
     translator_no_items: str = "没有找到需要翻译的数据，请确认输入文件与项目设置是否正确 ..."
@@ -189,6 +206,10 @@ class LocalizerBase():
     platform_edit_page_model_content: str = "当前使用的模型为 {MODEL}"
     platform_edit_page_model_edit: str = "手动输入"
     platform_edit_page_model_sync: str = "在线获取"
+    platform_edit_page_rpm_limit_title: str = "每分钟请求数限制（RPM）"
+    platform_edit_page_rpm_limit_content: str = "每个接口密钥每分钟最多发出的请求数量，额度不足时请求将等待而不是失败，为 0 时不限制"
+    platform_edit_page_tpm_limit_title: str = "每分钟 Token 数限制（TPM）"
+    platform_edit_page_tpm_limit_content: str = "每个接口密钥每分钟最多消耗的 Token 数量，额度不足时请求将等待而不是失败，为 0 时不限制"
 
     # 参数编辑
     args_edit_page_top_p_title: str = "top_p"
@@ -227,6 +248,7 @@ class LocalizerBase():
     translation_page_status_stopping = "停止中"
     translation_page_indeterminate_saving = "缓存文件保存中 ..."
     translation_page_indeterminate_stoping = "正在停止翻译任务 ..."
+    translation_page_indeterminate_loading = "缓存文件读取中 ... {PERCENT}%"
     translation_page_card_time = "累计时间"
     translation_page_card_remaining_time = "剩余时间"
     translation_page_card_line = "翻译行数"
@@ -255,8 +277,8 @@ class LocalizerBase():
         ""
         ""
     )
-    basic_settings_page_max_round_title = "翻译流程最大轮次"
-    basic_settings_page_max_round_content = "当完成一轮翻译后，如果还有未翻译的条目，将重新开始新的翻译流程，直到翻译完成或者达到最大轮次"
+    basic_settings_page_max_round_title = "每个条目的最大尝试次数"
+    basic_settings_page_max_round_content = "翻译失败的条目会立即重新切分并重新提交，直到翻译完成或者达到最大尝试次数"
 
     # 高级功能
     advance_feature_page_auto_glossary_enable = "自动补全术语表（实验性功能，不支持 SakuraLLM 模型）"
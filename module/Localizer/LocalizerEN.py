@@ -89,30 +89,47 @@ class LocalizerEN(LocalizerBase):
     log_write_file_fail: str = "File writing failed ..."
     log_read_cache_file_fail: str = "Failed to read cached data from file ..."
     log_write_cache_file_fail: str = "Failed to write cached data to file ..."
+    log_cache_storage_migrated: str = "Cache data has been converted to {FORMAT} format, the old cache file {PATH} has been removed ..."
     log_load_llama_cpp_slots_num_fail: str = "Failed to get response data from [green]llama.cpp[/] ..."
     log_crash: str = "A critical error has occurred, program will now exit. Error detail has been saved to the log file ..."
-    translator_max_round: str = "Max rounds"
-    translator_current_round: str = "Current round"
+    translator_max_round: str = "Max attempts per entry"
     translator_api_url: str = "API URL"
     translator_name: str = "API Name"
     translator_model: str = "Model Name"
     translator_proxy_url: str = "Active Network Proxy"
     translator_prompt: str = "The following prompt will be used for this task:\n{PROMPT}\n"
     translator_begin: str = "Translation task is about to start, estimated total tasks: {TASKS}, concurrent tasks: {BATCH_SIZE}. Please ensure network connection ..."
+    translator_chunk_utilization: str = "Token utilization of tasks: {UTILIZATION}% ..."
+    translator_chunk_controller: str = "Chunk size controller - token limit {LIMIT}: {COUNT} pending entries, task success rate {SUCCESS_RATE}"
+    translator_chunk_controller_reason: str = "Chunk size controller - decision reasons since the last summary: {REASONS}"
+    translator_chunk_controller_decision: str = "Chunk size controller - task with token limit {LIMIT} failed, decisions for its entries: {DECISIONS}"
+    translator_concurrency: str = "Concurrency controller - concurrent tasks will be adjusted automatically between {FLOOR} and {CEILING} based on responses ..."
+    translator_concurrency_change: str = "Concurrency controller - concurrent tasks {BEFORE} -> {AFTER}, reason: {REASON}"
+    translator_rate_limit_wait: str = "Rate limiter - budget of the current key is exhausted, waiting {TIME} seconds before sending the request ..."
+    translator_key_scheduler: str = "Key scheduler - {KEY}: state {STATE}, requests {COUNT}, success rate {SUCCESS_RATE}, average latency {LATENCY}s"
+    translator_key_scheduler_open: str = "Key scheduler - {KEY} failed {COUNT} times in a row, paused for {TIME} seconds ..."
+    translator_key_scheduler_close: str = "Key scheduler - {KEY} has recovered ..."
+    translator_hedge_issue: str = "Hedged request - request is taking too long, a hedged request has been sent ..."
+    translator_hedge_summary: str = "Hedged requests - {ISSUED} sent, {WON} returned a valid result first ({WIN_RATE}), {DENIED} skipped due to budget, extra token spend {EXTRA}"
+    translator_generation_done: str = "All tasks of attempt {GENERATION} have finished, {TASKS} tasks in total ..."
     translator_writing: str = "Writing translation data, please wait ..."
     translator_done: str = "All texts are translated, translation task finished ..."
-    translator_fail: str = "Maximum translation rounds reached, some texts are still untranslated. Please check the translation results ..."
+    translator_fail: str = "Maximum attempts reached, some texts are still untranslated. Please check the translation results ..."
     translator_stop: str = "Translation task stopped ..."
     translator_write: str = "Translation result saved to {PATH} directory ..."
-    translator_generate_task: str = "Generate tasks"
+    translator_load_cache: str = "Load cache file"
     translator_rule_filter: str = "Rule filtering completed, {COUNT} entries not requiring translation filtered out ..."
     translator_mtool_filter: str = "MToolOptimizer preprocessing completed, {COUNT} entries containing duplicate clauses filtered out ..."
     translator_language_filter: str = "Language filtering completed, {COUNT} entries not containing target language filtered out ..."
+    translator_translation_memory: str = "Translation memory lookup completed, reused translations for {COUNT} entries ..."
+    translator_translation_memory_import: str = "Imported {COUNT} entries from {PATH} into translation memory ..."
+    translator_fuzzy_memory: str = "Fuzzy matching completed, reused translations for {COUNT} entries ..."
+    translator_deduplicate: str = "In-project deduplication completed, {COUNT} entries share their source with other entries, saving an estimated {TOKENS} tokens ..."
     translator_task_response_think: str = "Model thinking:\n"
     translator_task_response_result: str = "Model response:\n"
-    translator_response_check_fail: str = "Translated text failed check, will automatically retry in the next round of translation"
-    translator_response_check_fail_all: str = "All translated text failed check, will automatically retry in the next round of translation"
-    translator_response_check_fail_part: str = "Partial translated text failed check, will automatically retry in the next round of translation"
+    translator_response_check_fail: str = "Translated text failed check, will automatically retry in the next attempt"
+    translator_response_check_fail_all: str = "All translated text failed check, will automatically retry in the next attempt"
+    translator_response_check_fail_part: str = "Partial translated text failed check, will automatically retry in the next attempt"
     translator_task_success: str = "Task time {TIME} seconds, {LINES} lines of text, input tokens {PT}, output tokens {CT}"
     translator_too_many_task: str = "Too many real-time tasks. Details hidden for performance ...."
     translator_no_items: str = "No translatable data was found. Please check that the input file and project settings are correct ..."
@@ -189,6 +206,10 @@ class LocalizerEN(LocalizerBase):
     platform_edit_page_model_content: str = "Current model in use: {MODEL}"
     platform_edit_page_model_edit: str = "Manual Input"
     platform_edit_page_model_sync: str = "Fetch Online"
+    platform_edit_page_rpm_limit_title: str = "Requests Per Minute Limit (RPM)"
+    platform_edit_page_rpm_limit_content: str = "Maximum number of requests per minute for each API key. Requests wait for budget instead of failing. 0 means no limit"
+    platform_edit_page_tpm_limit_title: str = "Tokens Per Minute Limit (TPM)"
+    platform_edit_page_tpm_limit_content: str = "Maximum number of tokens per minute for each API key. Requests wait for budget instead of failing. 0 means no limit"
 
     # 参数编辑
     args_edit_page_top_p_title: str = "top_p"
@@ -227,6 +248,7 @@ class LocalizerEN(LocalizerBase):
     translation_page_status_stopping = "Stopping"
     translation_page_indeterminate_saving = "Saving cache file ..."
     translation_page_indeterminate_stoping = "Stopping translation task ..."
+    translation_page_indeterminate_loading = "Loading cache file ... {PERCENT}%"
     translation_page_card_time = "Elapsed Time"
     translation_page_card_remaining_time = "Remaining Time"
     translation_page_card_line = "Translated Lines"
@@ -255,8 +277,8 @@ class LocalizerEN(LocalizerBase):
         "\n"
         "If the model doesn't respond in time, the translation task will fail, unit is Seconds. Not applicable to Google models."
     )
-    basic_settings_page_max_round_title = "Maximum Translation Rounds"
-    basic_settings_page_max_round_content = "After one translation round, if entries are still untranslated, restart translation until finished or the round limit is reached."
+    basic_settings_page_max_round_title = "Maximum Attempts per Entry"
+    basic_settings_page_max_round_content = "Failed entries are re-chunked and resubmitted right away until they are translated or the attempt limit is reached."
 
     # 高级功能
     advance_feature_page_auto_glossary_enable = "Auto Complete Glossary (Experimental feature, SakuraLLM model not supported)"
@@ -0,0 +1,193 @@
+import re
+import zlib
+import threading
+import collections
+from typing import Self
+
+from base.Base import Base
+from module.Normalizer import Normalizer
+from module.ExpertConfig import ExpertConfig
+from module.Cache.CacheItem import CacheItem
+
+# 近似匹配的翻译记忆
+# 将原文中的数字与控制代码替换为占位符后，以字符 N-Gram 的 MinHash 签名建立局部敏感哈希索引，查询时只需要检查少量候选条目
+class FuzzyMemory(Base):
+
+    # 占位符
+    PLACEHOLDER = "\x00"
+
+    # 需要替换为占位符的片段，控制代码优先于数字
+    RE_MASK = re.compile(
+        "|".join((
+            CacheItem.RE_RPGMAKER_IF.pattern,
+            CacheItem.RE_RPGMAKER.pattern,
+            CacheItem.RE_WOLF.pattern,
+            CacheItem.RE_RENPY.pattern,
+            r"\d+(?:\.\d+)?",
+        )),
+        flags = re.IGNORECASE,
+    )
+
+    # N-Gram 长度
+    NGRAM = 3
+
+    # 签名长度与每个分段的长度，签名被切分为 NUM_BINS / BAND_SIZE 个分段，任意分段相同的条目互为候选
+    NUM_BINS = 16
+    BAND_SIZE = 2
+
+    # 每次查询最多检查的候选条目数量
+    MAX_CANDIDATES = 32
+
+    # 索引数据
+    # 只会追加条目或整体替换某个条目，查询时无需加锁，清空索引时整体替换为新的对象
+    class Table():
+
+        def __init__(self) -> None:
+            self.entries: list[tuple[str, str]] = []                        # 条目原文与译文
+            self.masks: dict[str, int] = {}                                 # 替换占位符后的原文 -> 条目编号
+            self.buckets: dict[int, list[int]] = {}                         # 分段哈希 -> 条目编号
+
+    # 类线程锁，只用于添加条目，查询不加锁
+    LOCK = threading.Lock()
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.reset("")
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 是否启用
+    def is_enable(self) -> bool:
+        return ExpertConfig.get().fuzzy_memory_enable == True
+
+    # 清空索引，翻译设置指纹变化时，已有的译文不再适用
+    def reset(self, fingerprint: str) -> None:
+        with FuzzyMemory.LOCK:
+            self.fingerprint: str = fingerprint
+            self.table = FuzzyMemory.Table()
+
+    # 将数字与控制代码替换为占位符，返回替换后的文本与被替换的片段
+    def mask(self, text: str) -> tuple[str, list[str]]:
+        text = Normalizer.normalize(text.strip())
+        return FuzzyMemory.RE_MASK.sub(FuzzyMemory.PLACEHOLDER, text), FuzzyMemory.RE_MASK.findall(text)
+
+    # 获取 N-Gram 集合
+    def get_grams(self, text: str) -> set[str]:
+        if len(text) <= FuzzyMemory.NGRAM:
+            return {text}
+        else:
+            return {text[i : i + FuzzyMemory.NGRAM] for i in range(len(text) - FuzzyMemory.NGRAM + 1)}
+
+    # 计算 MinHash 签名，使用单次哈希分桶（One Permutation Hashing），空桶从后续的非空桶借值
+    def get_signature(self, grams: set[str]) -> list[int]:
+        empty = 0xFFFFFFFF
+        bins = [empty] * FuzzyMemory.NUM_BINS
+        for gram in grams:
+            h = zlib.crc32(gram.encode("utf-8", "surrogatepass"))
+            i = h % FuzzyMemory.NUM_BINS
+            v = h // FuzzyMemory.NUM_BINS
+            if v < bins[i]:
+                bins[i] = v
+
+        for i in range(FuzzyMemory.NUM_BINS):
+            if bins[i] == empty:
+                for k in range(1, FuzzyMemory.NUM_BINS):
+                    v = bins[(i + k) % FuzzyMemory.NUM_BINS]
+                    if v != empty:
+                        bins[i] = v + k * 0x9E3779B1
+                        break
+
+        return bins
+
+    # 计算各个分段的哈希值
+    def get_bands(self, signature: list[int]) -> list[int]:
+        return [
+            hash((i, *signature[i : i + FuzzyMemory.BAND_SIZE]))
+            for i in range(0, FuzzyMemory.NUM_BINS, FuzzyMemory.BAND_SIZE)
+        ]
+
+    # 添加条目
+    def add(self, src: str, dst: str) -> None:
+        masked, _ = self.mask(src)
+        if masked.strip(FuzzyMemory.PLACEHOLDER) == "" or dst == "":
+            return None
+
+        with FuzzyMemory.LOCK:
+            table = self.table
+
+            # 相同的原文只保留最新的译文
+            index = table.masks.get(masked)
+            if index is not None:
+                table.entries[index] = (src, dst)
+                return None
+
+            # 达到容量上限后不再添加
+            if len(table.entries) >= ExpertConfig.get().fuzzy_memory_max_entries:
+                return None
+
+            # 先添加条目再添加到分段中，以便查询时分段中的条目编号总是有效的
+            index = len(table.entries)
+            table.entries.append((src, dst))
+            table.masks[masked] = index
+            for band in self.get_bands(self.get_signature(self.get_grams(masked))):
+                table.buckets.setdefault(band, []).append(index)
+
+    # 添加已翻译的条目
+    def add_items(self, items: list[CacheItem]) -> None:
+        if self.is_enable() == False:
+            return None
+
+        for item in items:
+            self.add(item.get_src(), item.get_dst())
+
+    # 查找最相似的条目，返回 相似度、原文、译文，相似度低于阈值时返回 None
+    def search(self, src: str, threshold: float) -> tuple[float, str, str]:
+        masked, _ = self.mask(src)
+        grams = self.get_grams(masked)
+        bands = self.get_bands(self.get_signature(grams))
+
+        # 统计候选条目与查询文本相同的分段数量，优先检查相同分段较多的条目
+        table = self.table
+        counter = collections.Counter()
+        for band in bands:
+            counter.update(table.buckets.get(band, ()))
+
+        # 以 N-Gram 集合的 Jaccard 相似度验证候选条目
+        result = None
+        for index, _ in counter.most_common(FuzzyMemory.MAX_CANDIDATES):
+            src_old, dst_old = table.entries[index]
+            candidate = self.get_grams(self.mask(src_old)[0])
+            similarity = len(grams & candidate) / max(1, len(grams | candidate))
+            if similarity >= threshold and (result is None or similarity > result[0]):
+                result = (similarity, src_old, dst_old)
+
+        return result
+
+    # 复用译文，只在原文仅有数字或控制代码不同，且译文中完整保留了这些片段时，替换对应的片段后返回译文
+    def reuse(self, src: str) -> str:
+        masked, tokens = self.mask(src)
+        table = self.table
+        index = table.masks.get(masked)
+        if index is None:
+            return None
+        src_old, dst_old = table.entries[index]
+
+        # 旧原文中的片段与新原文中的片段一一对应
+        _, tokens_old = self.mask(src_old)
+        mapping: dict[str, str] = {}
+        for old, new in zip(tokens_old, tokens):
+            if mapping.setdefault(old, new) != new:
+                return None
+
+        # 译文中的片段必须与旧原文中的片段完全一致，否则无法确定替换位置
+        if sorted(FuzzyMemory.RE_MASK.findall(dst_old)) != sorted(tokens_old):
+            return None
+
+        return FuzzyMemory.RE_MASK.sub(lambda m: mapping.get(m.group(0), m.group(0)), dst_old)
@@ -0,0 +1,210 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Self
+
+import rapidjson as json
+
+from base.Base import Base
+from module.Normalizer import Normalizer
+from module.ExpertConfig import ExpertConfig
+from module.PromptBuilder import PromptBuilder
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheManager import CacheManager
+from module.Localizer.Localizer import Localizer
+
+# 跨项目的翻译记忆
+# 以 正规化后的原文 + 文本类型 + 翻译设置指纹 为键保存译文，翻译设置（语言、提示词、术语表、替换规则等）相同时，相同的原文可以直接复用译文
+class TranslationMemory(Base):
+
+    # 翻译记忆路径
+    PATH = "./resource/translation_memory.db"
+
+    # 表结构
+    SCHEMA: tuple[str] = (
+        "CREATE TABLE IF NOT EXISTS memory (key BLOB PRIMARY KEY, fingerprint TEXT, src TEXT, dst TEXT, text_type TEXT, last_used REAL)",
+        "CREATE INDEX IF NOT EXISTS idx_memory_last_used ON memory (last_used)",
+        "CREATE INDEX IF NOT EXISTS idx_memory_fingerprint ON memory (fingerprint, last_used)",
+        "CREATE TABLE IF NOT EXISTS imports (path TEXT PRIMARY KEY, mtime REAL)",
+    )
+
+    # 单次查询的键数量
+    QUERY_BATCH_SIZE = 512
+
+    # 外部译文的指纹，来源项目没有记录翻译设置时使用，不会与任何翻译设置的指纹相同
+    FOREIGN_FINGERPRINT = "FOREIGN"
+
+    # 缓冲区中的记录数量达到此值时写入数据库
+    FLUSH_THRESHOLD = 1024
+
+    # 类线程锁
+    LOCK = threading.Lock()
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.fingerprint: str = ""
+        self.buffer: list[tuple] = []
+        self.connection: sqlite3.Connection = None
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 是否启用
+    def is_enable(self) -> bool:
+        return ExpertConfig.get().translation_memory_enable == True
+
+    # 连接数据库，需要在锁内调用
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            os.makedirs(os.path.dirname(TranslationMemory.PATH), exist_ok = True)
+            self.connection = sqlite3.connect(TranslationMemory.PATH, check_same_thread = False)
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+            for sql in TranslationMemory.SCHEMA:
+                self.connection.execute(sql)
+
+        return self.connection
+
+    # 计算翻译设置指纹，影响最终译文的设置发生变化时，指纹随之变化
+    def get_fingerprint(self, config: dict) -> str:
+        data = {
+            "source_language": config.get("source_language"),
+            "target_language": config.get("target_language"),
+            "prompt": PromptBuilder(config).build_main([])[0],
+            "glossary": config.get("glossary_data") if config.get("glossary_enable") == True else [],
+            "pre_translation_replacement": config.get("pre_translation_replacement_data") if config.get("pre_translation_replacement_enable") == True else [],
+            "post_translation_replacement": config.get("post_translation_replacement_data") if config.get("post_translation_replacement_enable") == True else [],
+            "traditional_chinese": config.get("traditional_chinese_enable") == True,
+        }
+
+        return hashlib.blake2b(json.dumps(data, ensure_ascii = False, sort_keys = True).encode("utf-8"), digest_size = 16).hexdigest()
+
+    # 设置当前使用的翻译设置指纹
+    def set_fingerprint(self, config: dict) -> None:
+        self.fingerprint = self.get_fingerprint(config)
+
+    # 计算条目的键
+    def get_key(self, fingerprint: str, item: CacheItem) -> bytes:
+        text = f"{fingerprint}\0{item.get_text_type()}\0{Normalizer.normalize(item.get_src())}"
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size = 16).digest()
+
+    # 查找条目的译文，返回 条目位置 -> 译文 的映射
+    def lookup(self, items: list[CacheItem]) -> dict[int, str]:
+        if self.is_enable() == False or len(items) == 0:
+            return {}
+
+        keys = [self.get_key(self.fingerprint, item) for item in items]
+        found: dict[bytes, str] = {}
+        with TranslationMemory.LOCK:
+            try:
+                connection = self.connect()
+                unique = list(dict.fromkeys(keys))
+                for i in range(0, len(unique), TranslationMemory.QUERY_BATCH_SIZE):
+                    batch = unique[i : i + TranslationMemory.QUERY_BATCH_SIZE]
+                    for key, dst in connection.execute(f"SELECT key, dst FROM memory WHERE key IN ({", ".join("?" for _ in batch)})", batch):
+                        found[key] = dst
+
+                # 更新命中条目的使用时间
+                with connection:
+                    connection.executemany("UPDATE memory SET last_used = ? WHERE key = ?", ((time.time(), key) for key in found))
+            except Exception as e:
+                self.debug(Localizer.get().log_read_cache_file_fail, e)
+
+        return {i: found.get(key) for i, key in enumerate(keys) if key in found}
+
+    # 获取当前翻译设置下最近使用的记录，返回 原文、译文 列表
+    def get_recent_entries(self, limit: int) -> list[tuple[str, str]]:
+        if self.is_enable() == False:
+            return []
+
+        with TranslationMemory.LOCK:
+            try:
+                return self.connect().execute(
+                    "SELECT src, dst FROM memory WHERE fingerprint = ? ORDER BY last_used DESC LIMIT ?",
+                    (self.fingerprint, limit),
+                ).fetchall()
+            except Exception as e:
+                self.debug(Localizer.get().log_read_cache_file_fail, e)
+                return []
+
+    # 添加已翻译的条目
+    def add(self, items: list[CacheItem], fingerprint: str = None) -> None:
+        if self.is_enable() == False:
+            return None
+
+        fingerprint = self.fingerprint if fingerprint is None else fingerprint
+        with TranslationMemory.LOCK:
+            for item in items:
+                if item.get_dst() == "":
+                    continue
+
+                self.buffer.append((
+                    self.get_key(fingerprint, item),
+                    fingerprint,
+                    item.get_src(),
+                    item.get_dst(),
+                    item.get_text_type(),
+                    time.time(),
+                ))
+
+            flush = len(self.buffer) >= TranslationMemory.FLUSH_THRESHOLD
+
+        if flush == True:
+            self.flush()
+
+    # 将缓冲区中的记录写入数据库，并淘汰超出容量的最久未使用的记录
+    def flush(self) -> None:
+        with TranslationMemory.LOCK:
+            if len(self.buffer) == 0:
+                return None
+
+            records, self.buffer = self.buffer, []
+            try:
+                connection = self.connect()
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO memory (key, fingerprint, src, dst, text_type, last_used) VALUES (?, ?, ?, ?, ?, ?)", records)
+
+                    # 淘汰超出容量的记录
+                    overflow = connection.execute("SELECT COUNT(*) FROM memory").fetchone()[0] - ExpertConfig.get().translation_memory_max_entries
+                    if overflow > 0:
+                        connection.execute("DELETE FROM memory WHERE key IN (SELECT key FROM memory ORDER BY last_used LIMIT ?)", (overflow, ))
+            except Exception as e:
+                self.debug(Localizer.get().log_write_cache_file_fail, e)
+
+    # 从已有项目的缓存中导入已翻译的条目，缓存没有变化时跳过
+    def import_from_cache(self, output_folder: str) -> int:
+        cache_path = f"{output_folder}/cache"
+        if self.is_enable() == False or not os.path.isdir(cache_path):
+            return 0
+
+        mtime = max((os.path.getmtime(f"{root}/{name}") for root, _, names in os.walk(cache_path) for name in names), default = 0)
+        with TranslationMemory.LOCK:
+            row = self.connect().execute("SELECT mtime FROM imports WHERE path = ?", (os.path.abspath(output_folder), )).fetchone()
+        if row is not None and row[0] >= mtime:
+            return 0
+
+        # 读取缓存
+        cache_manager = CacheManager(tick = False)
+        cache_manager.load_from_file(output_folder)
+        items = [
+            item for item in cache_manager.get_items()
+            if item.get_status() in (Base.TranslationStatus.TRANSLATED, Base.TranslationStatus.TRANSLATED_IN_PAST)
+        ]
+
+        # 写入翻译记忆，使用来源项目最近一次翻译时的翻译设置指纹
+        fingerprint = cache_manager.get_project().get_fingerprint()
+        self.add(items, fingerprint if fingerprint != "" else TranslationMemory.FOREIGN_FINGERPRINT)
+        self.flush()
+        with TranslationMemory.LOCK:
+            with self.connect() as connection:
+                connection.execute("INSERT OR REPLACE INTO imports (path, mtime) VALUES (?, ?)", (os.path.abspath(output_folder), mtime))
+
+        return len(items)
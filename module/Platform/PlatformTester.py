@@ -79,8 +79,8 @@ class PlatformTester(Base):
             ]
 
         # 开始测试
-        requester = TranslatorRequester(config, platform, 0)
         for key in platform.get("api_key"):
+            requester = TranslatorRequester(config, platform | {"api_key": [key]}, 0)
             self.print("")
             self.info(f"{Localizer.get().platofrm_tester_key} - {key}")
             self.info(f"{Localizer.get().platofrm_tester_messages} - {messages}")
@@ -122,6 +122,21 @@ class PromptBuilder(Base):
                 "Preceding Text (for reference only, no translation needed):"
                 + "\n" + "\n".join([item.get_src().strip().replace("\n", "\\n") for item in preceding_items])
             )
+    # 构造参考译文
+    def build_reference(self, pairs: list[tuple[str, str]]) -> str:
+        if pairs == []:
+            return ""
+        elif self.target_language == BaseLanguage.ZH:
+            return (
+                "参考译文（相似原文的已有译文，仅用于保持用词与风格一致，无需翻译）："
+                + "\n" + "\n".join([f"{src.strip().replace("\n", "\\n")} -> {dst.strip().replace("\n", "\\n")}" for src, dst in pairs])
+            )
+        else:
+            return (
+                "Reference Translations (existing translations of similar text, for consistency only, no translation needed):"
+                + "\n" + "\n".join([f"{src.strip().replace("\n", "\\n")} -> {dst.strip().replace("\n", "\\n")}" for src, dst in pairs])
+            )
+
     # 构造术语表
     def build_glossary(self, src_dict: dict) -> str:
         # 将输入字典中的所有值转换为集合
@@ -16,7 +16,16 @@ from module.Cache.CacheManager import CacheManager
 from module.Filter.RuleFilter import RuleFilter
 from module.Filter.LanguageFilter import LanguageFilter
 from module.Localizer.Localizer import Localizer
+from module.ExpertConfig import ExpertConfig
+from module.Memory.FuzzyMemory import FuzzyMemory
+from module.Memory.TranslationMemory import TranslationMemory
 from module.Translator.TranslatorTask import TranslatorTask
+from module.Translator.TranslatorAsyncEngine import TranslatorAsyncEngine
+from module.Translator.TranslatorChunkController import TranslatorChunkController
+from module.Translator.TranslatorHedgePolicy import TranslatorHedgePolicy
+from module.Translator.TranslatorKeyScheduler import TranslatorKeyScheduler
+from module.Translator.TranslatorDispatcher import TranslatorDispatcher
+from module.Translator.TranslatorConcurrencyController import TranslatorConcurrencyController
 from module.PromptBuilder import PromptBuilder
 from module.ResultChecker import ResultChecker
 
@@ -32,6 +41,14 @@ class Translator(Base):
         # 线程锁
         self.data_lock = threading.Lock()
 
+        # 已提交但尚未结束的翻译任务数量，各个条目的尝试次数，以及各个尝试代次的 [已提交, 已结束] 任务数量
+        self.task_count: int = 0
+        self.task_condition = threading.Condition()
+        self.attempts: dict[int, int] = {}
+        self.generations: dict[int, list[int]] = {}
+        self.generation_printed: int = -1
+        self.submitting: bool = False
+
         # 注册事件
         self.subscribe(Base.Event.TRANSLATION_STOP, self.translation_stop)
         self.subscribe(Base.Event.TRANSLATION_START, self.translation_start)
@@ -86,14 +103,15 @@ class Translator(Base):
 
     # 翻译结果手动导出事件
     def translation_manual_export_target(self, event: int, data: dict) -> None:
-        # 复制一份以避免影响原始数据
-        items = self.cache_manager.copy_items()
+        # 使用写时复制快照，导出期间翻译任务可以继续更新条目，对快照的修改也不会影响原始数据
+        with self.cache_manager.create_snapshot() as snapshot:
+            items = snapshot.get_items()
 
-        # MTool 优化器后处理
-        self.mtool_optimizer_postprocess(items)
+            # MTool 优化器后处理
+            self.mtool_optimizer_postprocess(items)
 
-        # 检查结果并写入文件
-        self.check_and_wirte_result(items)
+            # 检查结果并写入文件
+            self.check_and_wirte_result(items)
 
     # 翻译状态检查事件
     def translation_project_status_check(self, event: int, data: dict) -> None:
@@ -134,6 +152,7 @@ class Translator(Base):
             if platform.get("id") == self.config.get("activate_platform"):
                 self.platform = platform
                 break
+        batch_size = self.config.get("batch_size")
         self.initialize_proxy()
         self.initialize_batch_size()
 
@@ -184,87 +203,58 @@ class Translator(Base):
         # MTool 优化器预处理
         self.mtool_optimizer_preprocess(self.cache_manager.get_items())
 
-        # 开始循环
-        for current_round in range(self.config.get("max_round") + 1):
-            # 检测是否需要停止任务
-            if Base.WORK_STATUS == Base.Status.STOPPING:
-                # 循环次数比实际最大轮次要多一轮，当触发停止翻译的事件时，最后都会从这里退出任务
-                # 执行到这里说明停止翻译的任务已经执行完毕，可以重置内部状态了
-                self.translating = False
-                Base.WORK_STATUS = Base.Status.IDLE
-                return None
-
-            # 获取 待翻译 状态的条目数量
-            item_count_status_untranslated = self.cache_manager.get_item_count_by_status(Base.TranslationStatus.UNTRANSLATED)
-
-            # 判断是否需要继续翻译
-            if item_count_status_untranslated == 0:
-                self.print("")
-                self.info(Localizer.get().translator_done)
-                self.info(Localizer.get().translator_writing)
-                self.print("")
-                break
+        # 翻译记忆
+        self.translation_memory_apply(self.cache_manager.get_items())
 
-            # 达到最大翻译轮次时
-            if item_count_status_untranslated > 0 and current_round == self.config.get("max_round"):
-                self.print("")
-                self.warning(Localizer.get().translator_fail)
-                self.warning(Localizer.get().translator_writing)
-                self.print("")
-                break
+        # 近似匹配的翻译记忆
+        self.fuzzy_memory_prepare(self.cache_manager.get_items())
 
-            # 第一轮时且不是继续翻译时，记录总行数
-            if current_round == 0 and status == Base.TranslationStatus.UNTRANSLATED:
-                self.extras["total_line"] = item_count_status_untranslated
+        # 项目内去重
+        self.deduplicate(self.cache_manager.get_items())
 
-            # 第二轮开始对半切分
-            if current_round > 0:
-                self.config["task_token_limit"] = max(1, int(self.config.get("task_token_limit") / 2))
+        # 分块大小控制器
+        self.chunk_controller = TranslatorChunkController(self.config.get("task_token_limit"), self.config.get("request_timeout"))
 
-            # 生成缓存数据条目片段
-            chunks, preceding_chunks = self.cache_manager.generate_item_chunks(self.config.get("task_token_limit"))
+        # 任务分发器，每个接口都有独立的并发任务数控制器
+        self.dispatcher = self.create_dispatcher(batch_size)
+        self.attempts = {}
+        self.generations = {}
+        self.generation_printed = -1
 
-            # 仅在第一轮启用参考上文功能
-            if current_round > 0:
-                preceding_chunks = [[] for _ in range(len(preceding_chunks))]
+        # 获取 待翻译 状态的条目数量
+        item_count_status_untranslated = self.cache_manager.get_item_count_by_status(Base.TranslationStatus.UNTRANSLATED)
 
-            # 生成翻译任务
-            tasks: list[TranslatorTask] = []
-            self.print("")
-            for items, preceding_items in tqdm(zip(chunks, preceding_chunks), desc = Localizer.get().translator_generate_task, total = len(chunks)):
-                tasks.append(
-                    TranslatorTask(
-                        self.config,
-                        self.platform,
-                        items,
-                        preceding_items,
-                        self.cache_manager,
-                    )
-                )
-            self.print("")
+        # 不是继续翻译时，记录总行数
+        if status == Base.TranslationStatus.UNTRANSLATED:
+            self.extras["total_line"] = item_count_status_untranslated
 
-            # 输出开始翻译的日志
+        # 执行翻译任务，失败的条目在任务结束后立即重新提交，没有轮次之间的等待，每个条目最多尝试 最大尝试次数 次
+        # 首次提交即为第 1 次尝试，最大尝试次数小于 1 时不执行翻译任务
+        if item_count_status_untranslated > 0 and self.config.get("max_round") >= 1:
+            self.run_pipeline()
+
+        # 检测是否需要停止任务
+        if Base.WORK_STATUS == Base.Status.STOPPING:
+            # 执行到这里说明停止翻译的任务已经执行完毕，可以重置内部状态了
+            TranslationMemory.get().flush()
+            self.translating = False
+            Base.WORK_STATUS = Base.Status.IDLE
+            return None
+
+        # 判断是否全部完成
+        if self.cache_manager.get_item_count_by_status(Base.TranslationStatus.UNTRANSLATED) == 0:
             self.print("")
-            self.info(f"{Localizer.get().translator_current_round} - {current_round + 1}")
-            self.info(f"{Localizer.get().translator_max_round} - {self.config.get("max_round")}")
+            self.info(Localizer.get().translator_done)
+            self.info(Localizer.get().translator_writing)
             self.print("")
-            self.info(f"{Localizer.get().translator_name} - {self.platform.get("name")}")
-            self.info(f"{Localizer.get().translator_api_url} - {self.platform.get("api_url")}")
-            self.info(f"{Localizer.get().translator_model} - {self.platform.get("model")}")
-            if self.config.get("proxy_enable") == True and self.config.get("proxy_url") != "":
-                self.print("")
-                self.info(f"{Localizer.get().translator_proxy_url} - {self.config.get("proxy_url")}")
+        else:
             self.print("")
-            if self.platform.get("api_format") != Base.APIFormat.SAKURALLM:
-                self.info(Localizer.get().translator_prompt.replace("{PROMPT}", PromptBuilder(self.config).build_main([])[0]))
-            self.info(Localizer.get().translator_begin.replace("{TASKS}", str(len(tasks))).replace("{BATCH_SIZE}", str(self.config.get("batch_size"))))
+            self.warning(Localizer.get().translator_fail)
+            self.warning(Localizer.get().translator_writing)
             self.print("")
 
-            # 开始执行翻译任务
-            with concurrent.futures.ThreadPoolExecutor(max_workers = self.config.get("batch_size"), thread_name_prefix = "translator") as executor:
-                for task in tasks:
-                    future = executor.submit(task.start, current_round)
-                    future.add_done_callback(self.task_done_callback)
+        # 将翻译记忆缓冲区中的记录写入数据库
+        TranslationMemory.get().flush()
 
         # MTool 优化器后处理
         self.mtool_optimizer_postprocess(self.cache_manager.get_items())
@@ -296,9 +286,13 @@ class Translator(Base):
 
     # 初始化 batch_size
     def initialize_batch_size(self) -> None:
+        self.config["batch_size"] = self.get_batch_size(self.platform, self.config.get("batch_size"))
+
+    # 获取接口的并发任务数，能获取到 llama.cpp 的 slots 数量时以其为准
+    def get_batch_size(self, platform: dict, batch_size: int) -> int:
         try:
             response_json = None
-            response = httpx.get(re.sub(r"/v1$", "", self.platform.get("api_url")) + "/slots")
+            response = httpx.get(re.sub(r"/v1$", "", platform.get("api_url")) + "/slots")
             response.raise_for_status()
             response_json = response.json()
         except Exception as e:
@@ -306,9 +300,11 @@ class Translator(Base):
             self.debug(Localizer.get().log_load_llama_cpp_slots_num_fail, e)
 
         if isinstance(response_json, list) and len(response_json) > 0:
-            self.config["batch_size"] = len(response_json)
-        elif self.config.get("batch_size") == 0:
-            self.config["batch_size"] = 4
+            return len(response_json)
+        elif batch_size == 0:
+            return 4
+        else:
+            return batch_size
 
     # 规则过滤
     def rule_filter(self, items: list[CacheItem]) -> None:
@@ -355,6 +351,81 @@ class Translator(Base):
         self.print("")
         self.info(Localizer.get().translator_language_filter.replace("{COUNT}", str(count)))
 
+    # 翻译记忆
+    def translation_memory_apply(self, items: list[CacheItem]) -> None:
+        memory = TranslationMemory.get()
+
+        # 计算当前翻译设置的指纹，并记录到项目中，以便之后从此项目导入翻译记忆
+        memory.set_fingerprint(self.config)
+        self.cache_manager.get_project().set_fingerprint(memory.fingerprint)
+        if len(items) == 0 or memory.is_enable() == False:
+            return None
+
+        # 导入其他项目的缓存
+        for folder in ExpertConfig.get().translation_memory_import_folders:
+            count = memory.import_from_cache(folder)
+            if count > 0:
+                self.info(Localizer.get().translator_translation_memory_import.replace("{PATH}", folder).replace("{COUNT}", str(count)))
+
+        # 查找待翻译条目的译文，找到时直接标记为已翻译
+        pending = [items[i] for i in self.cache_manager.get_pending_indices()]
+        found = memory.lookup(pending)
+        for i, dst in found.items():
+            pending[i].update(dst = dst, status = Base.TranslationStatus.TRANSLATED)
+        self.cache_manager.append_journal([pending[i] for i in found])
+
+        # 输出结果
+        self.print("")
+        self.info(Localizer.get().translator_translation_memory.replace("{COUNT}", str(len(found))))
+
+    # 准备近似匹配的翻译记忆
+    def fuzzy_memory_prepare(self, items: list[CacheItem]) -> None:
+        memory = FuzzyMemory.get()
+        if memory.is_enable() == False:
+            return None
+
+        # 翻译设置发生变化时重建索引，并预先加载翻译记忆中最近使用的记录
+        fingerprint = TranslationMemory.get().get_fingerprint(self.config)
+        if memory.fingerprint != fingerprint:
+            memory.reset(fingerprint)
+            for src, dst in TranslationMemory.get().get_recent_entries(ExpertConfig.get().fuzzy_memory_max_entries):
+                memory.add(src, dst)
+
+        # 添加当前项目中已翻译的条目
+        memory.add_items([item for item in items if item.get_status() == Base.TranslationStatus.TRANSLATED])
+
+    # 复用近似匹配的译文
+    def fuzzy_memory_apply(self, items: list[CacheItem]) -> None:
+        memory = FuzzyMemory.get()
+        if len(items) == 0 or memory.is_enable() == False or ExpertConfig.get().fuzzy_memory_auto_reuse == False:
+            return None
+
+        # 原文只有数字或控制代码不同时，直接复用译文
+        reused: list[CacheItem] = []
+        for i in self.cache_manager.get_pending_indices():
+            dst = memory.reuse(items[i].get_src())
+            if dst is not None:
+                items[i].update(dst = dst, status = Base.TranslationStatus.TRANSLATED)
+                reused.append(items[i])
+        self.cache_manager.append_journal(reused)
+        TranslationMemory.get().add(reused)
+
+        # 输出结果
+        self.print("")
+        self.info(Localizer.get().translator_fuzzy_memory.replace("{COUNT}", str(len(reused))))
+
+    # 项目内去重
+    def deduplicate(self, items: list[CacheItem]) -> None:
+        if len(items) == 0 or ExpertConfig.get().deduplication_in_project == False:
+            return None
+
+        # 原文相同的条目只翻译一次
+        count, tokens = self.cache_manager.deduplicate()
+
+        # 输出结果
+        self.print("")
+        self.info(Localizer.get().translator_deduplicate.replace("{COUNT}", str(count)).replace("{TOKENS}", str(tokens)))
+
     # MTool 优化器预处理
     def mtool_optimizer_preprocess(self, items: list[CacheItem]) -> None:
         if len(items) == 0 or self.config.get("mtool_optimizer_enable") == False:
@@ -427,6 +498,214 @@ class Translator(Base):
         self.info(Localizer.get().translator_write.replace("{PATH}", self.config.get("output_folder")))
         self.print("")
 
+    # 执行翻译任务
+    def run_pipeline(self) -> None:
+        # 复用只有数字或控制代码不同的原文的译文
+        self.fuzzy_memory_apply(self.cache_manager.get_items())
+
+        # 生成缓存数据条目片段
+        chunks, preceding_chunks = self.cache_manager.generate_item_chunks(self.config.get("task_token_limit"), self.chunk_controller.get_limits())
+
+        # 按需生成翻译任务，只在任务即将被提交时才执行预处理
+        tasks = (
+            TranslatorTask(
+                self.config,
+                self.platform,
+                items,
+                preceding_items,
+                self.cache_manager,
+            )
+            for items, preceding_items in zip(chunks, preceding_chunks)
+        )
+
+        # 输出开始翻译的日志
+        self.print("")
+        self.info(f"{Localizer.get().translator_max_round} - {self.config.get("max_round")}")
+        for backend in self.dispatcher.get_backends():
+            self.print("")
+            self.info(f"{Localizer.get().translator_name} - {backend.platform.get("name")}")
+            self.info(f"{Localizer.get().translator_api_url} - {backend.platform.get("api_url")}")
+            self.info(f"{Localizer.get().translator_model} - {backend.platform.get("model")}")
+            if ExpertConfig.get().adaptive_concurrency_enable == True:
+                self.info(
+                    Localizer.get().translator_concurrency.replace("{FLOOR}", str(backend.controller.floor))
+                        .replace("{CEILING}", str(backend.controller.get_ceiling()))
+                )
+        if self.config.get("proxy_enable") == True and self.config.get("proxy_url") != "":
+            self.print("")
+            self.info(f"{Localizer.get().translator_proxy_url} - {self.config.get("proxy_url")}")
+        self.print("")
+        if self.platform.get("api_format") != Base.APIFormat.SAKURALLM:
+            self.info(Localizer.get().translator_prompt.replace("{PROMPT}", PromptBuilder(self.config).build_main([])[0]))
+        self.info(Localizer.get().translator_begin.replace("{TASKS}", str(len(chunks))).replace("{BATCH_SIZE}", str(self.dispatcher.get_concurrency())))
+        self.info(Localizer.get().translator_chunk_utilization.replace("{UTILIZATION}", f"{self.cache_manager.chunk_utilization * 100:.2f}"))
+        self.print("")
+
+        # 开始执行翻译任务
+        # 已提交但尚未完成的首次任务数量不超过 并发任务数上限 + 预取窗口，任务完成后才会生成并提交新的任务
+        # 同时进行的请求数量由任务分发器按各个接口的并发任务数限制
+        ceiling = self.dispatcher.get_ceiling()
+        window = threading.BoundedSemaphore(ceiling + max(0, ExpertConfig.get().task_prefetch_size))
+        if self.is_async_engine() == True:
+            self.dispatcher.add_listener(TranslatorAsyncEngine.get().wake)
+        with concurrent.futures.ThreadPoolExecutor(max_workers = ceiling, thread_name_prefix = "translator") as executor:
+            self.submitting = True
+            for task in tasks:
+                # 等待窗口空出，触发停止翻译的事件时不再提交新的任务
+                # 任务没有成功提交时，由此处归还占用的窗口，否则由任务结束时的回调归还
+                window.acquire()
+                submitted = False
+                try:
+                    if Base.WORK_STATUS == Base.Status.STOPPING:
+                        break
+
+                    self.submit_task(executor, task, 0, window)
+                    submitted = True
+                finally:
+                    if submitted == False:
+                        window.release()
+
+            # 首次提交全部完成
+            with self.task_condition:
+                self.submitting = False
+            self.print_finished_generations()
+
+            # 等待全部任务结束，包括失败后重新提交的任务
+            with self.task_condition:
+                self.task_condition.wait_for(lambda: self.task_count == 0)
+
+    # 是否为拆分重试模式
+    def is_split_mode(self) -> bool:
+        return ExpertConfig.get().translation_scheduler_mode == "split"
+
+    # 创建任务分发器，当前激活的接口之外，同时使用专家配置中指定的其他接口
+    def create_dispatcher(self, batch_size: int) -> TranslatorDispatcher:
+        backends = [
+            TranslatorDispatcher.Backend(self.platform, self.create_concurrency_controller(self.config.get("batch_size"))),
+        ]
+        for id in dict.fromkeys(ExpertConfig.get().fan_out_platforms):
+            if id == self.platform.get("id"):
+                continue
+
+            platform = next((v for v in self.config.get("platforms") if v.get("id") == id), None)
+            if platform is not None:
+                backends.append(
+                    TranslatorDispatcher.Backend(platform, self.create_concurrency_controller(self.get_batch_size(platform, batch_size)))
+                )
+
+        return TranslatorDispatcher(backends)
+
+    # 创建并发任务数控制器，未启用自适应并发时并发任务数固定为设置中的值
+    def create_concurrency_controller(self, batch_size: int) -> TranslatorConcurrencyController:
+        if ExpertConfig.get().adaptive_concurrency_enable == False:
+            return TranslatorConcurrencyController(batch_size, batch_size, batch_size)
+
+        ceiling = ExpertConfig.get().adaptive_concurrency_max
+        if ceiling <= 0:
+            ceiling = batch_size
+
+        return TranslatorConcurrencyController(batch_size, ExpertConfig.get().adaptive_concurrency_min, ceiling)
+
+    # 是否使用异步请求引擎
+    def is_async_engine(self) -> bool:
+        return ExpertConfig.get().request_engine == "async"
+
+    # 提交翻译任务，attempt 为任务的尝试代次，首次提交的任务为第 0 代，失败后重新提交的任务为下一代
+    def submit_task(self, executor: concurrent.futures.ThreadPoolExecutor, task: TranslatorTask, attempt: int, window: threading.BoundedSemaphore = None) -> None:
+        with self.task_condition:
+            self.task_count = self.task_count + 1
+            self.generations.setdefault(attempt, [0, 0])[0] += 1
+
+        def callback(future: concurrent.futures.Future) -> None:
+            self.task_done_callback(future)
+            self.task_finish_callback(executor, task, attempt, window)
+
+        # 异步模式下请求在事件循环中执行，任务结束后的回调涉及缓存写入与任务生成，交给线程池执行以避免阻塞事件循环
+        if self.is_async_engine() == True:
+            future = TranslatorAsyncEngine.get().submit(
+                lambda backend: self.start_task_async(backend, task, attempt),
+                self.dispatcher.try_acquire,
+                self.dispatcher.release,
+            )
+            future.add_done_callback(lambda future: executor.submit(callback, future))
+        else:
+            future = executor.submit(self.dispatcher.run, self.start_task, task, attempt)
+            future.add_done_callback(callback)
+
+    # 在分配到的接口上执行翻译任务
+    def start_task(self, backend: TranslatorDispatcher.Backend, task: TranslatorTask, attempt: int) -> dict:
+        task.platform = backend.platform
+        return task.start(attempt)
+
+    # 在分配到的接口上执行翻译任务 - 异步，其他接口可以用于发出对冲请求
+    async def start_task_async(self, backend: TranslatorDispatcher.Backend, task: TranslatorTask, attempt: int) -> dict:
+        task.platform = backend.platform
+        task.hedge_platforms = [v.platform for v in self.dispatcher.get_backends() if v is not backend]
+        return await task.start_async(attempt)
+
+    # 翻译任务结束时
+    def task_finish_callback(self, executor: concurrent.futures.ThreadPoolExecutor, task: TranslatorTask, attempt: int, window: threading.BoundedSemaphore) -> None:
+        try:
+            if Base.WORK_STATUS != Base.Status.STOPPING:
+                self.retry(executor, task)
+        except Exception as e:
+            self.error(f"{Localizer.get().log_task_fail}", e)
+        finally:
+            if window is not None:
+                window.release()
+
+            with self.task_condition:
+                self.task_count = self.task_count - 1
+                self.generations.get(attempt)[1] += 1
+                self.task_condition.notify_all()
+
+            self.print_finished_generations()
+
+    # 立即重新提交任务中失败的条目，每个条目的尝试次数（包括首次提交）不超过最大尝试次数
+    # 拆分重试模式下将失败的条目对半拆分，否则按分块大小控制器决定的 Token 阈值重新切分
+    def retry(self, executor: concurrent.futures.ThreadPoolExecutor, task: TranslatorTask) -> None:
+        indices: list[int] = []
+        attempt = 0
+        with self.task_condition:
+            for item in task.items:
+                if item.get_status() != Base.TranslationStatus.UNTRANSLATED:
+                    continue
+
+                index = self.cache_manager.get_item_index(item)
+                self.attempts[index] = self.attempts.get(index, 1) + 1
+                if self.attempts.get(index) <= self.config.get("max_round"):
+                    indices.append(index)
+                    attempt = max(attempt, self.attempts.get(index))
+
+        if len(indices) == 0:
+            return None
+        elif self.is_split_mode() == True:
+            items = [self.cache_manager.get_items()[i] for i in indices]
+            chunks = [items[: (len(items) + 1) // 2], items[(len(items) + 1) // 2 :]]
+        else:
+            chunks, _, _ = self.cache_manager.plan_item_chunks(self.config.get("task_token_limit"), self.chunk_controller.get_limits(), indices)
+
+        # 重试时不使用参考上文
+        for chunk in chunks:
+            if len(chunk) > 0:
+                self.submit_task(executor, TranslatorTask(self.config, self.platform, chunk, [], self.cache_manager), attempt - 1)
+
+    # 输出已全部结束的尝试代次，只有更早的代次与首次提交全部结束后，一个代次才不会再有新的任务
+    def print_finished_generations(self) -> None:
+        with self.task_condition:
+            while self.submitting == False:
+                generation = self.generation_printed + 1
+                counts = self.generations.get(generation)
+                if counts is None or counts[0] != counts[1]:
+                    break
+
+                self.generation_printed = generation
+                self.print("")
+                self.info(Localizer.get().translator_generation_done.replace("{GENERATION}", str(generation + 1)).replace("{TASKS}", str(counts[0])))
+                self.chunk_controller.print_summary(self.cache_manager.get_pending_indices())
+                TranslatorKeyScheduler.get().print_summary([backend.platform for backend in self.dispatcher.get_backends()])
+                TranslatorHedgePolicy.get().print_summary()
+
     # 翻译任务完成时
     def task_done_callback(self, future: concurrent.futures.Future) -> None:
         try:
@@ -437,6 +716,17 @@ class Translator(Base):
             if result == None or len(result) == 0:
                 return
 
+            # 记录任务结果，用于决定失败条目下一次尝试时的 Token 阈值
+            self.chunk_controller.record(
+                [self.cache_manager.get_item_index(item) for item in result.get("items", [])],
+                [self.cache_manager.get_item_index(item) for item in result.get("items", []) if item.get_status() == Base.TranslationStatus.UNTRANSLATED],
+                result.get("errors", []),
+                result.get("time", 0),
+            )
+
+            # 根据请求结果调整对应接口的并发任务数
+            concurrency = self.dispatcher.record(result.get("platform_id"), result.get("request_error"), result.get("request_time", 0))
+
             # 记录数据
             with self.data_lock:
                 if result.get("check_result") is not None:
@@ -444,20 +734,22 @@ class Translator(Base):
                     new = {}
                     new["start_time"] = self.extras.get("start_time", 0)
                     new["total_line"] = self.extras.get("total_line", 0)
-                    new["line"] = self.extras.get("line", 0)
+                    new["line"] = self.extras.get("total_line", 0) - self.cache_manager.get_item_count_by_status(Base.TranslationStatus.UNTRANSLATED)
                     new["token"] = self.extras.get("token", 0) + result.get("prompt_tokens", 0) + result.get("completion_tokens", 0)
                     new["total_completion_tokens"] = self.extras.get("total_completion_tokens", 0)
                     new["time"] = time.time() - self.extras.get("start_time", 0)
+                    new["concurrency"] = concurrency
                     self.extras = new
                 else:
                     # 任务失败
                     new = {}
                     new["start_time"] = self.extras.get("start_time", 0)
                     new["total_line"] = self.extras.get("total_line", 0)
-                    new["line"] = self.extras.get("line", 0) + result.get("row_count", 0)
+                    new["line"] = self.extras.get("total_line", 0) - self.cache_manager.get_item_count_by_status(Base.TranslationStatus.UNTRANSLATED)
                     new["token"] = self.extras.get("token", 0) + result.get("prompt_tokens", 0) + result.get("completion_tokens", 0)
                     new["total_completion_tokens"] = self.extras.get("total_completion_tokens", 0) + result.get("completion_tokens", 0)
                     new["time"] = time.time() - self.extras.get("start_time", 0)
+                    new["concurrency"] = concurrency
                     self.extras = new
 
             # 更新翻译进度
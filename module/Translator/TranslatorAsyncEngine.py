@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import concurrent.futures
+from typing import Callable
+from typing import Coroutine
+from typing import Self
+
+from base.Base import Base
+
+# 异步请求引擎
+# 在独立的线程中运行一个常驻的事件循环，所有翻译任务的网络请求都以协程的形式在其中并发执行
+# 与线程池相比，大量并发请求只占用一个线程
+class TranslatorAsyncEngine(Base):
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.condition: asyncio.Condition = None
+
+        # 启动事件循环
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target = self.loop.run_forever, name = "translator_async_engine", daemon = True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 提交任务，返回 concurrent.futures.Future，可以与线程池返回的 Future 一样添加回调
+    # 协程在 acquire 返回有效的资源后才会创建并执行，结束后调用 release 释放资源，资源状态变化时需要调用 wake 唤醒等待中的任务
+    def submit(self, function: Callable[[object], Coroutine], acquire: Callable[[], object], release: Callable[[object], None]) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(self.limit(function, acquire, release), self.loop)
+
+    # 唤醒等待资源的任务，可以在任意线程中调用
+    def wake(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.notify(), self.loop)
+
+    # 获取条件变量，需要在事件循环中调用
+    def get_condition(self) -> asyncio.Condition:
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        return self.condition
+
+    # 唤醒等待中的协程
+    async def notify(self) -> None:
+        async with self.get_condition():
+            self.get_condition().notify_all()
+
+    # 等待资源后执行协程
+    async def limit(self, function: Callable[[object], Coroutine], acquire: Callable[[], object], release: Callable[[object], None]) -> object:
+        async with self.get_condition():
+            resource = await self.get_condition().wait_for(acquire)
+
+        try:
+            return await function(resource)
+        finally:
+            release(resource)
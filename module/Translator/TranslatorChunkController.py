@@ -0,0 +1,121 @@
+import threading
+import collections
+
+from base.Base import Base
+from module.Localizer.Localizer import Localizer
+from module.Response.ResponseChecker import ResponseChecker
+
+# 分块大小控制器
+# 根据任务的失败原因、各个 Token 阈值下的成功率与响应耗时，为失败的条目分别决定下一次尝试时使用的 Token 阈值
+# 只有导致整个任务失败的错误（数据解析失败、行数不一致、请求失败）或响应过慢时才会缩小阈值，个别行的错误优先以原阈值重试
+class TranslatorChunkController(Base):
+
+    # 需要缩小阈值的错误类型
+    SHRINK_ERRORS: tuple[str] = (
+        ResponseChecker.Error.UNKNOWN,
+        ResponseChecker.Error.FAIL_DATA,
+        ResponseChecker.Error.FAIL_LINE_COUNT,
+    )
+
+    # 响应耗时超过请求超时时间的此比例时，缩小阈值以避免超时
+    LATENCY_RATIO: float = 0.5
+
+    # 某个阈值下的任务成功率低于此值时，出现行错误的条目也缩小阈值
+    SUCCESS_RATE_THRESHOLD: float = 0.5
+
+    # 计算成功率所需的最少任务数量，避免任务较少时偶然的失败影响决策
+    SUCCESS_RATE_MIN_TASKS: int = 8
+
+    # 决策原因
+    class Reason():
+
+        LATENCY: str = "LATENCY"
+        SUCCESS_RATE: str = "SUCCESS_RATE"
+        LINE_ERROR: str = "LINE_ERROR"
+        LINE_ERROR_REPEAT: str = "LINE_ERROR_REPEAT"
+
+    def __init__(self, limit: int, timeout: int) -> None:
+        super().__init__()
+
+        # 初始化
+        self.limit = limit
+        self.timeout = timeout
+        self.limits: dict[int, int] = {}                                           # 条目位置 -> 下一次尝试时的 Token 阈值
+        self.failures: dict[int, int] = {}                                         # 条目位置 -> 失败次数
+        self.stats: dict[int, list[int]] = {}                                      # Token 阈值 -> [成功任务数, 任务总数]
+        self.reasons: collections.Counter = collections.Counter()                  # 上次输出日志后的决策原因统计
+
+        # 线程锁
+        self.lock = threading.Lock()
+
+    # 获取全部条目下一次尝试时的 Token 阈值
+    def get_limits(self) -> dict[int, int]:
+        with self.lock:
+            return dict(self.limits)
+
+    # 记录任务结果并为任务中失败的条目决定下一次尝试时的 Token 阈值，indices 为任务中全部条目的位置，failed 为其中失败的条目的位置
+    def record(self, indices: list[int], failed: list[int], errors: list[str], elapsed: float) -> None:
+        indices = [i for i in indices if i is not None]
+        failed = [i for i in failed if i is not None]
+        if len(indices) == 0:
+            return None
+
+        with self.lock:
+            # 任务中的条目使用的是同一个阈值
+            limit = self.limits.get(indices[0], self.limit)
+            success = all(v == ResponseChecker.Error.NONE for v in errors)
+
+            # 更新成功率统计
+            stat = self.stats.setdefault(limit, [0, 0])
+            stat[0] = stat[0] + (1 if success == True else 0)
+            stat[1] = stat[1] + 1
+            if success == True or len(failed) == 0:
+                return None
+
+            # 决定下一次尝试时的阈值
+            decisions: collections.Counter = collections.Counter()
+            shrink_error = next((v for v in errors if v in TranslatorChunkController.SHRINK_ERRORS), None)
+            for i in failed:
+                failure = self.failures.get(i, 0)
+                if shrink_error is not None:
+                    reason = shrink_error
+                elif elapsed >= self.timeout * TranslatorChunkController.LATENCY_RATIO:
+                    reason = TranslatorChunkController.Reason.LATENCY
+                elif stat[1] >= TranslatorChunkController.SUCCESS_RATE_MIN_TASKS and stat[0] / stat[1] < TranslatorChunkController.SUCCESS_RATE_THRESHOLD:
+                    reason = TranslatorChunkController.Reason.SUCCESS_RATE
+                elif failure > 0:
+                    reason = TranslatorChunkController.Reason.LINE_ERROR_REPEAT
+                else:
+                    reason = TranslatorChunkController.Reason.LINE_ERROR
+
+                self.limits[i] = limit if reason == TranslatorChunkController.Reason.LINE_ERROR else max(1, limit // 2)
+                self.failures[i] = failure + 1
+                decisions[f"{reason} -> {self.limits[i]}"] += 1
+                self.reasons[reason] += 1
+
+        # 输出决策日志
+        self.debug(
+            Localizer.get().translator_chunk_controller_decision.replace("{LIMIT}", str(limit))
+                .replace("{DECISIONS}", self.format_counter(decisions))
+        )
+
+    # 格式化计数
+    def format_counter(self, counter: collections.Counter) -> str:
+        return ", ".join(f"{k} × {v}" for k, v in counter.most_common())
+
+    # 输出待翻译条目的 Token 阈值分布与上次输出后的决策原因统计
+    def print_summary(self, pending_indices: list[int]) -> None:
+        with self.lock:
+            counter = collections.Counter(self.limits.get(i, self.limit) for i in pending_indices)
+            reasons, self.reasons = self.reasons, collections.Counter()
+            stats = {k: tuple(v) for k, v in self.stats.items()}
+
+        for limit, count in sorted(counter.items(), reverse = True):
+            success, total = stats.get(limit, (0, 0))
+            self.info(
+                Localizer.get().translator_chunk_controller.replace("{LIMIT}", str(limit))
+                    .replace("{COUNT}", str(count))
+                    .replace("{SUCCESS_RATE}", f"{success / total * 100:.2f}%" if total > 0 else "-")
+            )
+        if len(reasons) > 0:
+            self.info(Localizer.get().translator_chunk_controller_reason.replace("{REASONS}", self.format_counter(reasons)))
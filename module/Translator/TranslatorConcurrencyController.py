@@ -0,0 +1,92 @@
+import time
+import threading
+
+from base.Base import Base
+from module.Localizer.Localizer import Localizer
+
+# 并发任务数控制器
+# 按加性增、乘性减（AIMD）的方式调整同时进行的请求数量：
+# 请求成功且响应耗时没有明显高于基准耗时时，每完成约 当前并发数 个请求，并发数增加 1
+# 出现限流（429）、服务端错误（5xx）或超时时，并发数减半，在此之前发出的请求的失败不再重复减半
+class TranslatorConcurrencyController(Base):
+
+    # 请求错误类型
+    class Error():
+
+        NONE: str = "NONE"
+        RATE_LIMIT: str = "RATE_LIMIT"
+        SERVER_ERROR: str = "SERVER_ERROR"
+        TIMEOUT: str = "TIMEOUT"
+        OTHER: str = "OTHER"
+
+    # 需要减小并发数的错误类型
+    DECREASE_ERRORS: tuple[str] = (
+        Error.RATE_LIMIT,
+        Error.SERVER_ERROR,
+        Error.TIMEOUT,
+    )
+
+    # 减小并发数时的比例
+    DECREASE_RATIO: float = 0.5
+
+    # 响应耗时超过基准耗时的此倍数时，视为服务端已经过载，不再增加并发数
+    LATENCY_TOLERANCE: float = 2.0
+
+    # 基准耗时的平滑系数，基准耗时在响应变快时立即跟随，变慢时缓慢跟随
+    LATENCY_ALPHA: float = 0.02
+
+    def __init__(self, concurrency: int, floor: int, ceiling: int) -> None:
+        super().__init__()
+
+        # 初始化
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.concurrency: float = float(min(self.ceiling, max(self.floor, concurrency)))
+        self.baseline: float = 0.0                                                  # 基准响应耗时
+        self.decrease_time: float = 0.0                                             # 上次减小并发数的时间
+
+        # 线程锁
+        self.lock = threading.Lock()
+
+    # 获取当前的并发数
+    def get_concurrency(self) -> int:
+        return int(self.concurrency)
+
+    # 获取并发数上限
+    def get_ceiling(self) -> int:
+        return self.ceiling
+
+    # 根据请求结果调整并发数，error 为请求错误类型，elapsed 为请求耗时，返回调整后的并发数
+    def record(self, error: str, elapsed: float) -> int:
+        if error is None:
+            return self.get_concurrency()
+
+        with self.lock:
+            before = int(self.concurrency)
+
+            if error in TranslatorConcurrencyController.DECREASE_ERRORS:
+                # 在上次减小之前发出的请求，其失败已经体现在上次的调整中
+                if time.time() - elapsed >= self.decrease_time:
+                    self.concurrency = max(float(self.floor), self.concurrency * TranslatorConcurrencyController.DECREASE_RATIO)
+                    self.decrease_time = time.time()
+            elif error == TranslatorConcurrencyController.Error.NONE:
+                # 更新基准耗时
+                if self.baseline == 0:
+                    self.baseline = elapsed
+                else:
+                    self.baseline = min(elapsed, self.baseline + (elapsed - self.baseline) * TranslatorConcurrencyController.LATENCY_ALPHA)
+
+                # 响应耗时没有明显增加时才增加并发数
+                if elapsed <= self.baseline * TranslatorConcurrencyController.LATENCY_TOLERANCE:
+                    self.concurrency = min(float(self.ceiling), self.concurrency + 1 / self.concurrency)
+
+            after = int(self.concurrency)
+
+        if after != before:
+            self.debug(
+                Localizer.get().translator_concurrency_change.replace("{BEFORE}", str(before))
+                    .replace("{AFTER}", str(after))
+                    .replace("{REASON}", error)
+            )
+
+        return after
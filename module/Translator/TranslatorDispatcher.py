@@ -0,0 +1,98 @@
+import threading
+from typing import Callable
+
+from base.Base import Base
+from module.Translator.TranslatorConcurrencyController import TranslatorConcurrencyController
+
+# 任务分发器
+# 同时使用多个接口时，每个接口都有独立的并发任务数控制器，任务在即将发出请求时才分配给当前空闲比例最高的接口
+# 只使用一个接口时，分发器即为该接口的并发限制
+class TranslatorDispatcher(Base):
+
+    # 接口
+    class Backend():
+
+        def __init__(self, platform: dict, controller: TranslatorConcurrencyController) -> None:
+            self.platform = platform
+            self.controller = controller
+            self.running: int = 0                                                   # 正在进行的请求数量
+
+        # 空闲的并发数量
+        def get_free(self) -> int:
+            return self.controller.get_concurrency() - self.running
+
+    def __init__(self, backends: list[Backend]) -> None:
+        super().__init__()
+
+        # 初始化
+        self.backends = backends
+        self.listeners: list[Callable[[], None]] = []
+
+        # 线程锁
+        self.condition = threading.Condition()
+
+    # 获取全部接口
+    def get_backends(self) -> list[Backend]:
+        return self.backends
+
+    # 获取全部接口的并发任务数之和
+    def get_concurrency(self) -> int:
+        return sum(backend.controller.get_concurrency() for backend in self.backends)
+
+    # 获取全部接口的并发任务数上限之和
+    def get_ceiling(self) -> int:
+        return sum(backend.controller.get_ceiling() for backend in self.backends)
+
+    # 添加状态变化时的监听器，用于唤醒在其他线程或事件循环中等待的任务
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self.listeners.append(listener)
+
+    # 尝试分配接口，没有空闲的接口时返回 None
+    def try_acquire(self) -> Backend:
+        with self.condition:
+            candidates = [backend for backend in self.backends if backend.get_free() > 0]
+            if len(candidates) == 0:
+                return None
+
+            # 空闲比例最高的接口优先，比例相同时按配置顺序
+            backend = max(candidates, key = lambda v: v.get_free() / v.controller.get_concurrency())
+            backend.running = backend.running + 1
+
+            return backend
+
+    # 等待直到分配到接口
+    def acquire(self) -> Backend:
+        with self.condition:
+            return self.condition.wait_for(self.try_acquire)
+
+    # 释放接口
+    def release(self, backend: Backend) -> None:
+        with self.condition:
+            backend.running = backend.running - 1
+        self.notify()
+
+    # 在分配到的接口上执行，function 的第一个参数为分配到的接口
+    def run(self, function: Callable, *args) -> object:
+        backend = self.acquire()
+        try:
+            return function(backend, *args)
+        finally:
+            self.release(backend)
+
+    # 根据请求结果调整对应接口的并发数，返回全部接口的并发任务数之和
+    def record(self, platform_id: int, error: str, elapsed: float) -> int:
+        for backend in self.backends:
+            if backend.platform.get("id") == platform_id:
+                backend.controller.record(error, elapsed)
+                break
+        self.notify()
+
+        return self.get_concurrency()
+
+    # 唤醒等待中的任务
+    def notify(self) -> None:
+        with self.condition:
+            self.condition.notify_all()
+
+        for listener in self.listeners:
+            listener()
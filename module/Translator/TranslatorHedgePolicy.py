@@ -0,0 +1,108 @@
+import threading
+import collections
+from typing import Self
+
+from base.Base import Base
+from module.Localizer.Localizer import Localizer
+from module.ExpertConfig import ExpertConfig
+
+# 对冲请求策略
+# 请求耗时超过近期成功请求耗时的指定分位数时，再发出一个相同的请求，使用先返回的有效结果
+# 对冲请求额外消耗的 Token 数量不超过全部普通请求消耗的指定比例，超出时不再发出对冲请求
+class TranslatorHedgePolicy(Base):
+
+    # 用于计算分位数的最近成功请求数量
+    SAMPLE_SIZE: int = 256
+
+    # 计算分位数所需的最少样本数量
+    SAMPLE_MIN: int = 16
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.samples: collections.deque = collections.deque(maxlen = TranslatorHedgePolicy.SAMPLE_SIZE)
+        self.tokens: int = 0                                                        # 普通请求消耗的 Token 数量
+        self.extra_tokens: int = 0                                                  # 对冲请求消耗的 Token 数量，包括进行中的请求的估算值
+        self.issued: int = 0                                                        # 发出的对冲请求数量
+        self.won: int = 0                                                           # 对冲请求先返回有效结果的次数
+        self.denied: int = 0                                                        # 因超出预算而没有发出对冲请求的次数
+
+        # 线程锁
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 是否启用，只在异步请求引擎中启用，以便取消未被使用的请求，避免其继续占用并发与额度
+    def is_enable(self) -> bool:
+        return ExpertConfig.get().request_hedging_enable == True and ExpertConfig.get().request_engine == "async"
+
+    # 获取发出对冲请求的耗时阈值，样本不足或阈值不小于请求超时时间时返回 None
+    def get_threshold(self, timeout: float) -> float:
+        with self.lock:
+            if len(self.samples) < TranslatorHedgePolicy.SAMPLE_MIN:
+                return None
+
+            samples = sorted(self.samples)
+
+        percentile = min(1.0, max(0.0, ExpertConfig.get().request_hedging_percentile))
+        threshold = samples[min(len(samples) - 1, int(len(samples) * percentile))]
+        if threshold >= timeout:
+            return None
+
+        return threshold
+
+    # 记录普通请求的结果，success 为请求是否成功，elapsed 为请求耗时
+    def record(self, success: bool, elapsed: float, tokens: int) -> None:
+        with self.lock:
+            self.tokens = self.tokens + tokens
+            if success == True:
+                self.samples.append(elapsed)
+
+    # 尝试为对冲请求预留预算，estimated 为估算的 Token 数量
+    def try_spend(self, estimated: int) -> bool:
+        with self.lock:
+            if self.extra_tokens + estimated > self.tokens * ExpertConfig.get().request_hedging_budget:
+                self.denied = self.denied + 1
+                return False
+
+            self.extra_tokens = self.extra_tokens + estimated
+            self.issued = self.issued + 1
+
+            return True
+
+    # 对冲请求结束后按实际消耗修正预留的预算，接口没有返回消耗数据或请求被取消时保留估算值
+    def settle(self, estimated: int, actual: int) -> None:
+        if actual <= 0:
+            return None
+
+        with self.lock:
+            self.extra_tokens = self.extra_tokens + actual - estimated
+
+    # 记录对冲请求是否先返回有效结果
+    def record_result(self, won: bool) -> None:
+        with self.lock:
+            if won == True:
+                self.won = self.won + 1
+
+    # 输出统计数据，没有发出过对冲请求时不输出
+    def print_summary(self) -> None:
+        with self.lock:
+            issued, won, denied = self.issued, self.won, self.denied
+            tokens, extra_tokens = self.tokens, self.extra_tokens
+
+        if issued == 0 and denied == 0:
+            return None
+
+        self.info(
+            Localizer.get().translator_hedge_summary.replace("{ISSUED}", str(issued))
+                .replace("{WON}", str(won))
+                .replace("{WIN_RATE}", f"{won / issued * 100:.2f}%" if issued > 0 else "-")
+                .replace("{DENIED}", str(denied))
+                .replace("{EXTRA}", f"{extra_tokens / tokens * 100:.2f}%" if tokens > 0 else "-")
+        )
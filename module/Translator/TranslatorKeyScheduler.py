@@ -0,0 +1,190 @@
+import time
+import threading
+from typing import Self
+
+from base.Base import Base
+from module.Localizer.Localizer import Localizer
+
+# 接口密钥调度器
+# 密钥的统计数据按 接口 ID + 密钥 分别记录，不同接口即使使用相同的密钥（例如 no_key_required），其状态也互不影响
+# 根据每个密钥近期的请求成功率与响应耗时打分，优先使用状态最好的密钥，得分相同时使用最久未使用的密钥
+# 密钥连续失败达到阈值时熔断，冷却时间结束后放行一个探测请求，探测成功则恢复，失败则以加倍的冷却时间再次熔断
+class TranslatorKeyScheduler(Base):
+
+    # 熔断状态
+    class State():
+
+        CLOSED: str = "CLOSED"                                                      # 正常
+        OPEN: str = "OPEN"                                                          # 熔断
+        HALF_OPEN: str = "HALF_OPEN"                                                # 等待探测
+
+    # 触发熔断的连续失败次数
+    FAILURE_THRESHOLD: int = 3
+
+    # 熔断的初始冷却时间与最大冷却时间（秒）
+    COOLDOWN_MIN: float = 30.0
+    COOLDOWN_MAX: float = 600.0
+
+    # 成功率与响应耗时的平滑系数
+    ALPHA: float = 0.2
+
+    # 密钥统计数据
+    class Stat():
+
+        def __init__(self) -> None:
+            self.state: str = TranslatorKeyScheduler.State.CLOSED
+            self.success_rate: float = 1.0                                          # 平滑后的成功率
+            self.latency: float = 0.0                                               # 平滑后的响应耗时
+            self.running: int = 0                                                   # 正在进行的请求数量
+            self.failures: int = 0                                                  # 连续失败次数
+            self.cooldown: float = 0.0                                              # 当前的冷却时间
+            self.open_until: float = 0.0                                            # 熔断结束的时间
+            self.probing: bool = False                                              # 是否有探测请求正在进行
+            self.last_used: float = 0.0                                             # 上次使用的时间
+            self.success: int = 0                                                   # 成功请求总数
+            self.total: int = 0                                                     # 请求总数
+
+        # 得分，成功率越高、响应越快、正在进行的请求越少，得分越高
+        def get_score(self) -> float:
+            return self.success_rate / (max(self.latency, 1.0) * (1 + self.running))
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.stats: dict[tuple[int, str], TranslatorKeyScheduler.Stat] = {}
+
+        # 线程锁
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 隐藏密钥的中间部分并添加接口名称，用于日志输出
+    def mask(self, platform: dict, key: str) -> str:
+        if len(key) <= 12:
+            return f"{platform.get("name")} - {key}"
+        else:
+            return f"{platform.get("name")} - {key[:6]}...{key[-4:]}"
+
+    # 获取密钥的统计数据，需要在锁内调用
+    def get_stat(self, platform: dict, key: str) -> Stat:
+        return self.stats.setdefault((platform.get("id"), key), TranslatorKeyScheduler.Stat())
+
+    # 从接口的密钥中选择一个密钥
+    def select(self, platform: dict) -> str:
+        keys: list[str] = platform.get("api_key", [])
+        if len(keys) == 1:
+            key = keys[0]
+            with self.lock:
+                stat = self.get_stat(platform, key)
+                stat.running = stat.running + 1
+                stat.last_used = time.time()
+            return key
+
+        now = time.time()
+        with self.lock:
+            candidates: list[tuple[str, TranslatorKeyScheduler.Stat]] = []
+            for key in keys:
+                stat = self.get_stat(platform, key)
+
+                # 冷却时间结束，等待探测
+                if stat.state == TranslatorKeyScheduler.State.OPEN and now >= stat.open_until:
+                    stat.state = TranslatorKeyScheduler.State.HALF_OPEN
+
+                if stat.state == TranslatorKeyScheduler.State.CLOSED:
+                    candidates.append((key, stat))
+                elif stat.state == TranslatorKeyScheduler.State.HALF_OPEN and stat.probing == False:
+                    candidates.append((key, stat))
+
+            # 全部密钥都处于熔断状态时，使用最早结束熔断的密钥
+            if len(candidates) == 0:
+                key = min(keys, key = lambda k: self.get_stat(platform, k).open_until)
+                stat = self.get_stat(platform, key)
+            else:
+                # 等待探测的密钥优先，其余按得分从高到低，得分相同时使用最久未使用的密钥
+                key, stat = max(
+                    candidates,
+                    key = lambda v: (v[1].state == TranslatorKeyScheduler.State.HALF_OPEN, v[1].get_score(), -v[1].last_used),
+                )
+                if stat.state == TranslatorKeyScheduler.State.HALF_OPEN:
+                    stat.probing = True
+
+            stat.running = stat.running + 1
+            stat.last_used = now
+
+        return key
+
+    # 记录请求结果，success 为请求是否成功，elapsed 为请求耗时
+    def record(self, platform: dict, key: str, success: bool, elapsed: float) -> None:
+        message = None
+        log_func = self.warning
+        with self.lock:
+            stat = self.get_stat(platform, key)
+            stat.running = max(0, stat.running - 1)
+            stat.total = stat.total + 1
+            stat.success_rate = stat.success_rate + ((1.0 if success == True else 0.0) - stat.success_rate) * TranslatorKeyScheduler.ALPHA
+
+            if success == True:
+                stat.success = stat.success + 1
+                stat.latency = elapsed if stat.latency == 0 else stat.latency + (elapsed - stat.latency) * TranslatorKeyScheduler.ALPHA
+                stat.failures = 0
+
+                # 探测成功，恢复
+                if stat.state != TranslatorKeyScheduler.State.CLOSED:
+                    stat.state = TranslatorKeyScheduler.State.CLOSED
+                    stat.cooldown = 0.0
+                    stat.probing = False
+                    message = Localizer.get().translator_key_scheduler_close.replace("{KEY}", self.mask(platform, key))
+                    log_func = self.info
+            else:
+                stat.failures = stat.failures + 1
+
+                # 探测失败或连续失败达到阈值时熔断，冷却时间逐次加倍
+                if stat.state == TranslatorKeyScheduler.State.HALF_OPEN or (
+                    stat.state == TranslatorKeyScheduler.State.CLOSED and stat.failures >= TranslatorKeyScheduler.FAILURE_THRESHOLD
+                ):
+                    stat.state = TranslatorKeyScheduler.State.OPEN
+                    stat.cooldown = min(TranslatorKeyScheduler.COOLDOWN_MAX, max(TranslatorKeyScheduler.COOLDOWN_MIN, stat.cooldown * 2))
+                    stat.open_until = time.time() + stat.cooldown
+                    stat.probing = False
+                    message = (
+                        Localizer.get().translator_key_scheduler_open.replace("{KEY}", self.mask(platform, key))
+                            .replace("{COUNT}", str(stat.failures))
+                            .replace("{TIME}", f"{stat.cooldown:.0f}")
+                    )
+
+        if message is not None:
+            log_func(message)
+
+    # 请求被取消，只释放占用而不记录结果
+    def cancel(self, platform: dict, key: str) -> None:
+        with self.lock:
+            stat = self.get_stat(platform, key)
+            stat.running = max(0, stat.running - 1)
+            stat.probing = False
+
+    # 输出各个接口的各个密钥的统计数据，只有一个密钥时不输出
+    def print_summary(self, platforms: list[dict]) -> None:
+        with self.lock:
+            rows = [
+                (platform, key, self.stats.get((platform.get("id"), key)))
+                for platform in platforms for key in dict.fromkeys(platform.get("api_key", []))
+                if (platform.get("id"), key) in self.stats
+            ]
+
+        if len(rows) <= 1:
+            return None
+
+        for platform, key, stat in rows:
+            self.info(
+                Localizer.get().translator_key_scheduler.replace("{KEY}", self.mask(platform, key))
+                    .replace("{STATE}", stat.state)
+                    .replace("{SUCCESS_RATE}", f"{stat.success / stat.total * 100:.2f}%" if stat.total > 0 else "-")
+                    .replace("{LATENCY}", f"{stat.latency:.2f}")
+                    .replace("{COUNT}", str(stat.total))
+            )
@@ -0,0 +1,84 @@
+import time
+import threading
+from typing import Self
+
+from base.Base import Base
+
+# 速率限制器
+# 为每个接口的每个密钥分别维护 每分钟请求数（RPM）与 每分钟 Token 数（TPM）两个令牌桶，请求发出前预约额度，额度不足时等待而不是直接失败
+# 预约后余额可以为负数，之后的请求需要等待更久，从而按预约的先后顺序排队
+class TranslatorRateLimiter(Base):
+
+    # 令牌桶
+    class Bucket():
+
+        def __init__(self, capacity: int) -> None:
+            self.capacity = capacity
+            self.rate = capacity / 60                                               # 每秒恢复的额度
+            self.tokens: float = float(capacity)
+            self.time = time.time()
+
+        # 预约额度，返回需要等待的秒数
+        def reserve(self, cost: float, now: float) -> float:
+            self.tokens = min(float(self.capacity), self.tokens + max(0.0, now - self.time) * self.rate)
+            self.time = max(self.time, now)
+            self.tokens = self.tokens - min(cost, self.capacity)
+
+            return max(0.0, -self.tokens / self.rate)
+
+        # 按实际消耗修正已预约的额度
+        def adjust(self, delta: float) -> None:
+            self.tokens = min(float(self.capacity), self.tokens - delta)
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # 初始化
+        self.buckets: dict[tuple[int, str, str], TranslatorRateLimiter.Bucket] = {}
+
+        # 线程锁
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> Self:
+        if not hasattr(cls, "__instance__"):
+            cls.__instance__ = cls()
+
+        return cls.__instance__
+
+    # 获取令牌桶，令牌桶按 接口 ID + 密钥 区分，不同接口即使使用相同的密钥也互不影响，上限变化时重新创建，需要在锁内调用
+    def get_bucket(self, platform_id: int, api_key: str, kind: str, capacity: int) -> Bucket:
+        bucket = self.buckets.get((platform_id, api_key, kind))
+        if bucket is None or bucket.capacity != capacity:
+            bucket = TranslatorRateLimiter.Bucket(capacity)
+            self.buckets[(platform_id, api_key, kind)] = bucket
+
+        return bucket
+
+    # 为一次请求预约额度，rpm、tpm 小于等于 0 时不限制，返回需要等待的秒数
+    def reserve(self, platform_id: int, api_key: str, rpm: int, tpm: int, tokens: int) -> float:
+        wait = 0.0
+        now = time.time()
+        with self.lock:
+            if rpm > 0:
+                wait = max(wait, self.get_bucket(platform_id, api_key, "rpm", rpm).reserve(1, now))
+            if tpm > 0:
+                wait = max(wait, self.get_bucket(platform_id, api_key, "tpm", tpm).reserve(tokens, now))
+
+        return wait
+
+    # 请求完成后按实际消耗的 Token 数量修正预约时估算的数量
+    def settle(self, platform_id: int, api_key: str, tpm: int, estimated: int, actual: int) -> None:
+        if tpm <= 0:
+            return None
+
+        with self.lock:
+            self.get_bucket(platform_id, api_key, "tpm", tpm).adjust(actual - estimated)
+
+    # 请求在发出之前被取消时，归还预约的请求数额度
+    def cancel(self, platform_id: int, api_key: str, rpm: int) -> None:
+        if rpm <= 0:
+            return None
+
+        with self.lock:
+            self.get_bucket(platform_id, api_key, "rpm", rpm).adjust(-1)
@@ -1,4 +1,7 @@
+import time
+import asyncio
 import threading
+from typing import Self
 
 import httpx
 import rapidjson as json
@@ -9,6 +12,11 @@ import google.generativeai as genai
 from base.Base import Base
 from module.Localizer.Localizer import Localizer
 from module.VersionManager import VersionManager
+from module.Cache.CacheTokenCounter import CacheTokenCounter
+from module.Translator.TranslatorRateLimiter import TranslatorRateLimiter
+from module.Translator.TranslatorKeyScheduler import TranslatorKeyScheduler
+from module.Translator.TranslatorHedgePolicy import TranslatorHedgePolicy
+from module.Translator.TranslatorConcurrencyController import TranslatorConcurrencyController
 
 # 接口请求器
 class TranslatorRequester(Base):
@@ -16,11 +24,15 @@ class TranslatorRequester(Base):
     # 类线程锁
     API_KEY_LOCK = threading.Lock()
 
-    # 客户端
-    SAKURA_CLIENTS: dict[str, openai.OpenAI] = {}
-    OPENAI_CLIENTS: dict[str, openai.OpenAI] = {}
-    GOOGLE_CLIENTS: dict[str, genai.GenerativeModel] = {}
-    ANTHROPIC_CLIENTS: dict[str, anthropic.Anthropic] = {}
+    # 客户端，键为 接口 ID、接口地址、模型、密钥
+    SAKURA_CLIENTS: dict[tuple, openai.OpenAI] = {}
+    OPENAI_CLIENTS: dict[tuple, openai.OpenAI] = {}
+    GOOGLE_CLIENTS: dict[tuple, genai.GenerativeModel] = {}
+    ANTHROPIC_CLIENTS: dict[tuple, anthropic.Anthropic] = {}
+
+    # 异步客户端
+    OPENAI_ASYNC_CLIENTS: dict[tuple, openai.AsyncOpenAI] = {}
+    ANTHROPIC_ASYNC_CLIENTS: dict[tuple, anthropic.AsyncAnthropic] = {}
 
     def __init__(self, config: dict, platform: dict, current_round: int) -> None:
         super().__init__()
@@ -29,14 +41,118 @@ class TranslatorRequester(Base):
         self.config = config
         self.platform = platform
         self.current_round = current_round
+        self.request_error: str = None
+        self.api_key: str = None
+        self.estimated_tokens: int = 0
+        self.rate_limit_wait: float = 0.0
+        self.send_time: float = None                                                # 预约速率限制额度后，请求实际发出的时间
+        self.hedge_estimated: int = None                                            # 作为对冲请求时预留的 Token 数量
+        self.hedge_platforms: list[dict] = []                                       # 同一接口没有其他密钥时，对冲请求可以使用的其他接口
+
+    # 获取请求错误类型，请求没有发生异常时为 NONE
+    def get_request_error(self) -> str:
+        if self.request_error is None:
+            return TranslatorConcurrencyController.Error.NONE
+        else:
+            return self.request_error
+
+    # 判断异常的错误类型
+    def get_error_type(self, e: Exception) -> str:
+        # OpenAI、Anthropic 的异常带有 status_code，Gemini 的异常带有 code
+        status_code = getattr(e, "status_code", None)
+        if not isinstance(status_code, int):
+            status_code = getattr(e, "code", None)
+
+        if isinstance(e, (openai.APITimeoutError, anthropic.APITimeoutError, httpx.TimeoutException, TimeoutError)):
+            return TranslatorConcurrencyController.Error.TIMEOUT
+        elif status_code == 429:
+            return TranslatorConcurrencyController.Error.RATE_LIMIT
+        elif isinstance(status_code, int) and status_code >= 500:
+            return TranslatorConcurrencyController.Error.SERVER_ERROR
+        else:
+            return TranslatorConcurrencyController.Error.OTHER
+
+    # 获取请求参数
+    def get_parameters(self) -> tuple[bool, float, float, float, float]:
+        return (
+            self.platform.get("thinking"),
+            self.platform.get("temperature"),
+            self.platform.get("top_p"),
+            self.platform.get("presence_penalty"),
+            self.platform.get("frequency_penalty") if self.current_round == 0 else max(0.20, self.platform.get("frequency_penalty")),
+        )
 
-    # 发起请求
+    # 发起异步请求，与 request 的返回值相同，启用对冲请求时，请求耗时过长则向其他密钥发出相同的请求，使用先返回的有效结果，未被使用的请求会被取消
+    async def request_async(self, messages: list[dict]) -> tuple[bool, str, int, int]:
+        policy = TranslatorHedgePolicy.get()
+        threshold = policy.get_threshold(self.config.get("request_timeout")) if policy.is_enable() == True else None
+        if threshold is None:
+            return await self.request_once_async(messages)
+
+        # 发起请求，等待至阈值，阈值从请求实际发出时开始计时，等待速率限制额度的时间不计入
+        primary = asyncio.ensure_future(self.request_once_async(messages))
+        while True:
+            send_time = self.send_time
+            timeout = threshold if send_time is None else send_time + threshold - time.time()
+            done, _ = await asyncio.wait({primary}, timeout = max(0.0, timeout))
+            if primary in done:
+                return primary.result()
+            elif send_time is not None and time.time() >= send_time + threshold:
+                break
+
+        # 预留预算并发出对冲请求，预算不足时继续等待原请求
+        hedge = self.create_hedge(messages)
+        if hedge is None:
+            return await primary
+        secondary = asyncio.ensure_future(hedge.request_once_async(messages))
+
+        # 使用先返回的有效结果，取消另一个请求
+        requesters = {primary: self, secondary: hedge}
+        winner = None
+        pending = set(requesters.keys())
+        try:
+            while winner is None and len(pending) > 0:
+                done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                winner = next((future for future in done if future.result()[0] == False), None)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        return self.finish_hedge(primary if winner is None else winner, requesters)
+
+    # 创建对冲请求器，预算不足时返回 None
+    # 优先使用同一接口中原请求之外的密钥，没有其他密钥时使用其他接口，都没有时使用原请求的密钥
+    def create_hedge(self, messages: list[dict]) -> Self:
+        estimated = self.estimate_tokens(messages)
+        if TranslatorHedgePolicy.get().try_spend(estimated) == False:
+            return None
+
+        keys = [key for key in self.platform.get("api_key", []) if key != self.api_key]
+        if len(keys) > 0:
+            platform = self.platform | {"api_key": keys}
+        elif len(self.hedge_platforms) > 0:
+            platform = self.hedge_platforms[0]
+        else:
+            platform = self.platform
+
+        hedge = TranslatorRequester(self.config, platform, self.current_round)
+        hedge.hedge_estimated = estimated
+        self.debug(Localizer.get().translator_hedge_issue)
+
+        return hedge
+
+    # 记录对冲请求的结果并返回胜出的结果
+    def finish_hedge(self, winner: asyncio.Future, requesters: dict) -> tuple[bool, str, str, int, int]:
+        hedge = requesters.get(winner)
+        TranslatorHedgePolicy.get().record_result(hedge is not self)
+        self.request_error = hedge.request_error
+
+        return winner.result()
+
+    # 发起请求，线程模式下无法取消未被使用的请求，因此不发出对冲请求
     def request(self, messages: list[dict]) -> tuple[bool, str, int, int]:
-        thinking = self.platform.get("thinking")
-        temperature = self.platform.get("temperature")
-        top_p = self.platform.get("top_p")
-        presence_penalty = self.platform.get("presence_penalty")
-        frequency_penalty = self.platform.get("frequency_penalty") if self.current_round == 0 else max(0.20, self.platform.get("frequency_penalty"))
+        thinking, temperature, top_p, presence_penalty, frequency_penalty = self.get_parameters()
+        start_time = time.time()
 
         # 发起请求
         if self.platform.get("api_format") == Base.APIFormat.SAKURALLM:
@@ -76,44 +192,161 @@ class TranslatorRequester(Base):
                 frequency_penalty
             )
 
+        # 记录请求结果
+        self.record_result(skip, time.time() - start_time, prompt_tokens, completion_tokens)
+
         return skip, response_think, response_result, prompt_tokens, completion_tokens
 
+    # 发起单次异步请求
+    async def request_once_async(self, messages: list[dict]) -> tuple[bool, str, int, int]:
+        thinking, temperature, top_p, presence_penalty, frequency_penalty = self.get_parameters()
+        start_time = time.time()
+
+        # 发起请求
+        try:
+            if self.platform.get("api_format") == Base.APIFormat.SAKURALLM:
+                result = await self.request_sakura_async(messages, thinking, temperature, top_p, presence_penalty, frequency_penalty)
+            elif self.platform.get("api_format") == Base.APIFormat.GOOGLE:
+                # Gemini SDK 的 REST 传输方式不支持异步请求，在线程中执行同步请求
+                result = await asyncio.to_thread(self.request_google, messages, thinking, temperature, top_p, presence_penalty, frequency_penalty)
+            elif self.platform.get("api_format") == Base.APIFormat.ANTHROPIC:
+                result = await self.request_anthropic_async(messages, thinking, temperature, top_p, presence_penalty, frequency_penalty)
+            else:
+                result = await self.request_openai_async(messages, thinking, temperature, top_p, presence_penalty, frequency_penalty)
+        except asyncio.CancelledError:
+            # 被取消的请求归还预约的额度，且不计入密钥的请求结果
+            self.cancel_rate_limit()
+            if self.api_key is not None:
+                TranslatorKeyScheduler.get().cancel(self.platform, self.api_key)
+            raise
+
+        # 记录请求结果
+        skip, _, _, prompt_tokens, completion_tokens = result
+        self.record_result(skip, time.time() - start_time, prompt_tokens, completion_tokens)
+
+        return result
+
+    # 记录请求结果，等待速率限制额度的时间不计入耗时
+    def record_result(self, skip: bool, elapsed: float, prompt_tokens: int, completion_tokens: int) -> None:
+        elapsed = max(0.0, elapsed - self.rate_limit_wait)
+        tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+
+        # 按实际消耗修正速率限制的额度，请求失败时归还预约的额度
+        self.settle_rate_limit(skip, prompt_tokens, completion_tokens)
+
+        # 记录密钥的请求结果
+        if self.api_key is not None:
+            TranslatorKeyScheduler.get().record(self.platform, self.api_key, skip == False, elapsed)
+
+        # 记录对冲策略的统计数据
+        if self.hedge_estimated is None:
+            TranslatorHedgePolicy.get().record(skip == False, elapsed, tokens)
+        else:
+            TranslatorHedgePolicy.get().settle(self.hedge_estimated, tokens)
+
+    # 估算提示词的 Token 数量
+    def estimate_tokens(self, messages: list[dict]) -> int:
+        encoder = CacheTokenCounter.get_encoder()
+        return sum(len(encoder.encode_ordinary(str(m.get("content", m.get("parts", ""))))) for m in messages)
+
+    # 按密钥的 RPM、TPM 限制预约额度，返回需要等待的秒数，需要在获取客户端之后调用
+    def reserve_rate_limit(self, messages: list[dict]) -> float:
+        rpm = self.platform.get("rpm_limit", 0)
+        tpm = self.platform.get("tpm_limit", 0)
+        if rpm <= 0 and tpm <= 0:
+            self.send_time = time.time()
+            return 0.0
+
+        self.estimated_tokens = self.estimate_tokens(messages) if tpm > 0 else 0
+        wait = TranslatorRateLimiter.get().reserve(self.platform.get("id"), self.api_key, rpm, tpm, self.estimated_tokens)
+        self.rate_limit_wait = wait
+        self.send_time = time.time() + wait
+        if wait > 0:
+            self.debug(Localizer.get().translator_rate_limit_wait.replace("{TIME}", f"{wait:.2f}"))
+
+        return wait
+
+    # 按实际消耗的 Token 数量修正预约时估算的数量，每次预约只修正一次
+    # 请求失败、超时或被取消时视为没有消耗，归还预约的额度，请求成功但接口没有返回消耗数据时不修正
+    def settle_rate_limit(self, skip: bool, prompt_tokens: int, completion_tokens: int) -> None:
+        tpm = self.platform.get("tpm_limit", 0)
+        estimated, self.estimated_tokens = self.estimated_tokens, 0
+        actual = 0 if skip == True else (prompt_tokens or 0) + (completion_tokens or 0)
+        if tpm <= 0 or self.api_key is None or estimated == 0 or (skip == False and actual == 0):
+            return None
+
+        TranslatorRateLimiter.get().settle(self.platform.get("id"), self.api_key, tpm, estimated, actual)
+
+    # 归还被取消的请求预约的额度，请求尚未发出（仍在等待速率限制额度）时同时归还请求数额度
+    def cancel_rate_limit(self) -> None:
+        self.settle_rate_limit(True, 0, 0)
+
+        rpm = self.platform.get("rpm_limit", 0)
+        if rpm > 0 and self.api_key is not None and self.send_time is not None and time.time() < self.send_time:
+            TranslatorRateLimiter.get().cancel(self.platform.get("id"), self.api_key, rpm)
+
+    # 获取异步客户端，客户端与事件循环绑定，需要在异步引擎的事件循环中调用
+    def get_async_client(self, platform: dict, timeout: int) -> openai.AsyncOpenAI | anthropic.AsyncAnthropic:
+        with TranslatorRequester.API_KEY_LOCK:
+            # 获取密钥
+            api_key = self.get_api_key(platform)
+            client_key = self.get_client_key(platform, api_key)
+            self.api_key = api_key
+
+            # 从缓存中获取客户端
+            if platform.get("api_format") == Base.APIFormat.ANTHROPIC:
+                if client_key not in TranslatorRequester.ANTHROPIC_ASYNC_CLIENTS:
+                    TranslatorRequester.ANTHROPIC_ASYNC_CLIENTS[client_key] = anthropic.AsyncAnthropic(
+                        base_url = platform.get("api_url"),
+                        api_key = api_key,
+                        timeout = httpx.Timeout(timeout = timeout, connect = 10.0),
+                        max_retries = 1,
+                    )
+                return TranslatorRequester.ANTHROPIC_ASYNC_CLIENTS.get(client_key)
+            else:
+                if client_key not in TranslatorRequester.OPENAI_ASYNC_CLIENTS:
+                    TranslatorRequester.OPENAI_ASYNC_CLIENTS[client_key] = openai.AsyncOpenAI(
+                        base_url = platform.get("api_url"),
+                        api_key = api_key,
+                        timeout = httpx.Timeout(timeout = timeout, connect = 10.0),
+                        max_retries = 1,
+                    )
+                return TranslatorRequester.OPENAI_ASYNC_CLIENTS.get(client_key)
+
+    # 获取密钥，由密钥调度器选择当前状态最好的密钥
+    def get_api_key(self, platform: dict) -> str:
+        return TranslatorKeyScheduler.get().select(platform)
+
+    # 获取客户端缓存的键，客户端与接口地址绑定，不同接口即使使用相同的密钥（例如 no_key_required）也需要使用各自的客户端
+    def get_client_key(self, platform: dict, api_key: str) -> tuple[int, str, str, str]:
+        return (platform.get("id"), platform.get("api_url"), platform.get("model"), api_key)
+
     # 获取客户端
     def get_client(self, platform: dict, timeout: int) -> openai.OpenAI | genai.GenerativeModel | anthropic.Anthropic:
         with TranslatorRequester.API_KEY_LOCK:
-            # 初始化索引
-            if getattr(TranslatorRequester, "_api_key_index", None) is None:
-                TranslatorRequester._api_key_index = 0
-
-            # 轮询获取密钥
-            keys = platform.get("api_key", [])
-            if len(keys) == 1:
-                api_key = keys[0]
-            elif TranslatorRequester._api_key_index >= len(keys) - 1:
-                TranslatorRequester._api_key_index = 0
-                api_key = keys[0]
-            else:
-                TranslatorRequester._api_key_index = TranslatorRequester._api_key_index + 1
-                api_key = keys[TranslatorRequester._api_key_index]
+            # 获取密钥
+            api_key = self.get_api_key(platform)
+            client_key = self.get_client_key(platform, api_key)
+            self.api_key = api_key
 
             # 从缓存中获取客户端
             if platform.get("api_format") == Base.APIFormat.SAKURALLM:
-                if api_key not in TranslatorRequester.SAKURA_CLIENTS:
-                    TranslatorRequester.SAKURA_CLIENTS[api_key] = openai.OpenAI(
+                if client_key not in TranslatorRequester.SAKURA_CLIENTS:
+                    TranslatorRequester.SAKURA_CLIENTS[client_key] = openai.OpenAI(
                         base_url = platform.get("api_url"),
                         api_key = api_key,
                         timeout = httpx.Timeout(timeout = timeout, connect = 10.0),
                         max_retries = 1,
                     )
-                return TranslatorRequester.SAKURA_CLIENTS.get(api_key)
+                return TranslatorRequester.SAKURA_CLIENTS.get(client_key)
             elif platform.get("api_format") == Base.APIFormat.GOOGLE:
                 # Gemini SDK 文档 - https://ai.google.dev/api?hl=zh-cn&lang=python
-                if api_key not in TranslatorRequester.GOOGLE_CLIENTS:
+                if client_key not in TranslatorRequester.GOOGLE_CLIENTS:
                     genai.configure(
                         api_key = api_key,
                         transport = "rest",
                     )
-                    TranslatorRequester.GOOGLE_CLIENTS[api_key] = genai.GenerativeModel(
+                    TranslatorRequester.GOOGLE_CLIENTS[client_key] = genai.GenerativeModel(
                         model_name = platform.get("model"),
                         safety_settings = [
                             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -122,56 +355,50 @@ class TranslatorRequester(Base):
                             {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
                         ],
                     )
-                return TranslatorRequester.GOOGLE_CLIENTS.get(api_key)
+                return TranslatorRequester.GOOGLE_CLIENTS.get(client_key)
             elif platform.get("api_format") == Base.APIFormat.ANTHROPIC:
-                if api_key not in TranslatorRequester.ANTHROPIC_CLIENTS:
-                    TranslatorRequester.ANTHROPIC_CLIENTS[api_key] = anthropic.Anthropic(
+                if client_key not in TranslatorRequester.ANTHROPIC_CLIENTS:
+                    TranslatorRequester.ANTHROPIC_CLIENTS[client_key] = anthropic.Anthropic(
                         base_url = platform.get("api_url"),
                         api_key = api_key,
                         timeout = httpx.Timeout(timeout = timeout, connect = 10.0),
                         max_retries = 1,
                     )
-                return TranslatorRequester.ANTHROPIC_CLIENTS.get(api_key)
+                return TranslatorRequester.ANTHROPIC_CLIENTS.get(client_key)
             else:
-                if api_key not in TranslatorRequester.OPENAI_CLIENTS:
-                    TranslatorRequester.OPENAI_CLIENTS[api_key] = openai.OpenAI(
+                if client_key not in TranslatorRequester.OPENAI_CLIENTS:
+                    TranslatorRequester.OPENAI_CLIENTS[client_key] = openai.OpenAI(
                         base_url = platform.get("api_url"),
                         api_key = api_key,
                         timeout = httpx.Timeout(timeout = timeout, connect = 10.0),
                         max_retries = 1,
                     )
-                return TranslatorRequester.OPENAI_CLIENTS.get(api_key)
-
-    # 发起请求
-    def request_sakura(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
-        try:
-            client: openai.OpenAI = self.get_client(
-                self.platform,
-                self.config.get("request_timeout"),
-            )
-            response = client.chat.completions.create(
-                model = self.platform.get("model"),
-                messages = messages,
-                top_p = top_p,
-                temperature = temperature,
-                presence_penalty = pp,
-                frequency_penalty = fp,
-                max_tokens = max(512, self.config.get("task_token_limit")),
-                extra_query = {
-                    "do_sample": True,
-                    "num_beams": 1,
-                    "repetition_penalty": 1.0
-                },
-                extra_headers = {
-                    "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
-                },
-            )
-
-            # 提取回复的文本内容
-            response_result = response.choices[0].message.content
-        except Exception as e:
-            self.error(f"{Localizer.get().log_task_fail}", e)
-            return True, None, None, None, None
+                return TranslatorRequester.OPENAI_CLIENTS.get(client_key)
+
+    # 获取请求参数
+    def get_sakura_args(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> dict:
+        return {
+            "model": self.platform.get("model"),
+            "messages": messages,
+            "top_p": top_p,
+            "temperature": temperature,
+            "presence_penalty": pp,
+            "frequency_penalty": fp,
+            "max_tokens": max(512, self.config.get("task_token_limit")),
+            "extra_query": {
+                "do_sample": True,
+                "num_beams": 1,
+                "repetition_penalty": 1.0
+            },
+            "extra_headers": {
+                "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
+            },
+        }
+
+    # 解析回复
+    def parse_sakura_response(self, response: object) -> tuple[bool, str, str, int, int]:
+        # 提取回复的文本内容
+        response_result = response.choices[0].message.content
 
         # 获取输入消耗
         try:
@@ -195,41 +422,65 @@ class TranslatorRequester(Base):
         return False, "", response_result, prompt_tokens, completion_tokens
 
     # 发起请求
-    def request_openai(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+    def request_sakura(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
         try:
             client: openai.OpenAI = self.get_client(
                 self.platform,
                 self.config.get("request_timeout"),
             )
-            response = client.chat.completions.create(
-                model = self.platform.get("model"),
-                messages = messages,
-                temperature = temperature,
-                top_p = top_p,
-                presence_penalty = pp,
-                frequency_penalty = fp,
-                max_tokens = 4096,
-                extra_headers = {
-                    "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
-                },
-            )
+            time.sleep(self.reserve_rate_limit(messages))
+            response = client.chat.completions.create(**self.get_sakura_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_sakura_response(response)
+        except Exception as e:
+            self.request_error = self.get_error_type(e)
+            self.error(f"{Localizer.get().log_task_fail}", e)
+            return True, None, None, None, None
 
-            # 提取回复内容
-            message = response.choices[0].message
-            if hasattr(message, "reasoning_content") and isinstance(message.reasoning_content, str):
-                response_think = message.reasoning_content.replace("\n\n", "\n").strip()
-                response_result = message.content.strip()
-            elif "</think>" in message.content:
-                splited = message.content.split("</think>")
-                response_think = splited[0].removeprefix("<think>").replace("\n\n", "\n").strip()
-                response_result = splited[-1].strip()
-            else:
-                response_think = ""
-                response_result = message.content.strip()
+    # 发起异步请求
+    async def request_sakura_async(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+        try:
+            client: openai.AsyncOpenAI = self.get_async_client(
+                self.platform,
+                self.config.get("request_timeout"),
+            )
+            await asyncio.sleep(self.reserve_rate_limit(messages))
+            response = await client.chat.completions.create(**self.get_sakura_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_sakura_response(response)
         except Exception as e:
+            self.request_error = self.get_error_type(e)
             self.error(f"{Localizer.get().log_task_fail}", e)
             return True, None, None, None, None
 
+    # 获取请求参数
+    def get_openai_args(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> dict:
+        return {
+            "model": self.platform.get("model"),
+            "messages": messages,
+            "temperature": temperature,
+            "top_p": top_p,
+            "presence_penalty": pp,
+            "frequency_penalty": fp,
+            "max_tokens": 4096,
+            "extra_headers": {
+                "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
+            },
+        }
+
+    # 解析回复
+    def parse_openai_response(self, response: object) -> tuple[bool, str, str, int, int]:
+        # 提取回复内容
+        message = response.choices[0].message
+        if hasattr(message, "reasoning_content") and isinstance(message.reasoning_content, str):
+            response_think = message.reasoning_content.replace("\n\n", "\n").strip()
+            response_result = message.content.strip()
+        elif "</think>" in message.content:
+            splited = message.content.split("</think>")
+            response_think = splited[0].removeprefix("<think>").replace("\n\n", "\n").strip()
+            response_result = splited[-1].strip()
+        else:
+            response_think = ""
+            response_result = message.content.strip()
+
         # 获取输入消耗
         try:
             prompt_tokens = int(response.usage.prompt_tokens)
@@ -244,6 +495,36 @@ class TranslatorRequester(Base):
 
         return False, response_think, response_result, prompt_tokens, completion_tokens
 
+    # 发起请求
+    def request_openai(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+        try:
+            client: openai.OpenAI = self.get_client(
+                self.platform,
+                self.config.get("request_timeout"),
+            )
+            time.sleep(self.reserve_rate_limit(messages))
+            response = client.chat.completions.create(**self.get_openai_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_openai_response(response)
+        except Exception as e:
+            self.request_error = self.get_error_type(e)
+            self.error(f"{Localizer.get().log_task_fail}", e)
+            return True, None, None, None, None
+
+    # 发起异步请求
+    async def request_openai_async(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+        try:
+            client: openai.AsyncOpenAI = self.get_async_client(
+                self.platform,
+                self.config.get("request_timeout"),
+            )
+            await asyncio.sleep(self.reserve_rate_limit(messages))
+            response = await client.chat.completions.create(**self.get_openai_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_openai_response(response)
+        except Exception as e:
+            self.request_error = self.get_error_type(e)
+            self.error(f"{Localizer.get().log_task_fail}", e)
+            return True, None, None, None, None
+
     # 发起请求
     def request_google(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, int, int]:
         try:
@@ -251,6 +532,7 @@ class TranslatorRequester(Base):
                 self.platform,
                 self.config.get("request_timeout"),
             )
+            time.sleep(self.reserve_rate_limit(messages))
             response = client.generate_content(
                 messages,
                 generation_config = genai.types.GenerationConfig(
@@ -265,6 +547,7 @@ class TranslatorRequester(Base):
             # 提取回复内容
             response_result = response.text
         except Exception as e:
+            self.request_error = self.get_error_type(e)
             self.error(f"{Localizer.get().log_task_fail}", e)
             return True, None, None, None, None
 
@@ -282,55 +565,48 @@ class TranslatorRequester(Base):
 
         return False, "", response_result, prompt_tokens, completion_tokens
 
-    # 发起请求
-    def request_anthropic(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
-        try:
-            client: anthropic.Anthropic = self.get_client(
-                self.platform,
-                self.config.get("request_timeout"),
-            )
-            # 根据是否为思考模式，选择不同的请求方式
-            if thinking == True:
-                response = client.messages.create(
-                    model = self.platform.get("model"),
-                    messages = messages,
-                    thinking = {
-                        "type": "enabled",
-                        "budget_tokens": 1024
-                    },
-                    max_tokens = 4096,
-                    extra_headers = {
-                        "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
-                    },
-                )
-            else:
-                response = client.messages.create(
-                    model = self.platform.get("model"),
-                    messages = messages,
-                    temperature = temperature,
-                    top_p = top_p,
-                    max_tokens = 4096,
-                    extra_headers = {
-                        "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
-                    },
-                )
+    # 获取请求参数，根据是否为思考模式，选择不同的请求方式
+    def get_anthropic_args(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> dict:
+        if thinking == True:
+            return {
+                "model": self.platform.get("model"),
+                "messages": messages,
+                "thinking": {
+                    "type": "enabled",
+                    "budget_tokens": 1024
+                },
+                "max_tokens": 4096,
+                "extra_headers": {
+                    "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
+                },
+            }
+        else:
+            return {
+                "model": self.platform.get("model"),
+                "messages": messages,
+                "temperature": temperature,
+                "top_p": top_p,
+                "max_tokens": 4096,
+                "extra_headers": {
+                    "User-Agent": f"LinguaGacha/{VersionManager.VERSION} (https://github.com/neavo/LinguaGacha)"
+                },
+            }
 
-            # 提取回复内容
-            text_messages = [msg for msg in response.content if hasattr(msg, "text") and isinstance(msg.text, str)]
-            think_messages = [msg for msg in response.content if hasattr(msg, "thinking") and isinstance(msg.thinking, str)]
+    # 解析回复
+    def parse_anthropic_response(self, response: object) -> tuple[bool, str, str, int, int]:
+        # 提取回复内容
+        text_messages = [msg for msg in response.content if hasattr(msg, "text") and isinstance(msg.text, str)]
+        think_messages = [msg for msg in response.content if hasattr(msg, "thinking") and isinstance(msg.thinking, str)]
 
-            if text_messages != []:
-                response_result = text_messages[-1].text.strip()
-            else:
-                response_result = ""
+        if text_messages != []:
+            response_result = text_messages[-1].text.strip()
+        else:
+            response_result = ""
 
-            if think_messages != []:
-                response_think = think_messages[-1].thinking.replace("\n\n", "\n").strip()
-            else:
-                response_think = ""
-        except Exception as e:
-            self.error(f"{Localizer.get().log_task_fail}", e)
-            return True, None, None, None, None
+        if think_messages != []:
+            response_think = think_messages[-1].thinking.replace("\n\n", "\n").strip()
+        else:
+            response_think = ""
 
         # 获取输入消耗
         try:
@@ -344,4 +620,34 @@ class TranslatorRequester(Base):
         except Exception:
             completion_tokens = 0
 
-        return False, response_think, response_result, prompt_tokens, completion_tokens
\ No newline at end of file
+        return False, response_think, response_result, prompt_tokens, completion_tokens
+
+    # 发起请求
+    def request_anthropic(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+        try:
+            client: anthropic.Anthropic = self.get_client(
+                self.platform,
+                self.config.get("request_timeout"),
+            )
+            time.sleep(self.reserve_rate_limit(messages))
+            response = client.messages.create(**self.get_anthropic_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_anthropic_response(response)
+        except Exception as e:
+            self.request_error = self.get_error_type(e)
+            self.error(f"{Localizer.get().log_task_fail}", e)
+            return True, None, None, None, None
+
+    # 发起异步请求
+    async def request_anthropic_async(self, messages: list[dict], thinking: bool, temperature: float, top_p: float, pp: float, fp: float) -> tuple[bool, str, str, int, int]:
+        try:
+            client: anthropic.AsyncAnthropic = self.get_async_client(
+                self.platform,
+                self.config.get("request_timeout"),
+            )
+            await asyncio.sleep(self.reserve_rate_limit(messages))
+            response = await client.messages.create(**self.get_anthropic_args(messages, thinking, temperature, top_p, pp, fp))
+            return self.parse_anthropic_response(response)
+        except Exception as e:
+            self.request_error = self.get_error_type(e)
+            self.error(f"{Localizer.get().log_task_fail}", e)
+            return True, None, None, None, None
\ No newline at end of file
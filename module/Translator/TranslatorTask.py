@@ -1,4 +1,5 @@
 import time
+import asyncio
 import itertools
 import threading
 
@@ -23,8 +24,11 @@ from module.Localizer.Localizer import Localizer
 from module.LogHelper import LogHelper
 from module.CodeSaver import CodeSaver
 from module.Normalizer import Normalizer
+from module.ExpertConfig import ExpertConfig
 from module.Translator.TranslatorRequester import TranslatorRequester
 from module.PromptBuilder import PromptBuilder
+from module.Memory.FuzzyMemory import FuzzyMemory
+from module.Memory.TranslationMemory import TranslationMemory
 
 class TranslatorTask(Base):
 
@@ -44,6 +48,7 @@ class TranslatorTask(Base):
         self.preceding_items = preceding_items
         self.config = config
         self.platform = platform
+        self.hedge_platforms: list[dict] = []                                       # 对冲请求可以使用的其他接口
         self.code_saver = CodeSaver()
         self.cache_manager = cache_manager
         self.prompt_builder = PromptBuilder(self.config)
@@ -83,6 +88,10 @@ class TranslatorTask(Base):
     def start(self, current_round: int) -> dict:
         return self.request(self.src_dict, self.preceding_items, self.samples, current_round)
 
+    # 启动任务 - 异步，返回值与 start 相同
+    async def start_async(self, current_round: int) -> dict:
+        return await self.request_async(self.src_dict, self.preceding_items, self.samples, current_round)
+
     # 请求
     def request(self, src_dict: dict[str, str], preceding_items: list[CacheItem], samples: list[str], current_round: int) -> dict:
         # 任务开始的时间
@@ -97,15 +106,69 @@ class TranslatorTask(Base):
             return {}
 
         # 生成请求提示词
-        if self.platform.get("api_format") != Base.APIFormat.SAKURALLM:
-            self.messages, console_log = self.generate_prompt(src_dict, preceding_items, samples)
-        else:
-            self.messages, console_log = self.generate_prompt_sakura(src_dict)
+        self.messages, console_log = self.generate_messages(src_dict, preceding_items, samples)
 
         # 发起请求
+        request_time = time.time()
         requester = TranslatorRequester(self.config, self.platform, current_round)
         skip, response_think, response_result, prompt_tokens, completion_tokens = requester.request(self.messages)
+        request_time = time.time() - request_time
+
+        # 处理回复
+        result = self.handle_response(src_dict, start_time, console_log, skip, response_think, response_result, prompt_tokens, completion_tokens)
+        result["request_error"] = requester.get_request_error()
+        result["request_time"] = request_time
+        result["platform_id"] = self.platform.get("id")
+
+        return result
+
+    # 请求 - 异步
+    # 只有网络请求在事件循环中等待，生成提示词与处理回复等计算密集的步骤在线程中执行，以避免阻塞事件循环
+    async def request_async(self, src_dict: dict[str, str], preceding_items: list[CacheItem], samples: list[str], current_round: int) -> dict:
+        # 任务开始的时间
+        start_time = time.time()
+
+        # 检测是否需要停止任务
+        if Base.WORK_STATUS == Base.Status.STOPPING:
+            return {}
+
+        # 生成请求提示词
+        self.messages, console_log = await asyncio.to_thread(self.generate_messages, src_dict, preceding_items, samples)
+
+        # 发起请求
+        request_time = time.time()
+        requester = TranslatorRequester(self.config, self.platform, current_round)
+        requester.hedge_platforms = [v for v in self.hedge_platforms if self.is_compatible(v) == True]
+        skip, response_think, response_result, prompt_tokens, completion_tokens = await requester.request_async(self.messages)
+        request_time = time.time() - request_time
+
+        # 处理回复
+        result = await asyncio.to_thread(
+            self.handle_response,
+            src_dict,
+            start_time,
+            console_log,
+            skip,
+            response_think,
+            response_result,
+            prompt_tokens,
+            completion_tokens,
+        )
+        result["request_error"] = requester.get_request_error()
+        result["request_time"] = request_time
+        result["platform_id"] = self.platform.get("id")
+
+        return result
 
+    # 生成请求提示词
+    def generate_messages(self, src_dict: dict[str, str], preceding_items: list[CacheItem], samples: list[str]) -> tuple[list[dict], list[str]]:
+        if self.platform.get("api_format") != Base.APIFormat.SAKURALLM:
+            return self.generate_prompt(src_dict, preceding_items, samples)
+        else:
+            return self.generate_prompt_sakura(src_dict)
+
+    # 处理回复
+    def handle_response(self, src_dict: dict[str, str], start_time: float, console_log: list[str], skip: bool, response_think: str, response_result: str, prompt_tokens: int, completion_tokens: int) -> dict:
         # 如果请求结果标记为 skip，即有错误发生，则跳过本次循环
         if skip == True:
             return {
@@ -113,6 +176,9 @@ class TranslatorTask(Base):
                 "row_count": 0,
                 "prompt_tokens": 0,
                 "completion_tokens": 0,
+                "items": self.items,
+                "errors": [ResponseChecker.Error.UNKNOWN],
+                "time": time.time() - start_time,
             }
 
         # 提取回复内容
@@ -129,7 +195,7 @@ class TranslatorTask(Base):
 
         # 当任务失败且是单条目任务时，更新重试次数
         if any(v != ResponseChecker.Error.NONE for v in check_result) != None and len(self.items) == 1:
-            self.items[0].set_retry_count(self.items[0].get_retry_count() + 1)
+            self.items[0].update(retry_count = self.items[0].get_retry_count() + 1)
 
         # 模型回复日志
         # 在这里将日志分成打印在控制台和写入文件的两份，按不同逻辑处理
@@ -163,15 +229,27 @@ class TranslatorTask(Base):
                 self.merge_glossary(glossary_auto)
 
             # 更新缓存数据
-            updated_count = 0
+            updated_items: list[CacheItem] = []
             dst_sub_lines = list(dst_dict.values())
             check_result_lines = check_result.copy()
             for item in self.items:
                 dst, dst_sub_lines, check_result_lines = item.merge_sub_lines(dst_sub_lines, check_result_lines)
                 if dst != None:
-                    updated_count = updated_count + 1
-                    item.set_dst(dst)
-                    item.set_status(Base.TranslationStatus.TRANSLATED)
+                    updated_items.append(item)
+                    item.update(dst = dst, status = Base.TranslationStatus.TRANSLATED)
+
+            # 将译文同步到原文相同的其他条目
+            duplicate_items = self.cache_manager.fan_out(updated_items)
+            self.cache_manager.append_journal(duplicate_items)
+            updated_items.extend(duplicate_items)
+            updated_count = len(updated_items)
+
+            # 更新翻译记忆
+            TranslationMemory.get().add(updated_items)
+            FuzzyMemory.get().add_items(updated_items)
+
+        # 记录缓存日志
+        self.cache_manager.append_journal(self.items)
 
         # 打印任务结果
         self.print_log_table(
@@ -192,6 +270,9 @@ class TranslatorTask(Base):
                 "row_count": updated_count,
                 "prompt_tokens": prompt_tokens,
                 "completion_tokens": completion_tokens,
+                "items": self.items,
+                "errors": check_result,
+                "time": time.time() - start_time,
             }
         else:
             return {
@@ -199,6 +280,9 @@ class TranslatorTask(Base):
                 "row_count": 0,
                 "prompt_tokens": 0,
                 "completion_tokens": 0,
+                "items": self.items,
+                "errors": check_result,
+                "time": time.time() - start_time,
             }
 
     # 正规化
@@ -321,6 +405,17 @@ class TranslatorTask(Base):
 
         return dst_dict
 
+    # 获取参考译文，为每个条目查找翻译记忆中最相似的已翻译条目
+    def get_reference_pairs(self) -> list[tuple[str, str]]:
+        threshold = ExpertConfig.get().fuzzy_memory_threshold
+        pairs: dict[str, str] = {}
+        for item in self.items:
+            result = FuzzyMemory.get().search(item.get_src(), threshold)
+            if result is not None:
+                pairs.setdefault(result[1], result[2])
+
+        return list(pairs.items())
+
     # 生成提示词
     def generate_prompt(self, src_dict: dict, preceding_items: list[CacheItem], samples: list[str]) -> tuple[list[dict], list[str]]:
         # 初始化
@@ -339,6 +434,13 @@ class TranslatorTask(Base):
                 main = main + "\n" + result
                 extra_log.append(result)
 
+        # 参考译文
+        if FuzzyMemory.get().is_enable() == True:
+            result = self.prompt_builder.build_reference(self.get_reference_pairs())
+            if result != "":
+                main = main + "\n" + result
+                extra_log.append(result)
+
         # 术语表
         if self.config.get("glossary_enable") == True:
             result = self.prompt_builder.build_glossary(src_dict)
@@ -357,15 +459,7 @@ class TranslatorTask(Base):
         })
 
         # 伪造预回复，可以更好的回避模型的安全限制
-        # DeepSeek R1、 Claude 思考模式 不兼容此方法
-        model: str = self.platform.get("model").lower()
-        thinking: str = self.platform.get("thinking")
-        api_format: str = self.platform.get("api_format")
-        if "deepseek" in model and ("r1" in model or "reasoner" in model):
-            pass
-        elif api_format == "Anthropic" and thinking == True:
-            pass
-        else:
+        if self.is_fake_reply_supported(self.platform) == True:
             messages.append({
                 "role": "assistant",
                 "content": self.prompt_builder.build_fake_reply(),
@@ -383,6 +477,25 @@ class TranslatorTask(Base):
 
         return messages, extra_log
 
+    # 是否使用伪造预回复，DeepSeek R1、 Claude 思考模式 不兼容此方法
+    def is_fake_reply_supported(self, platform: dict) -> bool:
+        model: str = platform.get("model").lower()
+        thinking: str = platform.get("thinking")
+        api_format: str = platform.get("api_format")
+        if "deepseek" in model and ("r1" in model or "reasoner" in model):
+            return False
+        elif api_format == "Anthropic" and thinking == True:
+            return False
+        else:
+            return True
+
+    # 其他接口是否可以直接使用为当前接口生成的提示词，接口格式与伪造预回复的规则都相同时，提示词与回复的格式也相同
+    def is_compatible(self, platform: dict) -> bool:
+        return (
+            platform.get("api_format") == self.platform.get("api_format")
+            and self.is_fake_reply_supported(platform) == self.is_fake_reply_supported(self.platform)
+        )
+
     # 生成提示词 - Sakura
     def generate_prompt_sakura(self, src_dict: dict) -> tuple[list[dict], list[str]]:
         # 初始化
@@ -0,0 +1,206 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import rapidjson as json
+
+# 在项目根目录下以 python -m unittest discover tests 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.Base import Base
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheShards import CacheShards
+from module.Cache.CacheManager import CacheManager
+from module.Cache.CacheProject import CacheProject
+from module.ExpertConfig import ExpertConfig
+
+# 缓存数据经过 保存 -> 修改 -> 写入缓存日志 -> 重新读取 后不会丢失，覆盖 json、分片、sqlite 三种存储格式
+class TestCacheRoundTrip(unittest.TestCase):
+
+    # 测试条目数量，每 4 个条目属于同一个文件
+    COUNT = 12
+
+    def setUp(self) -> None:
+        self.path = tempfile.mkdtemp()
+
+        # 记录专家配置的原始值，测试结束后恢复
+        config = ExpertConfig.get()
+        self.config = {
+            "cache_storage_backend": config.cache_storage_backend,
+            "cache_sharding_enable": config.cache_sharding_enable,
+            "cache_columnar_enable": config.cache_columnar_enable,
+        }
+        config.cache_storage_backend = "json"
+        config.cache_sharding_enable = False
+        config.cache_columnar_enable = False
+
+    def tearDown(self) -> None:
+        for k, v in self.config.items():
+            setattr(ExpertConfig.get(), k, v)
+
+        CacheManager.JOURNAL_COMPACT_THRESHOLD = 4096
+        CacheManager.LOAD_CHUNK_SIZE = 4 * 1024 * 1024
+        shutil.rmtree(self.path, ignore_errors = True)
+
+    # 生成测试条目
+    def create_items(self) -> list[CacheItem]:
+        return [
+            CacheItem({
+                "src": f"テキスト{i}",
+                "file_type": CacheItem.FileType.TXT,
+                "file_path": f"{i // 4}.txt",
+                "row": i,
+            })
+            for i in range(TestCacheRoundTrip.COUNT)
+        ]
+
+    # 保存完整快照，并返回缓存管理器
+    def create_manager(self) -> CacheManager:
+        cache_manager = CacheManager(tick = False)
+        cache_manager.set_items(self.create_items())
+        cache_manager.set_project(CacheProject({"id": "test"}))
+        cache_manager.save_to_file(
+            project = cache_manager.get_project(),
+            items = cache_manager.get_items(),
+            output_folder = self.path,
+        )
+
+        return cache_manager
+
+    # 修改条目并写入缓存日志
+    def translate(self, cache_manager: CacheManager, indices: list[int]) -> None:
+        items = [cache_manager.get_items()[i] for i in indices]
+        for item in items:
+            item.update(dst = f"訳{item.get_row()}", status = Base.TranslationStatus.TRANSLATED, retry_count = 1)
+        cache_manager.append_journal(items)
+        cache_manager.save_journal_to_file(self.path)
+
+    # 重新读取缓存数据
+    def reload(self) -> list[dict]:
+        cache_manager = CacheManager(tick = False)
+        cache_manager.load_from_file(self.path)
+        return [item.get_vars() for item in cache_manager.get_items()]
+
+    # 检查重新读取的数据与内存中的数据一致
+    def assert_round_trip(self, cache_manager: CacheManager) -> None:
+        self.assertEqual(self.reload(), [item.get_vars() for item in cache_manager.get_items()])
+
+    def test_json_journal_replay(self) -> None:
+        for columnar in (False, True):
+            with self.subTest(columnar = columnar):
+                ExpertConfig.get().cache_columnar_enable = columnar
+                cache_manager = self.create_manager()
+                self.translate(cache_manager, [1, 5])
+                self.translate(cache_manager, [9])
+
+                # 完整快照保持不变，变化只写入缓存日志
+                self.assertTrue(os.path.isfile(f"{self.path}/cache/items.json"))
+                self.assertFalse(os.path.isdir(f"{self.path}/cache/items"))
+                with open(f"{self.path}/cache/items.journal", "r", encoding = "utf-8") as reader:
+                    self.assertEqual(len(reader.readlines()), 3)
+
+                # 写入中断时不完整的最后一条记录会被跳过
+                with open(f"{self.path}/cache/items.journal", "a", encoding = "utf-8") as writer:
+                    writer.write("{\"index\": 2, \"dst\"")
+
+                self.assert_round_trip(cache_manager)
+
+    def test_json_compact(self) -> None:
+        CacheManager.JOURNAL_COMPACT_THRESHOLD = 2
+        cache_manager = self.create_manager()
+        self.translate(cache_manager, [0])
+        self.translate(cache_manager, [3, 4])
+
+        # 日志记录数超过阈值时重写完整快照
+        self.assertFalse(os.path.isfile(f"{self.path}/cache/items.journal"))
+        with open(f"{self.path}/cache/items.json", "r", encoding = "utf-8") as reader:
+            self.assertEqual(json.load(reader)[4].get("dst"), "訳4")
+
+        self.assert_round_trip(cache_manager)
+
+    def test_shard_manifest_rewrite(self) -> None:
+        ExpertConfig.get().cache_sharding_enable = True
+        CacheManager.JOURNAL_COMPACT_THRESHOLD = 2
+        cache_manager = self.create_manager()
+        shards = CacheShards(f"{self.path}/cache/items")
+        before = shards.load_manifest()
+
+        self.assertFalse(os.path.isfile(f"{self.path}/cache/items.json"))
+        self.assertEqual(len(before.get("shards")), 3)
+
+        self.translate(cache_manager, [5])
+        self.translate(cache_manager, [6])
+
+        # 压缩日志时只重写包含变化条目的分片
+        after = shards.load_manifest()
+        self.assertEqual(after.get("generation"), before.get("generation") + 1)
+        self.assertEqual([v.get("name") == w.get("name") for v, w in zip(before.get("shards"), after.get("shards"))], [True, False, True])
+        self.assertEqual(sorted(os.listdir(shards.path)), sorted(["manifest.json", *(v.get("name") for v in after.get("shards"))]))
+        self.assertFalse(os.path.isfile(f"{self.path}/cache/items.journal"))
+
+        # 压缩后继续追加的日志同样可以重放
+        self.translate(cache_manager, [11])
+        self.assert_round_trip(cache_manager)
+
+    def test_sqlite(self) -> None:
+        ExpertConfig.get().cache_storage_backend = "sqlite"
+        cache_manager = self.create_manager()
+        self.translate(cache_manager, [2, 7])
+        self.translate(cache_manager, [10])
+
+        # 数据库直接原地更新，不写入缓存日志
+        self.assertTrue(os.path.isfile(f"{self.path}/cache/items.db"))
+        self.assertFalse(os.path.isfile(f"{self.path}/cache/items.json"))
+        self.assertFalse(os.path.isfile(f"{self.path}/cache/items.journal"))
+
+        self.assert_round_trip(cache_manager)
+
+    def test_migration(self) -> None:
+        # 分片格式的缓存在默认配置下读取，保存后转换为 items.json
+        ExpertConfig.get().cache_sharding_enable = True
+        cache_manager = self.create_manager()
+        self.translate(cache_manager, [8])
+        expected = [item.get_vars() for item in cache_manager.get_items()]
+
+        ExpertConfig.get().cache_sharding_enable = False
+        cache_manager = CacheManager(tick = False)
+        cache_manager.load_from_file(self.path)
+        self.assertEqual([item.get_vars() for item in cache_manager.get_items()], expected)
+
+        cache_manager.save_journal_to_file(self.path)
+        self.assertTrue(os.path.isfile(f"{self.path}/cache/items.json"))
+        self.assertFalse(os.path.isdir(f"{self.path}/cache/items"))
+        self.assertEqual(self.reload(), expected)
+
+    def test_snapshot_copy_on_write(self) -> None:
+        for columnar in (False, True):
+            with self.subTest(columnar = columnar):
+                ExpertConfig.get().cache_columnar_enable = columnar
+                cache_manager = CacheManager(tick = False)
+                cache_manager.set_items(self.create_items())
+
+                # 快照创建后的修改不影响快照，快照中的修改也不影响原始条目
+                with cache_manager.create_snapshot() as snapshot:
+                    cache_manager.get_items()[3].update(dst = "訳3", status = Base.TranslationStatus.TRANSLATED)
+                    snapshot.get_items()[4].set_dst("local")
+
+                    self.assertEqual(snapshot.get_vars(3).get("dst"), "")
+                    self.assertEqual(snapshot.get_vars(3).get("status"), Base.TranslationStatus.UNTRANSLATED)
+                    self.assertEqual(snapshot.get_vars(4).get("dst"), "local")
+                    self.assertEqual(cache_manager.get_items()[3].get_dst(), "訳3")
+                    self.assertEqual(cache_manager.get_items()[4].get_dst(), "")
+
+                self.assertEqual(len(cache_manager.snapshots), 0)
+
+    def test_streaming_load(self) -> None:
+        # 每次只读取几个字节，多字节字符与条目都会被截断在两次读取之间
+        cache_manager = self.create_manager()
+        self.translate(cache_manager, [1])
+        CacheManager.LOAD_CHUNK_SIZE = 7
+
+        self.assert_round_trip(cache_manager)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+# 在项目根目录下以 python -m unittest discover tests 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.Base import Base
+from module.Translator.TranslatorRequester import TranslatorRequester
+from module.Translator.TranslatorRateLimiter import TranslatorRateLimiter
+from module.Translator.TranslatorKeyScheduler import TranslatorKeyScheduler
+
+# 多个接口使用相同的密钥时，客户端、速率限制与密钥状态都需要按接口区分
+class TestTranslatorSharedKey(unittest.TestCase):
+
+    KEY = "no_key_required"
+
+    def setUp(self) -> None:
+        self.platforms = [
+            {
+                "id": 1,
+                "name": "local_a",
+                "api_url": "http://127.0.0.1:8080/v1",
+                "api_key": [TestTranslatorSharedKey.KEY],
+                "api_format": Base.APIFormat.OPENAI,
+                "model": "model_a",
+            },
+            {
+                "id": 2,
+                "name": "local_b",
+                "api_url": "http://127.0.0.1:8081/v1",
+                "api_key": [TestTranslatorSharedKey.KEY],
+                "api_format": Base.APIFormat.OPENAI,
+                "model": "model_b",
+            },
+        ]
+
+    def test_client(self) -> None:
+        clients = [
+            TranslatorRequester({}, platform, 0).get_client(platform, 60)
+            for platform in self.platforms
+        ]
+
+        self.assertIsNot(clients[0], clients[1])
+        self.assertEqual(str(clients[0].base_url).rstrip("/"), self.platforms[0].get("api_url"))
+        self.assertEqual(str(clients[1].base_url).rstrip("/"), self.platforms[1].get("api_url"))
+
+    def test_rate_limiter(self) -> None:
+        limiter = TranslatorRateLimiter()
+
+        # 第一个接口的额度用完后，第二个接口不受影响，且不同的上限不会重建另一个接口的令牌桶
+        for _ in range(60):
+            limiter.reserve(1, TestTranslatorSharedKey.KEY, 60, 0, 0)
+        self.assertGreater(limiter.reserve(1, TestTranslatorSharedKey.KEY, 60, 0, 0), 0)
+        self.assertEqual(limiter.reserve(2, TestTranslatorSharedKey.KEY, 30, 0, 0), 0)
+        self.assertGreater(limiter.reserve(1, TestTranslatorSharedKey.KEY, 60, 0, 0), 0)
+
+    def test_key_scheduler(self) -> None:
+        scheduler = TranslatorKeyScheduler()
+
+        # 第一个接口连续失败后熔断，第二个接口保持正常
+        for _ in range(TranslatorKeyScheduler.FAILURE_THRESHOLD):
+            key = scheduler.select(self.platforms[0])
+            scheduler.record(self.platforms[0], key, False, 1.0)
+        key = scheduler.select(self.platforms[1])
+        scheduler.record(self.platforms[1], key, True, 1.0)
+
+        self.assertEqual(scheduler.stats.get((1, TestTranslatorSharedKey.KEY)).state, TranslatorKeyScheduler.State.OPEN)
+        self.assertEqual(scheduler.stats.get((2, TestTranslatorSharedKey.KEY)).state, TranslatorKeyScheduler.State.CLOSED)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import gc
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+# 在项目根目录下以 python tools/CacheBenchmark.py 运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.Base import Base
+from module.Cache.CacheItem import CacheItem
+from module.Cache.CacheColumnStore import CacheColumnStore
+
+# 缓存数据基准测试
+# 在不同的提交上分别运行，比较前后的结果
+
+# 生成测试条目的参数
+def generate_args(count: int) -> list[dict]:
+    return [
+        {
+            "src": f"テキスト{i}",
+            "file_type": CacheItem.FileType.TXT,
+            "file_path": f"{i % 100}.txt",
+            "row": i,
+        }
+        for i in range(count)
+    ]
+
+# 条目的构造耗时、内存占用与读取耗时
+def benchmark_item(count: int) -> list[CacheItem]:
+    args = generate_args(count)
+
+    # 构造，同时统计内存占用
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [CacheItem(v) for v in args]
+    elapsed_build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # 每个条目调用 3 次读取方法
+    start = time.perf_counter()
+    for item in items:
+        if item.get_status() != Base.TranslationStatus.EXCLUDED and item.get_file_path() != "" and item.get_src() != "":
+            pass
+    elapsed_get = time.perf_counter() - start
+
+    print(f"CacheItem - items: {count}, memory: {memory / 1024 / 1024:.0f} MiB, build: {elapsed_build:.2f} s, getters (3 per item): {elapsed_get:.2f} s")
+
+    return items
+
+# 列式存储相对于条目列表额外占用的内存与按状态统计的耗时
+def benchmark_column_store(items: list[CacheItem]) -> None:
+    # 构造，原文等字符串与条目共用，不计入额外占用
+    gc.collect()
+    tracemalloc.start()
+    store = CacheColumnStore(items)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # 按状态统计
+    start = time.perf_counter()
+    len([item for item in items if item.get_status() == Base.TranslationStatus.UNTRANSLATED])
+    elapsed_list = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.count_by_status(Base.TranslationStatus.UNTRANSLATED)
+    elapsed_store = time.perf_counter() - start
+
+    # 筛选待翻译条目
+    start = time.perf_counter()
+    store.get_indices_by_status((Base.TranslationStatus.UNTRANSLATED,))
+    elapsed_pending = time.perf_counter() - start
+
+    print(
+        f"CacheColumnStore - memory: {memory / 1024 / 1024:.0f} MiB, "
+        f"count by status: {elapsed_list * 1000:.0f} ms (list) -> {elapsed_store * 1000:.1f} ms (store), "
+        f"pending scan: {elapsed_pending * 1000:.0f} ms"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type = int, default = 1000000)
+    args = parser.parse_args()
+
+    items = benchmark_item(args.count)
+    benchmark_column_store(items)
+
+if __name__ == "__main__":
+    main()